@@ -1,37 +1,45 @@
 # analyze_results.py
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
-import glob
+from utils.results_store import PARAMETER_TYPES, ResultsStore, import_summary_csvs
+
+def open_results(base_dir='plots', store_dir=None):
+    """The consolidated results store main.py writes next to its per-experiment
+    directories; results saved before the store existed are imported from
+    their summary_results.csv files once."""
+    store = ResultsStore(store_dir or os.path.join(base_dir, 'results_store'))
+    if not store.scenarios():
+        from main import LOAD_LEVELS, THREAT_LEVELS
+        imported = import_summary_csvs(store, base_dir, LOAD_LEVELS, THREAT_LEVELS)
+        if not imported:
+            print("No results found. Did you run main.py first?")
+            return None
+        print(f"  > Imported {imported} experiment(s) into {store.directory}")
+    return store
 
 def load_all_results(base_dir='plots'):
-    """Finds and loads all summary_results.csv files into a single DataFrame."""
-    csv_files = glob.glob(os.path.join(base_dir, '**', 'summary_results.csv'), recursive=True)
-    if not csv_files:
-        print("No summary_results.csv files found. Did you run main.py first?")
+    """Every run of every experiment as one DataFrame, with typed parameter columns."""
+    store = open_results(base_dir)
+    if store is None:
         return None
-    
-    df_list = []
-    for f in csv_files:
-        parts = f.split(os.sep)
-        exp_name = parts[-2]
-        exp_parts = exp_name.split('_')
-        params = {exp_parts[i]: exp_parts[i+1] for i in range(0, len(exp_parts), 2)}
-        
-        df = pd.read_csv(f)
-        df['cores'] = int(params['cores'])
-        df['load'] = params['load']
-        df['threat'] = params['threat']
-        df_list.append(df)
-        
-    return pd.concat(df_list, ignore_index=True)
+    return pd.DataFrame(store.read(store.columns() + list(PARAMETER_TYPES)))
 
-def generate_final_paper_figures(df, output_dir='plots_final'):
+def scalability_curve(store, metric, load, threat):
+    """Per-scheduler mean (and std, count) of `metric` against the core count, for one load and threat level."""
+    return pd.DataFrame(store.aggregate(metric, ('scheduler', 'cores'), {'load': load, 'threat': threat}))
+
+def generate_final_paper_figures(store, output_dir='plots_final'):
     """
     Generates only the specific, curated plots needed for the research paper.
     """
-    if df is None: return
+    if store is None: return
+    # Only imported once there is something to draw.
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
@@ -50,31 +58,37 @@ def generate_final_paper_figures(df, output_dir='plots_final'):
         
         print(f"--- Generating Figure: {plot_info['filename']} ---")
         
-        analysis_df = df[(df['load'] == load) & (df['threat'] == threat)]
+        curve = scalability_curve(store, metric, load, threat)
 
-        if analysis_df.empty:
+        if curve.empty:
             print(f"  > Warning: No data found for this scenario. Skipping.")
             continue
 
         plt.figure(figsize=(10, 6))
-        sns.lineplot(data=analysis_df, x='cores', y=metric, hue='scheduler', marker='o', errorbar=None)
+        sns.lineplot(data=curve, x='cores', y='mean', hue='scheduler', marker='o', errorbar=None)
         
         plt.title(f'Scalability: {metric} vs. Number of Cores\n(Load: {load.capitalize()}, Threat: {threat.capitalize()})')
         plt.xlabel('Number of Cores')
         plt.ylabel(f'Average {metric}')
         plt.grid(True, linestyle='--', alpha=0.7)
-        plt.xticks([8, 16, 32])
+        plt.xticks(sorted(curve['cores'].unique()))
         plt.tight_layout()
         
         filename = os.path.join(output_dir, plot_info['filename'])
         plt.savefig(filename)
         plt.close()
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the paper figures from main.py's results.")
+    parser.add_argument('--results-dir', default='plots', help="main.py's --output-dir.")
+    parser.add_argument('--store', help="The results store (default: RESULTS_DIR/results_store).")
+    parser.add_argument('--output-dir', default='plots_final')
+    args = parser.parse_args(argv)
+
     print("--- Loading results to generate final paper figures... ---")
-    full_df = load_all_results()
-    generate_final_paper_figures(full_df)
-    print(f"\n--- Final paper figures saved to 'plots_final' directory. ---")
+    store = open_results(args.results_dir, args.store)
+    generate_final_paper_figures(store, args.output_dir)
+    print(f"\n--- Final paper figures saved to '{args.output_dir}' directory. ---")
     print("This is the recommended set of figures to use in your paper.")
 
 if __name__ == "__main__":
@@ -0,0 +1,299 @@
+# benchmarks/check_equivalence.py
+"""Regression checks that the ways of running a sweep agree, and that the
+numerical building blocks under them still behave.
+
+Run from the repository root:
+
+    python -m benchmarks.check_equivalence
+    python -m benchmarks.check_equivalence --checks workers shards
+
+A small experiment matrix is run in one process, then again with a worker
+pool, as shards merged afterwards, interrupted and resumed from its
+checkpoints, and twice through the result cache; every output file must be
+byte-identical to the single-process run's. The ensemble engine, whose
+random streams differ from the tick engine's, must agree with it
+statistically. The component checks cover TaskTable slot reuse, the ready
+queues, sample_core_order's draw distribution and the streaming statistics.
+Exits non-zero if anything differs.
+"""
+import argparse
+import csv
+import filecmp
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from schedulers.base_scheduler import sample_core_order
+from schedulers.ready_queue import FIFOReadyQueue, HeapReadyQueue
+from simulation.task import Task, TaskTable
+from utils.metrics import P2Quantile, RunningStats
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Small enough to run in about a minute, wide enough to cover several units per shard.
+MATRIX = ['--cores', '8', '16', '--loads', 'low', 'heavy', '--threats', 'high', '--max-runs', '3',
+          '--duration', '1500', '--schedulers', 'CFSScheduler', 'PriorityScheduler',
+          'StigmergicSentinelsScheduler', 'HierarchicalSentinelsScheduler',
+          '--no-plots', '--headless']
+# Enough runs per engine for the ensemble/tick comparison to resolve a real difference.
+ENSEMBLE_MATRIX = ['--cores', '8', '--loads', 'medium', '--threats', 'high', '--max-runs', '24',
+                   '--duration', '2000', '--schedulers', 'CFSScheduler', 'StigmergicSentinelsScheduler',
+                   '--no-plots', '--headless']
+# Largest |difference of means| / standard error tolerated between the engines.
+ENSEMBLE_Z = 4.0
+
+def _main_py(args, matrix=MATRIX):
+    # Runs bypass the result cache unless they are given one of their own.
+    cache = [] if '--cache-dir' in args else ['--no-cache']
+    return subprocess.Popen([sys.executable, os.path.join(REPO, 'main.py'), *matrix, *cache, *args], cwd=REPO,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+def run_main(args, matrix=MATRIX):
+    process = _main_py(args, matrix)
+    _, stderr = process.communicate()
+    if process.returncode:
+        raise AssertionError(f"main.py {' '.join(args)} failed:\n{stderr.decode(errors='replace')}")
+
+def differences(expected, actual):
+    """Paths under two output directories that are missing on one side or differ."""
+    comparison = filecmp.dircmp(expected, actual)
+    found = [os.path.join(comparison.left, name) for name in comparison.left_only + comparison.right_only +
+             comparison.funny_files]
+    _, mismatch, errors = filecmp.cmpfiles(expected, actual, comparison.common_files, shallow=False)
+    found += [os.path.join(expected, name) for name in mismatch + errors]
+    for name in comparison.common_dirs:
+        found += differences(os.path.join(expected, name), os.path.join(actual, name))
+    return found
+
+def _output(work_dir, name):
+    return os.path.join(work_dir, name, 'output')
+
+def _check_same(work_dir, name):
+    found = differences(_output(work_dir, 'single'), _output(work_dir, name))
+    if found:
+        raise AssertionError(f"{len(found)} output file(s) differ from the single-process run, e.g. {found[0]}")
+
+# --- Sweep equivalence ---
+
+def check_workers(work_dir, args):
+    run_main(['--workers', str(args.workers), '--output-dir', _output(work_dir, 'workers')])
+    _check_same(work_dir, 'workers')
+
+def check_shards(work_dir, args):
+    shard_dir = os.path.join(work_dir, 'shards', 'parts')
+    for index in range(1, args.shards + 1):
+        run_main(['--shard', f'{index}/{args.shards}', '--shard-dir', shard_dir])
+    run_main(['--merge', '--shard-dir', shard_dir, '--output-dir', _output(work_dir, 'shards')])
+    _check_same(work_dir, 'shards')
+
+def check_resume(work_dir, args):
+    """Interrupts a checkpointed sweep once a checkpoint is on disk, then completes it."""
+    checkpoint_dir = os.path.join(work_dir, 'resume', 'checkpoints')
+    run_args = ['--checkpoint-every', '100', '--checkpoint-dir', checkpoint_dir,
+                '--output-dir', _output(work_dir, 'resume')]
+    process = _main_py(run_args)
+    interrupted = False
+    while process.poll() is None:
+        if os.path.isdir(checkpoint_dir) and any(name.endswith('.snapshot') for name in os.listdir(checkpoint_dir)):
+            process.send_signal(signal.SIGINT)
+            interrupted = True
+            break
+        time.sleep(0.01)
+    process.communicate()
+    if not interrupted:
+        raise AssertionError("The sweep finished before any checkpoint was seen; nothing was resumed")
+    run_main(run_args)
+    _check_same(work_dir, 'resume')
+
+def _files(directory):
+    return {os.path.join(root, name): os.stat(os.path.join(root, name)).st_mtime_ns
+            for root, _, names in os.walk(directory) for name in names}
+
+def check_cache(work_dir, args):
+    """A cold and a warm run through the result cache; the warm one must compute nothing."""
+    cache_dir = os.path.join(work_dir, 'cache', 'results')
+    run_main(['--cache-dir', cache_dir, '--output-dir', _output(work_dir, 'cache')])
+    _check_same(work_dir, 'cache')
+    cached = _files(cache_dir)
+    if not cached:
+        raise AssertionError("The cold run stored no results")
+    run_main(['--cache-dir', cache_dir, '--output-dir', _output(work_dir, 'cache-warm')])
+    _check_same(work_dir, 'cache-warm')
+    if _files(cache_dir) != cached:
+        raise AssertionError("The warm run recomputed or rewrote cached results")
+
+def _summaries(output_dir):
+    """scheduler -> metric -> per-run values, from every summary_results.csv under `output_dir`."""
+    values = {}
+    for root, _, names in os.walk(output_dir):
+        if 'summary_results.csv' not in names:
+            continue
+        with open(os.path.join(root, 'summary_results.csv'), newline='') as f:
+            reader = csv.DictReader(f)
+            metrics = reader.fieldnames[2:reader.fieldnames.index('runs')]
+            for row in reader:
+                for metric in metrics:
+                    values.setdefault(row['scheduler'], {}).setdefault(metric, []).append(
+                        float(row[metric]) if row[metric] else np.nan)
+    return values
+
+def check_ensemble(work_dir, args):
+    """Per-run summary means of the ensemble and tick engines, within ENSEMBLE_Z standard errors."""
+    summaries = {}
+    for engine in ('tick', 'ensemble'):
+        output_dir = os.path.join(work_dir, 'ensemble', engine)
+        run_main(['--engine', engine, '--output-dir', output_dir], ENSEMBLE_MATRIX)
+        summaries[engine] = _summaries(output_dir)
+    if not summaries['tick'] or summaries['tick'].keys() != summaries['ensemble'].keys():
+        raise AssertionError("The engines did not report the same schedulers")
+    for scheduler, metrics in summaries['tick'].items():
+        for metric, tick in metrics.items():
+            tick = np.asarray(tick)
+            ensemble = np.asarray(summaries['ensemble'][scheduler][metric])
+            tick, ensemble = tick[np.isfinite(tick)], ensemble[np.isfinite(ensemble)]
+            error = np.sqrt(tick.var(ddof=1) / len(tick) + ensemble.var(ddof=1) / len(ensemble))
+            difference = abs(tick.mean() - ensemble.mean())
+            if difference > ENSEMBLE_Z * error and difference > 1e-9:
+                raise AssertionError(f"{scheduler} {metric}: tick {tick.mean():.4g}, ensemble "
+                                     f"{ensemble.mean():.4g} ({difference / error:.1f} standard errors apart)")
+
+# --- Components ---
+
+def check_task_table(work_dir, args):
+    table = TaskTable(capacity=2)
+    first = Task(0, cpu_burst=10, priority=1, is_malicious=False, table=table)
+    second = Task(1, cpu_burst=20, priority=2, is_malicious=True, table=table)
+    third = Task(2, cpu_burst=30, priority=3, is_malicious=False, table=table)
+    assert table.capacity == 4 and len(table) == 3, "The table must double when no slot is free"
+    assert (first.cpu_burst, second.cpu_burst, third.cpu_burst) == (10, 20, 30), "Growth must keep the columns"
+
+    table.free(second.slot)
+    assert not table.live[second.slot] and len(table) == 2
+    reused = Task(3, cpu_burst=40, priority=4, is_malicious=False, table=table)
+    assert reused.slot == second.slot, "A freed slot must be reused before the table grows"
+    assert (reused.remaining_burst, reused.detection_time, reused.detected_malicious) == (40, -1, False), \
+        "A reused slot must start from the new task's values"
+
+    other = TaskTable()
+    moved = Task(4, cpu_burst=50, priority=5, is_malicious=True, table=other)
+    moved.vruntime = 7
+    source_slot = moved.slot
+    slot = table.adopt(moved)
+    assert moved.table is table and moved.slot == slot and not other.live[source_slot]
+    assert (moved.cpu_burst, moved.vruntime, moved.is_malicious) == (50, 7, True), "Adoption must copy every column"
+
+def check_ready_queues(work_dir, args):
+    """Both queues against a sorted list under random pushes, pops and removals with slot reuse."""
+    rng = np.random.default_rng(0)
+    for make_queue, key in ((FIFOReadyQueue, lambda entry: entry[1]),
+                            (lambda table: HeapReadyQueue('priority', table), lambda entry: entry)):
+        table = TaskTable()
+        queue = make_queue(table)
+        expected = []
+        for step in range(5000):
+            action = rng.random()
+            if action < 0.5 or not expected:
+                task = Task(step, cpu_burst=5, priority=int(rng.integers(0, 20)), is_malicious=False, table=table)
+                queue.push(task)
+                expected.append((task.priority, step, task.id))
+            elif action < 0.75:
+                task = queue.pop()
+                entry = min(expected, key=key)
+                assert task.id == entry[2], f"{type(queue).__name__} popped task {task.id}, expected {entry[2]}"
+                expected.remove(entry)
+                table.free(task.slot)
+            else:
+                entry = expected[int(rng.integers(len(expected)))]
+                task = next(task for task in queue if task.id == entry[2])
+                queue.remove(task)
+                expected.remove(entry)
+                table.free(task.slot)
+            assert len(queue) == len(expected), f"{type(queue).__name__} holds {len(queue)} tasks, not {len(expected)}"
+        assert sorted(task.id for task in queue) == sorted(entry[2] for entry in expected)
+
+def check_core_order(work_dir, args):
+    """First picks follow the weights; unavailable cores come last, zero weights after positive ones."""
+    np.random.seed(0)
+    weights = np.array([1.0, 2.0, 3.0, 4.0, 0.0, 5.0])
+    available = np.array([True, True, True, True, True, False])
+    orders = sample_core_order(np.tile(weights, (40000, 1)), np.tile(available, (40000, 1)))
+    assert (orders[:, -1] == 5).all(), "An unavailable core must be picked last"
+    assert (orders[:, -2] == 4).all(), "A zero-weight core must follow every positive-weight one"
+    first = np.bincount(orders[:, 0], minlength=len(weights)) / len(orders)
+    target = weights * available / (weights * available).sum()
+    assert np.abs(first - target).max() < 0.01, f"First picks {first.round(3)} do not follow {target.round(3)}"
+    # Second pick after core 3 was first: proportional to the remaining weights.
+    second = orders[orders[:, 0] == 3, 1]
+    shares = np.bincount(second, minlength=len(weights))[:3] / len(second)
+    assert np.abs(shares - weights[:3] / weights[:3].sum()).max() < 0.02, f"Second picks {shares.round(3)}"
+
+def check_streaming_stats(work_dir, args):
+    rng = np.random.default_rng(0)
+    values = np.column_stack((rng.normal(5.0, 2.0, 20000), rng.exponential(3.0, 20000), rng.uniform(0, 1, 20000)))
+    stats = RunningStats(3)
+    sketches = [P2Quantile(p, 3) for p in (0.05, 0.5, 0.95)]
+    for row in values:
+        stats.add(row)
+        for sketch in sketches:
+            sketch.add(row)
+    assert stats.count == len(values)
+    assert np.allclose(stats.mean, values.mean(axis=0)) and np.allclose(stats.variance, values.var(axis=0, ddof=1))
+    assert np.array_equal(stats.min, values.min(axis=0)) and np.array_equal(stats.max, values.max(axis=0))
+    for sketch in sketches:
+        exact = np.quantile(values, sketch.p, axis=0)
+        spread = np.quantile(values, 0.99, axis=0) - np.quantile(values, 0.01, axis=0)
+        error = np.abs(sketch.value() - exact) / spread
+        assert (error < 0.01).all(), f"P2 {sketch.p} quantile is off by {error.round(4)} of the data's range"
+
+    few = P2Quantile(0.5, 1)
+    for value in (3.0, 1.0, 2.0):
+        few.add([value])
+    assert few.value()[0] == 2.0, "Below five values the quantile must be exact"
+
+CHECKS = {
+    'task_table': check_task_table,
+    'ready_queues': check_ready_queues,
+    'core_order': check_core_order,
+    'streaming_stats': check_streaming_stats,
+    'workers': check_workers,
+    'shards': check_shards,
+    'resume': check_resume,
+    'cache': check_cache,
+    'ensemble': check_ensemble,
+}
+# Comparisons against the single-process run's outputs.
+SWEEP_CHECKS = ('workers', 'shards', 'resume', 'cache')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check that sweeps agree however they are run.")
+    parser.add_argument('--checks', nargs='+', choices=list(CHECKS), default=list(CHECKS))
+    parser.add_argument('--workers', type=int, default=3, help="Pool size of the 'workers' check.")
+    parser.add_argument('--shards', type=int, default=2, help="Shard count of the 'shards' check.")
+    parser.add_argument('--work-dir', help="Keep the runs' outputs here instead of in a temporary directory.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix='check_equivalence_') as temporary:
+        work_dir = args.work_dir or temporary
+        if any(name in SWEEP_CHECKS for name in args.checks):
+            print("single-process reference run", file=sys.stderr)
+            run_main(['--output-dir', _output(work_dir, 'single')])
+        failures = 0
+        for name in args.checks:
+            start = time.perf_counter()
+            try:
+                CHECKS[name](work_dir, args)
+            except AssertionError as error:
+                failures += 1
+                print(f"FAIL  {name}: {error}")
+            else:
+                print(f"ok    {name} ({time.perf_counter() - start:.1f}s)")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
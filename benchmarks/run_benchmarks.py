@@ -0,0 +1,209 @@
+# benchmarks/run_benchmarks.py
+"""Micro and end-to-end benchmarks of the simulator's hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --output new.json --compare bench.json
+
+Every configuration is warmed up with the tick engine first, so the components
+are timed on realistic temperatures, queues and pheromones.
+"""
+import argparse
+import copy
+import json
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from main import LOAD_LEVELS
+from simulation.core import CoreArray
+from simulation.environment import Environment
+from simulation.task import Task
+from simulation.thermal_model import ThermalModel
+from utils.metrics import Metrics
+from utils.runner import ENGINES, SCHEDULER_CLASSES
+import config as default_config
+
+CORE_SWEEP = [8, 64, 512, 4096]
+# Fields that identify a benchmark record across result files.
+KEY_FIELDS = ('benchmark', 'engine', 'scheduler', 'cores', 'load')
+
+def time_calls(fn, setup=None, min_time=0.2, max_calls=2000):
+    """Times fn(*setup()) until `min_time` seconds of calls have accumulated;
+    only the calls themselves are timed, not setup()."""
+    samples = []
+    while sum(samples) < min_time and len(samples) < max_calls:
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return {
+        'seconds_per_call': statistics.median(samples),
+        'min_seconds': min(samples),
+        'calls': len(samples),
+    }
+
+def _config(num_cores, arrival_rate, duration):
+    return {
+        'NUM_CORES': num_cores,
+        'TASK_ARRIVAL_RATE': arrival_rate,
+        'THREAT_PROBABILITY': default_config.THREAT_PROBABILITY,
+        'SIMULATION_DURATION': duration,
+        'PROGRESS_BAR': False,
+    }
+
+def warmed_environment(scheduler_name, num_cores, arrival_rate, warmup):
+    np.random.seed(default_config.RANDOM_SEED)
+    env = Environment(SCHEDULER_CLASSES[scheduler_name](num_cores), _config(num_cores, arrival_rate, warmup))
+    for t in range(warmup):
+        env.step(t)
+    return env
+
+def bench_thermal(env, args):
+    cores = copy.deepcopy(env.cores)
+    thermal = ThermalModel(len(cores))
+    return {
+        'thermal_update': time_calls(lambda: thermal.update(cores), min_time=args.min_time),
+        'thermal_propagate_100': time_calls(lambda: thermal.propagate(cores.temperature, cores.busy, 100),
+                                            min_time=args.min_time),
+    }
+
+def bench_metrics(env, args):
+    metrics = Metrics(len(env.cores), default_config.METRICS_LOG_INTERVAL * 100000)
+    return {'metrics_update': time_calls(lambda: metrics.update(env.cores, env.task_queue, env.current_time),
+                                         min_time=args.min_time)}
+
+def bench_scheduler(env, args):
+    def setup_schedule():
+        # Worst case for one dispatch: every core idle and one queued task per core.
+        scheduler = copy.deepcopy(env.scheduler)
+        scheduler.ready_queue = scheduler.make_ready_queue()
+        cores = CoreArray(len(env.cores), table=scheduler.ready_queue.table)
+        cores.temperature[:] = env.cores.temperature
+        for _ in range(len(cores)):
+            scheduler.enqueue(Task(env.current_time, default_config.THREAT_PROBABILITY,
+                                   table=scheduler.ready_queue.table))
+        return scheduler, cores
+
+    scheduler = copy.deepcopy(env.scheduler)
+    return {
+        'scheduler_schedule': time_calls(lambda s, c: s.schedule(s.ready_queue, c, env.current_time),
+                                         setup=setup_schedule, min_time=args.min_time),
+        'scheduler_update': time_calls(lambda: scheduler.update(env.cores, env.current_time),
+                                       min_time=args.min_time),
+    }
+
+def bench_end_to_end(engine, scheduler_name, num_cores, arrival_rate, ticks, repeat):
+    """Best of `repeat` identically seeded runs, in simulated ticks per second."""
+    timings = []
+    for _ in range(repeat):
+        np.random.seed(default_config.RANDOM_SEED)
+        scheduler = SCHEDULER_CLASSES[scheduler_name](num_cores)
+        env = ENGINES[engine](scheduler, _config(num_cores, arrival_rate, ticks))
+        start = time.perf_counter()
+        env.run()
+        timings.append(time.perf_counter() - start)
+    elapsed = min(timings)
+    return {'seconds': elapsed, 'ticks_per_second': ticks / elapsed,
+            'seconds_per_call': elapsed / ticks, 'min_seconds': elapsed / ticks}
+
+def run_suite(args):
+    records = []
+
+    def record(name, result, **fields):
+        entry = {'benchmark': name, **fields, **result}
+        records.append(entry)
+        rate = f"{entry['ticks_per_second']:>12.0f} ticks/s" if 'ticks_per_second' in entry else \
+               f"{entry['seconds_per_call'] * 1e6:>12.1f} us/call"
+        label = ' '.join(f"{k}={fields[k]}" for k in KEY_FIELDS[1:] if k in fields)
+        print(f"  {name:<24} {label:<66} {rate}", file=sys.stderr)
+
+    for num_cores in args.cores:
+        for load_name in args.loads:
+            arrival_rate = LOAD_LEVELS[load_name]
+            for scheduler_name in args.schedulers:
+                env = warmed_environment(scheduler_name, num_cores, arrival_rate, args.warmup)
+                if scheduler_name == args.schedulers[0]:
+                    if load_name == args.loads[0]:
+                        for name, result in bench_thermal(env, args).items():
+                            record(name, result, cores=num_cores)
+                    for name, result in bench_metrics(env, args).items():
+                        record(name, result, cores=num_cores, load=load_name)
+                for name, result in bench_scheduler(env, args).items():
+                    record(name, result, scheduler=scheduler_name, cores=num_cores, load=load_name)
+                for engine in args.engines:
+                    record('end_to_end', bench_end_to_end(engine, scheduler_name, num_cores, arrival_rate,
+                                                            args.ticks, args.repeat),
+                           engine=engine, scheduler=scheduler_name, cores=num_cores, load=load_name)
+    return records
+
+def record_key(entry):
+    return tuple(entry.get(field) for field in KEY_FIELDS)
+
+def compare(records, baseline, threshold):
+    """Prints the change in fastest time per call against `baseline`; returns
+    the regressed records, those slower by more than `threshold` (a fraction).
+
+    The minimum, not the median, is compared because it is the least disturbed
+    by other load on the machine.
+    """
+    previous = {record_key(entry): entry for entry in baseline['results']}
+    regressions = []
+    for entry in records:
+        before = previous.get(record_key(entry))
+        if before is None:
+            continue
+        ratio = entry['min_seconds'] / before['min_seconds']
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append({**entry, 'baseline_min_seconds': before['min_seconds'], 'ratio': ratio})
+        label = ' '.join(str(v) for v in record_key(entry) if v is not None)
+        print(f"{'REGRESSION' if regressed else 'ok':<10} {ratio:>6.2f}x  {label}")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulator's components and engines.")
+    parser.add_argument('--cores', type=int, nargs='+', default=CORE_SWEEP)
+    parser.add_argument('--loads', nargs='+', choices=list(LOAD_LEVELS), default=list(LOAD_LEVELS))
+    parser.add_argument('--schedulers', nargs='+', choices=list(SCHEDULER_CLASSES), default=list(SCHEDULER_CLASSES))
+    parser.add_argument('--engines', nargs='+', choices=['tick', 'event'], default=['tick', 'event'])
+    parser.add_argument('--warmup', type=int, default=1000, help="Ticks simulated before timing components.")
+    parser.add_argument('--ticks', type=int, default=2000, help="Simulated ticks per end-to-end run.")
+    parser.add_argument('--repeat', type=int, default=3, help="End-to-end runs per configuration (best is kept).")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Seconds of timed calls per microbenchmark.")
+    parser.add_argument('--output', help="Write the results as JSON to this file.")
+    parser.add_argument('--compare', metavar='BASELINE', help="JSON results of an earlier run to compare against.")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="Slowdown, as a fraction, reported as a regression.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    records = run_suite(args)
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+        },
+        'results': records,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(records, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}.")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,39 @@
+# cli.py
+"""Single entry point for the simulator's tasks.
+
+    python cli.py simulate --cores 8 16 --loads heavy --threats high --duration 20000 --no-plots
+    python cli.py plot plots
+    python cli.py analyze --results-dir plots
+    python cli.py sweep --param RHO_T=0.05,0.1 --cores 8 --loads heavy --threats high
+    python cli.py bench --cores 8 --ticks 1000
+
+Each subcommand is the command line of one module, imported only when it is
+run, so short simulation jobs never load pandas, matplotlib or seaborn.
+`python cli.py <command> --help` lists a subcommand's options.
+"""
+import argparse
+import importlib
+import sys
+
+COMMANDS = {
+    'simulate': ('main', "Run the experiment matrix and save its results (main.py)."),
+    'plot': ('utils.plotter', "Render the plots of saved results."),
+    'analyze': ('analyze_results', "Generate the cross-experiment paper figures."),
+    'sweep': ('sweep', "Search scheduler, thermal and security parameters."),
+    'bench': ('benchmarks.run_benchmarks', "Benchmark the simulator's components and engines."),
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cli.py', description="Stigmergic Sentinels simulator.")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+    for name, (_, description) in COMMANDS.items():
+        # Options are left to the subcommand's own parser.
+        commands.add_parser(name, help=description, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    module = importlib.import_module(COMMANDS[args.command][0])
+    sys.argv[0] = f"{parser.prog} {args.command}"
+    return module.main(rest)
+
+if __name__ == "__main__":
+    sys.exit(main())
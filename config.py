@@ -3,6 +3,15 @@
 # --- Number of simulation runs to average for EACH experiment ---
 NUM_RUNS = 30
 
+# --- Adaptive replication (main.py --adaptive) ---
+# Runs are added ADAPTIVE_BATCH_RUNS at a time until every metric's confidence
+# interval is within ADAPTIVE_PRECISION of its mean or all schedulers differ
+# significantly, between ADAPTIVE_MIN_RUNS and NUM_RUNS runs.
+ADAPTIVE_MIN_RUNS = 5
+ADAPTIVE_BATCH_RUNS = 2
+ADAPTIVE_PRECISION = 0.05
+CONFIDENCE_LEVEL = 0.95
+
 # --- Default simulation settings (can be overridden in main.py) ---
 SIMULATION_DURATION = 20000
 NUM_CORES = 8
@@ -20,6 +29,8 @@ THERMAL_ACTIVE_INCREASE = 0.5
 THERMAL_IDLE_DECREASE = 0.1
 THERMAL_NEIGHBOR_INFLUENCE = 0.01
 THERMAL_HOTSPOT_THRESHOLD = 85.0
+# 'chain', 'mesh', 'mesh:RxC' or 'sockets:S' (see simulation/topology.py)
+THERMAL_TOPOLOGY = 'chain'
 
 # Security Monitor
 THREAT_DETECTION_PROBABILITY = 0.9
@@ -34,12 +45,24 @@ BETA = 1.0
 GAMMA = 2.0
 DELTA = 1.5
 EPSILON = 1.0
+# Cores per domain of HierarchicalSentinelsScheduler
+HIERARCHY_DOMAIN_SIZE = 64
 
 # Single-Pheromone ACO
 RHO_SINGLE_ACO = 0.1
 ALPHA_SINGLE_ACO = 1.0
 BETA_SINGLE_ACO = 1.0
 
+# Scheduling overhead (main.py --charge-decisions)
+# Each dispatch decision costs fixed + per_core * cores scanned + per_queued * queue length
+# microseconds of the core it dispatches to. DECISION_COST_US overrides a scheduler's
+# default (fixed, per_core, per_queued) by class name.
+CHARGE_DECISION_COST = False
+DECISION_COST_US = {}
+
 # Plotting
 METRICS_LOG_INTERVAL = 200
-MOVING_AVERAGE_WINDOW = 10
\ No newline at end of file
+MOVING_AVERAGE_WINDOW = 10
+
+# Reproducibility
+RANDOM_SEED = 42
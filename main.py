@@ -1,89 +1,443 @@
 # main.py
 import os
-import numpy as np
+import argparse
+import contextlib
+import csv
+import math
 import warnings
-import pandas as pd
-from simulation.environment import Environment
-from schedulers.priority_scheduler import PriorityScheduler
-from schedulers.cfs_scheduler import CFSScheduler
-from schedulers.single_aco_scheduler import SingleACOScheduler
-from schedulers.stigmergic_sentinel import StigmergicSentinelsScheduler
-from utils.plotter import plot_summary_boxplots, plot_time_series_results
+from tqdm import tqdm
+from utils.runner import DEFAULT_SCHEDULERS, ENGINES, SCHEDULER_CLASSES, make_units, run_units, unit_runs
+from utils.metrics import SeriesAggregator
+from utils.result_cache import ResultCache, code_version
+from utils.results_store import ResultsStore, scenario_parameters
+from utils.shards import matrix_digest, parse_shard, read_shards, shard_path, unit_identity, unit_shard, write_shard
+from utils.stopping import StoppingRule
+from simulation.profiler import (flatten_profile, format_latencies, format_profile, latency_rows, merge_latencies,
+                                 merge_profiles)
 import config as default_config
 
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
-def main():
-    # --- DEFINE YOUR EXPERIMENTAL MATRIX HERE ---
-    core_levels = [8, 16, 32]
-    load_levels = {'low': 10, 'medium': 20, 'heavy': 40}
-    threat_levels = {'low': 0.02, 'medium': 0.05, 'high': 0.10}
+# --- DEFAULT EXPERIMENTAL MATRIX (select from it with --cores, --loads and --threats) ---
+CORE_LEVELS = [8, 16, 32]
+LOAD_LEVELS = {'low': 10, 'medium': 20, 'heavy': 40}
+THREAT_LEVELS = {'low': 0.02, 'medium': 0.05, 'high': 0.10}
 
-    # Generate all experiment configurations
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Stigmergic Sentinels experiment matrix.")
+    parser.add_argument('--cores', type=int, nargs='+', default=CORE_LEVELS,
+                        help="Core counts of the experiment matrix.")
+    parser.add_argument('--loads', nargs='+', choices=list(LOAD_LEVELS), default=list(LOAD_LEVELS),
+                        help="Task arrival levels of the experiment matrix.")
+    parser.add_argument('--threats', nargs='+', choices=list(THREAT_LEVELS), default=list(THREAT_LEVELS),
+                        help="Threat levels of the experiment matrix.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes (1 runs everything in-process).")
+    parser.add_argument('--schedulers', nargs='+', choices=list(SCHEDULER_CLASSES), default=DEFAULT_SCHEDULERS,
+                        help="Schedulers to compare.")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='tick',
+                        help="'tick' steps every millisecond; 'event' jumps between discrete events; "
+                             "'ensemble' advances all runs of an experiment together.")
+    parser.add_argument('--security-monitor', choices=['bernoulli', 'precomputed'], default='bernoulli',
+                        help="'precomputed' draws each task's detection time once instead of checking every tick "
+                             "(the event engine always does).")
+    parser.add_argument('--thermal-topology', default=default_config.THERMAL_TOPOLOGY,
+                        help="Core layout for heat exchange: 'chain', 'mesh', 'mesh:RxC' or 'sockets:S'.")
+    parser.add_argument('--workload-trace', metavar='PATH',
+                        help="Replay this task trace (CSV, JSON Lines or binary, see simulation/trace.py) "
+                             "instead of generating tasks; the sweep then varies only the core count.")
+    parser.add_argument('--duration', type=int, default=default_config.SIMULATION_DURATION,
+                        help="Simulated milliseconds per run.")
+    parser.add_argument('--warmup', type=int, default=0, metavar='TICKS',
+                        help="Simulate TICKS of warm-up once per run (with CFS) and start every scheduler "
+                             "from that state; only the --duration ticks after it are measured.")
+    parser.add_argument('--checkpoint-every', type=int, default=0, metavar='TICKS',
+                        help="Save each run's state every TICKS ticks, so an interrupted sweep "
+                             "resumes its unfinished runs where they stopped.")
+    parser.add_argument('--checkpoint-dir', default='.cache/checkpoints',
+                        help="Where --checkpoint-every keeps the states of unfinished runs.")
+    parser.add_argument('--output-dir', default='plots',
+                        help="Directory that receives one sub-directory per experiment.")
+    parser.add_argument('--results-store', metavar='DIR',
+                        help="Consolidated columnar dataset every finished experiment is written to "
+                             "(default: OUTPUT_DIR/results_store), which analyze_results.py queries.")
+    parser.add_argument('--no-plots', action='store_true',
+                        help="Only write the CSV results (plot them later with 'cli.py plot'); "
+                             "matplotlib is then never imported.")
+    parser.add_argument('--plot-workers', type=int, default=1,
+                        help="Background processes rendering plots while simulations run (0 renders in-process).")
+    parser.add_argument('--cache-dir', default='.cache/results',
+                        help="Per-run result cache; reruns only compute runs that are missing or out of date.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Neither read nor write the result cache.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Time every simulation phase; writes profile_report.csv per experiment "
+                             "and prints the totals (bypasses the cache).")
+    parser.add_argument('--profile-trace', action='store_true',
+                        help="With --profile, also write a Chrome trace of every run next to its results.")
+    parser.add_argument('--decision-latency', action='store_true',
+                        help="Time every scheduler schedule()/update() call; writes decision_latency.csv per "
+                             "experiment (p50/p99/max by queue length and idle cores) and prints per-scheduler "
+                             "totals (bypasses the cache).")
+    parser.add_argument('--charge-decisions', action='store_true',
+                        help="Charge every dispatch decision's modelled cost as simulated time on its core, "
+                             "so CPU utilization includes the scheduling overhead (reported as its own metric).")
+    parser.add_argument('--decision-cost', action='append', default=[], metavar='SCHEDULER=FIXED,PER_CORE,PER_QUEUED',
+                        help="With --charge-decisions, a scheduler's decision cost in microseconds: fixed, per core "
+                             "scanned and per queued task (defaults in the scheduler classes).")
+    parser.add_argument('--headless', action='store_true',
+                        help="Show no progress bars at all.")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Add runs to each experiment only until its results are precise enough or "
+                             "the schedulers differ significantly, instead of always running --max-runs.")
+    parser.add_argument('--min-runs', type=int, default=default_config.ADAPTIVE_MIN_RUNS,
+                        help="With --adaptive, runs per experiment before the first stopping decision.")
+    parser.add_argument('--max-runs', type=int, default=default_config.NUM_RUNS,
+                        help="Runs per experiment (the most runs with --adaptive).")
+    parser.add_argument('--batch-runs', type=int, default=default_config.ADAPTIVE_BATCH_RUNS,
+                        help="With --adaptive, runs added to an undecided experiment at a time.")
+    parser.add_argument('--precision', type=float, default=default_config.ADAPTIVE_PRECISION,
+                        help="With --adaptive, target confidence interval half-width relative to the mean.")
+    parser.add_argument('--confidence', type=float, default=default_config.CONFIDENCE_LEVEL,
+                        help="Confidence level of the intervals in summary_results.csv and of --adaptive.")
+    parser.add_argument('--shard', metavar='I/N',
+                        help="Run only shard I of N of the sweep's units and write them to --shard-dir; "
+                             "'--merge' then writes the results once all N shards are there.")
+    parser.add_argument('--shard-dir', metavar='DIR',
+                        help="Where shards write their partial results, e.g. on a shared filesystem "
+                             "(default: OUTPUT_DIR/shards).")
+    parser.add_argument('--merge', action='store_true',
+                        help="Write the results and plots of the sharded sweep in --shard-dir instead of "
+                             "simulating; the matrix and run options come from the shards.")
+    args = parser.parse_args(argv)
+    if args.engine == 'ensemble':
+        for option in ('warmup', 'decision_latency', 'charge_decisions'):
+            if getattr(args, option):
+                parser.error(f"--{option.replace('_', '-')} is not supported by the ensemble engine")
+    try:
+        args.decision_cost = {name: tuple(float(value) for value in cost.split(','))
+                              for name, _, cost in (spec.partition('=') for spec in args.decision_cost)}
+    except ValueError:
+        parser.error("--decision-cost takes SCHEDULER=FIXED,PER_CORE,PER_QUEUED")
+    if any(len(cost) != 3 for cost in args.decision_cost.values()):
+        parser.error("--decision-cost takes SCHEDULER=FIXED,PER_CORE,PER_QUEUED")
+    if args.shard:
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as error:
+            parser.error(f"--shard: {error}")
+        if args.adaptive:
+            parser.error("--adaptive cannot be sharded: its stopping decisions need every run of an experiment")
+        if args.merge:
+            parser.error("--shard and --merge are separate steps")
+    args.shard_dir = args.shard_dir or os.path.join(args.output_dir, 'shards')
+    return args
+
+class ExperimentAccumulator:
+    """Results of one experiment as they stream in: the per-run summary scalars,
+    plus the time series folded into per-scheduler cross-run statistics."""
+
+    def __init__(self, scheduler_names):
+        self.summaries = {name: {} for name in scheduler_names}
+        self.series = {name: SeriesAggregator() for name in scheduler_names}
+        # Series waiting for an earlier run, and the next run to fold in, per scheduler.
+        self._pending_series = {name: {} for name in scheduler_names}
+        self._next_run = {name: 0 for name in scheduler_names}
+        self.profiles = []
+        self.latencies = {name: {} for name in scheduler_names}
+        self.stop_reason = None
+
+    def add(self, result):
+        name = result['scheduler']
+        self.summaries[name][result['run']] = result['summary']
+        # Series are folded in run order, so the aggregates do not depend on the order
+        # runs finish in (worker count, cache hits, shards).
+        pending = self._pending_series[name]
+        pending[result['run']] = result['series']
+        while self._next_run[name] in pending:
+            self.series[name].add(pending.pop(self._next_run[name]))
+            self._next_run[name] += 1
+        if 'profile' in result:
+            self.profiles.append((result['scheduler'], result['run'], result['profile']))
+        if 'decision_latency' in result:
+            name = result['scheduler']
+            self.latencies[name] = merge_latencies([self.latencies[name], result['decision_latency']])
+
+def precision_columns(run_results, rule):
+    """Per-scheduler mean and confidence interval of every metric, as CSV columns."""
+    columns = {'runs': len(run_results), 'confidence': rule.confidence}
+    for metric in run_results[0]:
+        mean, half_width, relative = rule.interval([run_result[metric] for run_result in run_results])
+        columns[f"{metric} mean"] = mean
+        columns[f"{metric} CI half-width"] = half_width
+        columns[f"{metric} CI relative"] = relative
+    return columns
+
+def write_csv(path, rows):
+    """Writes dict rows with the union of their keys as header (NaN and missing values blank)."""
+    fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames, lineterminator='\n')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: '' if isinstance(v, float) and math.isnan(v) else v for k, v in row.items()})
+
+def save_experiment_results(exp_name, accumulator, scheduler_names, output_root, plots, rule, store=None,
+                            params=None):
+    output_directory = os.path.join(output_root, exp_name)
+
+    all_runs_summary = {name: [accumulator.summaries[name][run] for run in sorted(accumulator.summaries[name])]
+                        for name in scheduler_names}
+
+    # --- SAVE NUMERICAL RESULTS TO CSV ---
+    summary_df_data = []
+    for scheduler_name, run_results in all_runs_summary.items():
+        # The achieved precision is the same for all of a scheduler's rows.
+        precision = precision_columns(run_results, rule)
+        if accumulator.stop_reason is not None:
+            precision['stop reason'] = accumulator.stop_reason
+        for i, run_result in enumerate(run_results):
+            row = {'scheduler': scheduler_name, 'run': i + 1}
+            row.update(run_result)
+            row.update(precision)
+            summary_df_data.append(row)
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    write_csv(os.path.join(output_directory, 'summary_results.csv'), summary_df_data)
+    print(f"  > Saved numerical summary to {os.path.join(output_directory, 'summary_results.csv')}")
+    if store is not None:
+        store.write(exp_name, params, [{'scheduler': name, 'run': i + 1, **run_result}
+                                       for name, run_results in all_runs_summary.items()
+                                       for i, run_result in enumerate(run_results)])
+
+    write_csv(os.path.join(output_directory, 'timeseries_summary.csv'),
+              [{'scheduler': name, **row} for name in scheduler_names for row in accumulator.series[name].rows()])
+
+    if accumulator.profiles:
+        write_csv(os.path.join(output_directory, 'profile_report.csv'),
+                  [{'scheduler': name, 'run': run + 1, **flatten_profile(profile)}
+                   for name, run, profile in sorted(accumulator.profiles, key=lambda p: p[:2])])
+
+    if any(accumulator.latencies.values()):
+        write_csv(os.path.join(output_directory, 'decision_latency.csv'),
+                  [{'scheduler': name, **row} for name in scheduler_names
+                   for row in latency_rows(accumulator.latencies[name])])
+
+    # --- GENERATE PLOTS FOR THIS EXPERIMENT ---
+    if plots is None:
+        return
+    plots.submit(all_runs_summary, {name: accumulator.series[name].mean_series() for name in scheduler_names},
+                 default_config.MOVING_AVERAGE_WINDOW, output_directory)
+    print(f"--- Plots for '{exp_name}' queued for '{output_directory}' ---")
+
+def experiment_matrix(core_levels, load_names, threat_names, workload_trace=None):
     experiments = []
     for cores in core_levels:
-        for load_name, load_val in load_levels.items():
-            for threat_name, threat_val in threat_levels.items():
+        if workload_trace:
+            # A trace fixes the arrivals and threat labels, so only the machine varies.
+            trace_name = os.path.splitext(os.path.basename(workload_trace))[0]
+            experiments.append({
+                'name': f"cores_{cores}_trace_{trace_name}",
+                'NUM_CORES': cores,
+                'WORKLOAD_TRACE': os.path.abspath(workload_trace),
+            })
+            continue
+        for load_name in load_names:
+            for threat_name in threat_names:
                 exp_name = f"cores_{cores}_load_{load_name}_threat_{threat_name}"
                 experiments.append({
                     'name': exp_name,
                     'NUM_CORES': cores,
-                    'TASK_ARRIVAL_RATE': load_val,
-                    'THREAT_PROBABILITY': threat_val,
+                    'TASK_ARRIVAL_RATE': LOAD_LEVELS[load_name],
+                    'THREAT_PROBABILITY': THREAT_LEVELS[threat_name],
                 })
+    return experiments
+
+def plot_pool(args):
+    if args.no_plots:
+        return contextlib.nullcontext()
+    # matplotlib is only imported when plots are made.
+    from utils.plotter import PlotPool
+    return PlotPool(args.plot_workers)
+
+def run_shard(args, configs, scenario_params, units, scheduler_names, rule, cache):
+    """Runs this host's shard of the sweep's units and writes their results, described by the sweep, to --shard-dir."""
+    index, count = args.shard
+    owned = [unit for unit in units if unit_shard(unit, count) == index]
+    total_runs = sum(len(unit_runs(unit)) for unit in owned)
+    print(f"\n{'='*60}\n--- Shard {index}/{count}: running {total_runs} of "
+          f"{sum(len(unit_runs(unit)) for unit in units)} simulations on {max(args.workers, 1)} worker(s) ---\n{'='*60}")
+    with tqdm(total=total_runs, desc="Simulations", ncols=100, disable=args.headless) as pbar:
+        results = []
+        for result in run_units(owned, args.workers, cache):
+            results.append(result)
+            pbar.update(1)
 
-    scheduler_classes = {
-        "CFSScheduler": CFSScheduler,
-        "PriorityScheduler": PriorityScheduler,
-        "SingleACOScheduler": SingleACOScheduler,
-        "StigmergicSentinelsScheduler": StigmergicSentinelsScheduler,
+    experiments = list(configs.values())
+    meta = {
+        'shard': index,
+        'shards': count,
+        'matrix': matrix_digest(experiments, scheduler_names, args.max_runs, code_version()),
+        'experiments': experiments,
+        'scenarios': scenario_params,
+        'schedulers': scheduler_names,
+        'rule': [rule.min_runs, rule.max_runs, rule.batch, rule.precision, rule.confidence],
+        'units': [list(unit_identity(unit)) for unit in owned],
+        'num_units': len(units),
     }
+    path = shard_path(args.shard_dir, index, count)
+    write_shard(path, meta, results)
+    print(f"\n--- Shard {index}/{count} saved to {path}; run with --merge once all {count} shards are there ---")
 
-    # Main experiment loop
+def merge_shards(args):
+    """Writes the results of the sharded sweep in --shard-dir, exactly as an unsharded run would have."""
+    try:
+        meta, shard_results = read_shards(args.shard_dir)
+    except ValueError as error:
+        raise SystemExit(f"Cannot merge: {error}")
+    scheduler_names = meta['schedulers']
+    rule = StoppingRule(*meta['rule'])
+    results = {config['name']: ExperimentAccumulator(scheduler_names) for config in meta['experiments']}
+    sweep_profile = None
+    sweep_latencies = {name: {} for name in scheduler_names}
+    for result in shard_results:
+        results[result['experiment']].add(result)
+        if 'profile' in result:
+            sweep_profile = merge_profiles([p for p in (sweep_profile, result['profile']) if p])
+        if 'decision_latency' in result:
+            sweep_latencies[result['scheduler']] = merge_latencies([sweep_latencies[result['scheduler']],
+                                                                    result['decision_latency']])
+    print(f"\n--- Merging {len(shard_results)} simulations from {meta['shards']} shard(s) in {args.shard_dir} ---")
+
+    store = ResultsStore(args.results_store or os.path.join(args.output_dir, 'results_store'))
+    with plot_pool(args) as plots:
+        for config in meta['experiments']:
+            exp_name = config['name']
+            print(f"\n--- Experiment '{exp_name}' merged. Processing and saving results... ---")
+            save_experiment_results(exp_name, results.pop(exp_name), scheduler_names, args.output_dir, plots, rule,
+                                    store, meta['scenarios'][exp_name])
+        if plots is not None:
+            print("\n--- Waiting for plot rendering to finish ---")
+
+    if sweep_profile is not None:
+        print(f"\n--- Profile over all runs ---\n{format_profile(sweep_profile)}")
+
+    if any(sweep_latencies.values()):
+        print(f"\n--- Scheduler decision latency over all runs ---\n{format_latencies(sweep_latencies)}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.merge:
+        return merge_shards(args)
+
+    # Generate all experiment configurations
+    experiments = experiment_matrix(args.cores, args.loads, args.threats, args.workload_trace)
+
+    scheduler_names = args.schedulers
+
+    rule = StoppingRule(args.min_runs, args.max_runs, args.batch_runs, args.precision, args.confidence)
+
+    # Every (experiment, run, scheduler) unit is independent and carries its own seed,
+    # so the results do not depend on how many workers execute them.
+    configs = {}
+    scenario_params = {}
+    load_names = {rate: name for name, rate in LOAD_LEVELS.items()}
+    threat_names = {probability: name for name, probability in THREAT_LEVELS.items()}
+    planned_runs = {}
+    units = []
     for experiment_params in experiments:
         current_config = {
-            'NUM_RUNS': default_config.NUM_RUNS,
-            'SIMULATION_DURATION': default_config.SIMULATION_DURATION,
+            'NUM_RUNS': args.max_runs,
+            'SIMULATION_DURATION': args.duration,
+            'ENGINE': args.engine,
+            'SECURITY_MONITOR': args.security_monitor,
+            'THERMAL_TOPOLOGY': args.thermal_topology,
+            'PROGRESS_BAR': args.workers <= 1 and not args.headless,
         }
         current_config.update(experiment_params)
-        
-        exp_name = current_config['name']
-        print(f"\n{'='*60}\n--- Starting Experiment: {exp_name} ---\n{'='*60}")
-
-        all_runs_summary = {name: [] for name in scheduler_classes.keys()}
-        all_runs_metrics_objects = {name: [] for name in scheduler_classes.keys()}
-
-        for i in range(current_config['NUM_RUNS']):
-            print(f"\n--- Experiment '{exp_name}', Run {i + 1}/{current_config['NUM_RUNS']} ---")
-            for name, scheduler_class in scheduler_classes.items():
-                scheduler = scheduler_class(current_config['NUM_CORES'])
-                env = Environment(scheduler, current_config)
-                metrics_obj = env.run()
-                
-                all_runs_summary[name].append(metrics_obj.calculate_results())
-                all_runs_metrics_objects[name].append(metrics_obj)
-        
-        print(f"\n--- Experiment '{exp_name}' complete. Processing and saving results... ---")
-        
-        output_directory = os.path.join('plots', exp_name)
-
-        # --- SAVE NUMERICAL RESULTS TO CSV ---
-        summary_df_data = []
-        for scheduler_name, run_results in all_runs_summary.items():
-            for i, run_result in enumerate(run_results):
-                row = {'scheduler': scheduler_name, 'run': i + 1}
-                row.update(run_result)
-                summary_df_data.append(row)
-        summary_df = pd.DataFrame(summary_df_data)
-        if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
-        summary_df.to_csv(os.path.join(output_directory, 'summary_results.csv'), index=False)
-        print(f"  > Saved numerical summary to {os.path.join(output_directory, 'summary_results.csv')}")
-
-        # --- GENERATE PLOTS FOR THIS EXPERIMENT ---
-        plot_summary_boxplots(all_runs_summary, output_directory)
-        plot_time_series_results(all_runs_metrics_objects, default_config.MOVING_AVERAGE_WINDOW, output_directory)
-        print(f"--- Plots for '{exp_name}' saved to '{output_directory}' ---")
+        if args.warmup:
+            current_config['WARMUP_TICKS'] = args.warmup
+        if args.checkpoint_every:
+            current_config['CHECKPOINT_INTERVAL'] = args.checkpoint_every
+            current_config['CHECKPOINT_DIR'] = args.checkpoint_dir
+        if args.decision_latency:
+            current_config['DECISION_LATENCY'] = True
+        if args.charge_decisions:
+            current_config['CHARGE_DECISION_COST'] = True
+            if args.decision_cost:
+                current_config['DECISION_COST_US'] = args.decision_cost
+        if args.profile:
+            current_config['PROFILE'] = True
+            current_config['PROFILE_TRACE'] = args.profile_trace
+            if args.profile_trace:
+                current_config['PROFILE_TRACE_DIR'] = os.path.join(args.output_dir, experiment_params['name'])
+        exp_name = experiment_params['name']
+        configs[exp_name] = current_config
+        scenario_params[exp_name] = scenario_parameters(
+            current_config, load_names.get(current_config.get('TASK_ARRIVAL_RATE'), ''),
+            threat_names.get(current_config.get('THREAT_PROBABILITY'), ''))
+        planned_runs[exp_name] = rule.min_runs if args.adaptive else args.max_runs
+        units.extend(make_units(current_config, scheduler_names, planned_runs[exp_name]))
+
+    cache = None if args.no_cache or args.profile or args.decision_latency else ResultCache(args.cache_dir)
+    if args.shard:
+        return run_shard(args, configs, scenario_params, units, scheduler_names, rule, cache)
+
+    results = {name: ExperimentAccumulator(scheduler_names) for name in configs}
+    total_runs = sum(len(unit_runs(unit)) for unit in units)
+
+    print(f"\n{'='*60}\n--- Running {total_runs} simulations{' to start with' if args.adaptive else ''} "
+          f"on {max(args.workers, 1)} worker(s) ---\n{'='*60}")
+    store = ResultsStore(args.results_store or os.path.join(args.output_dir, 'results_store'))
+    sweep_profile = None
+    sweep_latencies = {name: {} for name in scheduler_names}
+    with plot_pool(args) as plots, \
+            tqdm(total=total_runs, desc="Simulations", ncols=100, disable=args.headless) as pbar:
+        # Adaptive experiments are extended in waves: a stopping decision is only taken
+        # once all of an experiment's planned runs are in, so it is reproducible.
+        while units:
+            pending = {}
+            for unit in units:
+                pending[unit['experiment']] = pending.get(unit['experiment'], 0) + len(unit_runs(unit))
+            next_units = []
+            for result in run_units(units, args.workers, cache):
+                pbar.update(1)
+                exp_name = result['experiment']
+                results[exp_name].add(result)
+                if 'profile' in result:
+                    sweep_profile = merge_profiles([p for p in (sweep_profile, result['profile']) if p])
+                if 'decision_latency' in result:
+                    sweep_latencies[result['scheduler']] = merge_latencies([sweep_latencies[result['scheduler']],
+                                                                            result['decision_latency']])
+                pending[exp_name] -= 1
+                if pending[exp_name] > 0:
+                    continue
+                if args.adaptive:
+                    results[exp_name].stop_reason = rule.decide(results[exp_name].summaries)
+                    if results[exp_name].stop_reason is None:
+                        first_run = planned_runs[exp_name]
+                        planned_runs[exp_name] = rule.next_runs(first_run)
+                        extension = make_units(configs[exp_name], scheduler_names, planned_runs[exp_name], first_run)
+                        next_units.extend(extension)
+                        pbar.total += sum(len(unit_runs(unit)) for unit in extension)
+                        pbar.refresh()
+                        continue
+                print(f"\n--- Experiment '{exp_name}' complete. Processing and saving results... ---")
+                save_experiment_results(exp_name, results.pop(exp_name), scheduler_names, args.output_dir, plots, rule,
+                                        store, scenario_params[exp_name])
+            units = next_units
+        if plots is not None:
+            print("\n--- Waiting for plot rendering to finish ---")
+
+    if args.adaptive:
+        used, budget = sum(planned_runs.values()), rule.max_runs * len(planned_runs)
+        print(f"\n--- Adaptive stopping ran {used} of {budget} runs per scheduler ({used / budget:.0%}) ---")
+
+    if sweep_profile is not None:
+        print(f"\n--- Profile over all runs ---\n{format_profile(sweep_profile)}")
+
+    if args.decision_latency:
+        print(f"\n--- Scheduler decision latency over all runs ---\n{format_latencies(sweep_latencies)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
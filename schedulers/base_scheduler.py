@@ -1,16 +1,110 @@
 # schedulers/base_scheduler.py
 from abc import ABC, abstractmethod
+import numpy as np
+from .ready_queue import FIFOReadyQueue, HeapReadyQueue
+
+def decayed_burst_rewards(remaining_bursts, ticks, keep):
+    """sum_{j=1..ticks} keep**(ticks-j) / (remaining - j + 1) for each running task.
+
+    The reward a busy core deposits while its task's remaining burst counts down,
+    evaporated by `keep` per tick, as used by the closed-form advance() paths.
+    `ticks` may also be an array with a tick count per task.
+    """
+    remaining_bursts = np.asarray(remaining_bursts, dtype=float)
+    if np.ndim(ticks):
+        j = np.arange(1, np.max(ticks, initial=0) + 1)
+        gap = ticks[:, None] - j
+        counted = gap >= 0
+        rewards = keep ** np.where(counted, gap, 0) / np.where(counted, remaining_bursts[:, None] - j + 1, 1.0)
+        return np.where(counted, rewards, 0.0).sum(axis=1)
+    j = np.arange(1, ticks + 1)
+    weights = keep ** (ticks - j)
+    return (1.0 / (remaining_bursts[:, None] - j + 1)) @ weights
+
+def sample_core_order(weights, available):
+    """Order in which sequential weighted draws without replacement pick cores.
+
+    Works along the last axis (Gumbel-top-k), so a leading replica axis is sampled
+    in one call. Available cores with positive weight come first; if those run
+    out, the remaining available cores follow in uniformly random order, which
+    mirrors the uniform fallback of the per-task draws. Unavailable cores last.
+    """
+    with np.errstate(divide='ignore'):
+        keys = np.log(weights) + np.random.gumbel(size=weights.shape)
+    positive = available & (weights > 0)
+    tier = np.where(positive, 0, np.where(available, 1, 2))
+    keys = np.where(positive, keys, np.random.gumbel(size=weights.shape))
+    return np.lexsort((-keys, tier), axis=-1)
 
 class BaseScheduler(ABC):
-    def __init__(self, num_cores):
+    # Task attribute the ready queue is served in ascending order of (None: FIFO).
+    queue_key = None
+    # Constructor keyword of each tunable parameter -> its config.py name.
+    config_parameters = {}
+    # Simulated cost of one dispatch decision in microseconds: (fixed, per core scanned, per queued task).
+    decision_cost_us = (1.0, 0.0, 0.0)
+
+    def __init__(self, num_cores, replicas=None):
         self.num_cores = num_cores
+        self.replicas = replicas
+        self.shape = (num_cores,) if replicas is None else (replicas, num_cores)
+        self.ready_queue = self.make_ready_queue()
+
+    @classmethod
+    def from_config(cls, num_cores, config, replicas=None):
+        """Built with the parameters `config` overrides, the config.py defaults otherwise."""
+        return cls(num_cores, replicas, **{arg: config[name] for arg, name in cls.config_parameters.items()
+                                           if name in config})
+
+    def make_ready_queue(self):
+        return FIFOReadyQueue() if self.queue_key is None else HeapReadyQueue(self.queue_key)
+
+    def enqueue(self, task):
+        self.ready_queue.push(task)
+
+    def cores_scanned(self):
+        """Cores a dispatch decision looks at, for the decision cost model."""
+        return self.num_cores
+
+    def decision_cost(self, queue_length, cost_us=None):
+        """Microseconds one dispatch decision costs with `queue_length` queued tasks."""
+        fixed, per_core, per_queued = cost_us or self.decision_cost_us
+        return fixed + per_core * self.cores_scanned() + per_queued * queue_length
+
+    def pheromones(self):
+        """Name -> the scheduler's live pheromone array, for observers; none by default."""
+        return {}
 
     @abstractmethod
     def schedule(self, tasks, cores, current_time):
+        """Dispatches tasks from the ready queue `tasks` onto idle `cores`."""
         pass
 
     def update(self, cores, current_time):
         pass
+
+    def core_weights(self, temperature):
+        """Relative preference for dispatching to each core, or None to fill the
+        idle cores in id order."""
+        return None
+
+    def deposit(self, temperature, busy, remaining, detected, active=None):
+        """Array form of update(): one tick of evaporation and deposit.
+
+        All arguments share the shape of the pheromone state, so they may carry
+        a leading replica axis; `active` then restricts the tick to a boolean
+        subset of replicas.
+        """
+        pass
+
+    def advance(self, cores, current_time, ticks, thermal_model):
+        """Closed-form equivalent of `ticks` update() calls after `current_time`
+        during which no task arrives, completes or is detected.
+
+        Used by the event-driven engine. Schedulers whose update() keeps state
+        must override this; the state of `cores` is the one before those ticks.
+        """
+        pass
         
     def __str__(self):
         # A simple way to get a clean name for the progress bar
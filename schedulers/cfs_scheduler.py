@@ -2,16 +2,11 @@
 from .base_scheduler import BaseScheduler
 
 class CFSScheduler(BaseScheduler):
-    def schedule(self, tasks, cores, current_time):
-        idle_cores = [core for core in cores if core.is_idle()]
-        if not tasks or not idle_cores:
-            return
-
-        sorted_tasks = sorted(tasks, key=lambda t: t.vruntime)
+    queue_key = 'vruntime'
+    decision_cost_us = (1.5, 0.0, 0.0)
 
-        for task in sorted_tasks:
-            if not idle_cores:
+    def schedule(self, tasks, cores, current_time):
+        for core_id in cores.idle_ids():
+            if not tasks:
                 break
-            core = idle_cores.pop(0)
-            core.current_task = task
-            tasks.remove(task)
\ No newline at end of file
+            cores.assign(core_id, tasks.pop())
\ No newline at end of file
@@ -0,0 +1,223 @@
+# schedulers/hierarchical_sentinel.py
+import numpy as np
+from .base_scheduler import decayed_burst_rewards
+from .stigmergic_sentinel import StigmergicSentinelsScheduler
+from config import HIERARCHY_DOMAIN_SIZE
+
+def _ranks(values):
+    """values[i]'s rank among the earlier entries equal to it (0 for the first of each value)."""
+    order = np.argsort(values, kind='stable')
+    first = np.searchsorted(values[order], values[order], side='left')
+    ranks = np.empty_like(order)
+    ranks[order] = np.arange(len(values)) - first
+    return ranks
+
+class HierarchicalSentinelsScheduler(StigmergicSentinelsScheduler):
+    """Stigmergic Sentinels over cores partitioned into domains (NUMA nodes, clusters).
+
+    Cores [d * domain_size, (d + 1) * domain_size) form domain d, whose slice of
+    the four per-core pheromones is its local state. A coarse layer keeps three
+    pheromones per domain, fed by the domain's mean threat, temperature and
+    load. Each tick's dispatches first draw their domains from the coarse
+    layer, which steers work away from domains holding detected threats, then
+    cores inside those domains from the local pheromones.
+
+    The pheromones are kept lazily: a core's are brought up to date, in closed
+    form, only when its task changes or its domain is drawn, so a tick costs
+    O(domains + cores touched) pheromone updates instead of O(cores). Between
+    those points a core's temperature is taken to stay at its latest value.
+    The array interface (deposit(), core_weights() over all cores) used by the
+    ensemble engine stays eager.
+    """
+
+    config_parameters = {**StigmergicSentinelsScheduler.config_parameters, 'domain_size': 'HIERARCHY_DOMAIN_SIZE'}
+
+    def __init__(self, num_cores, replicas=None, domain_size=HIERARCHY_DOMAIN_SIZE, **pheromone_parameters):
+        super().__init__(num_cores, replicas, **pheromone_parameters)
+        self.domain_size = min(domain_size, num_cores)
+        self.domain_starts = np.arange(0, num_cores, self.domain_size)
+        self.domain_sizes = np.diff(np.append(self.domain_starts, num_cores))
+        self.domain_of = np.arange(num_cores) // self.domain_size
+        domains_shape = self.shape[:-1] + (len(self.domain_starts),)
+        self.domain_threat = np.zeros(domains_shape)
+        self.domain_env = np.ones(domains_shape)
+        self.domain_load = np.ones(domains_shape)
+
+        # Lazy state: the tick each core's (and domain's) pheromones are current
+        # at, and what the core was running then; None until the first tick.
+        self._time = None
+        self._cores = None
+        self._synced = np.zeros(num_cores, dtype=np.int64)
+        self._task_index = np.full(num_cores, -1, dtype=np.int64)
+        self._detected = np.zeros(num_cores, dtype=bool)
+        self._remaining = np.zeros(num_cores, dtype=np.int64)
+        self._domain_synced = np.zeros(len(self.domain_starts), dtype=np.int64)
+        self._domain_env_synced = 0
+        self._domain_busy = np.zeros(len(self.domain_starts), dtype=np.int64)
+        self._domain_threats = np.zeros(len(self.domain_starts), dtype=np.int64)
+
+    def domain_mean(self, values):
+        """Per-domain mean of a per-core array (along the last axis)."""
+        return np.add.reduceat(np.asarray(values, dtype=float), self.domain_starts, axis=-1) / self.domain_sizes
+
+    def cores_scanned(self):
+        return len(self.domain_starts) + self.domain_size
+
+    def pheromones(self):
+        if self._cores is not None:
+            self._sync_cores(np.arange(self.num_cores), self._time, self._cores.temperature)
+            self._sync_domains(np.arange(len(self.domain_starts)), self._time)
+            self._sync_domain_env(self._time, self._cores.temperature)
+        return {**super().pheromones(), 'domain_threat': self.domain_threat, 'domain_env': self.domain_env,
+                'domain_load': self.domain_load}
+
+    def domain_weights(self):
+        return 1.0 / (((self.domain_threat + 1e-5) ** self.gamma) * ((self.domain_env + 1e-5) ** self.delta) *
+                      ((self.domain_load + 1e-5) ** self.epsilon))
+
+    def _draw_domains(self, count, capacity):
+        """Domains for `count` sequential dispatches, each into a domain with an idle core left.
+
+        An exponential race: domain d's dispatches arrive after successive
+        Exp(weight_d) gaps, one per idle core it has, and the first `count`
+        arrivals have the distribution of drawing one domain at a time among
+        those still open (uniformly among the open ones once no domain of
+        positive weight is left).
+        """
+        weights = self.domain_weights()
+        domains = np.repeat(np.arange(len(capacity)), capacity)
+        positive = weights[domains] > 0
+        times = np.cumsum(np.random.exponential(size=len(domains)) / np.where(positive, weights[domains], 1.0))
+        # Restart the running sum at each domain.
+        times -= np.repeat(np.concatenate(([0.0], times))[np.cumsum(capacity) - capacity], capacity)
+        return domains[np.lexsort((times, ~positive))[:count]]
+
+    def _start(self, current_time):
+        if self._time is None:
+            self._time = self._domain_env_synced = current_time - 1
+            self._synced[:] = self._domain_synced[:] = current_time - 1
+
+    def schedule(self, tasks, cores, current_time):
+        idle = ~cores.busy
+        slots = self.schedulable_slots(tasks, int(np.count_nonzero(idle)))
+        if not len(slots):
+            return
+        self._start(current_time)
+        now = current_time - 1
+
+        self._sync_domains(np.arange(len(self.domain_starts)), now)
+        self._sync_domain_env(now, cores.temperature)
+        draws = self._draw_domains(len(slots), np.add.reduceat(idle.astype(int), self.domain_starts))
+
+        # One Gumbel-top-k draw over the cores of the drawn domains, ordered within each domain.
+        domains = np.unique(draws)
+        sizes = self.domain_sizes[domains]
+        offsets = np.cumsum(sizes) - sizes
+        core_ids = np.repeat(self.domain_starts[domains] - offsets, sizes) + np.arange(sizes.sum())
+        self._sync_cores(core_ids, now, cores.temperature)
+        weights = self.core_weights(cores.temperature, core_ids)
+        with np.errstate(divide='ignore'):
+            keys = np.log(weights) + np.random.gumbel(size=weights.shape)
+        available = idle[core_ids]
+        positive = available & (weights > 0)
+        tier = np.where(positive, 0, np.where(available, 1, 2))
+        keys = np.where(positive, keys, np.random.gumbel(size=weights.shape))
+        ranked = core_ids[np.lexsort((-keys, tier, self.domain_of[core_ids]))]
+        targets = ranked[offsets[np.searchsorted(domains, draws)] + _ranks(draws)]
+
+        if cores.table is tasks.table:
+            tasks.remove_slots(slots)
+            cores.assign_slots(targets, slots)
+            return
+        for slot, core_id in zip(slots, targets):
+            task = tasks.table.task(slot)
+            tasks.remove(task)
+            cores.assign(core_id, task)
+
+    def update(self, cores, current_time):
+        self._start(current_time)
+        self._cores = cores
+        self._time = current_time
+        detected = cores.busy & cores.table.detected_malicious[cores.task_slot]
+        touched = np.flatnonzero((cores.task_index != self._task_index) | (detected != self._detected))
+        if not len(touched):
+            return
+
+        # Up to the previous tick on what the cores ran before; from this tick on what they run now.
+        now = current_time - 1
+        self._sync_cores(touched, now, cores.temperature)
+        domains = self.domain_of[touched]
+        self._sync_domains(np.unique(domains), now)
+        busy = cores.busy[touched]
+        was_busy = self._task_index[touched] >= 0
+        np.add.at(self._domain_busy, domains, busy.astype(np.int64) - was_busy)
+        np.add.at(self._domain_threats, domains,
+                  detected[touched].astype(np.int64) - (was_busy & self._detected[touched]))
+        self._task_index[touched] = cores.task_index[touched]
+        self._detected[touched] = detected[touched]
+        # The burst left before this tick ran.
+        self._remaining[touched] = np.where(busy, cores.table.remaining_burst[cores.task_slot[touched]] + 1, 0)
+
+    def advance(self, cores, current_time, ticks, thermal_model):
+        # Nothing changes in the skipped ticks, which the lazy updates already cover.
+        self._start(current_time)
+        self._cores = cores
+        self._time = current_time + ticks
+
+    def _sync_cores(self, core_ids, time, temperature):
+        """Brings the pheromones of `core_ids` up to tick `time`, running what they ran when last synced."""
+        ticks = time - self._synced[core_ids]
+        keep_t, keep_e, keep_c = 1 - self.rho_t, 1 - self.rho_e, 1 - self.rho_c
+        busy = self._task_index[core_ids] >= 0
+        threat = busy & self._detected[core_ids]
+
+        self.attractive_pheromone[core_ids] *= keep_c ** ticks
+        self.threat_pheromone[core_ids] *= keep_t ** ticks
+        self.contention_pheromone[core_ids] *= keep_c ** ticks
+        self.env_pheromone[core_ids] = (keep_e ** ticks * self.env_pheromone[core_ids] +
+                                        (1 - keep_e ** ticks) * temperature[core_ids])
+        self.threat_pheromone[core_ids] += np.where(threat, self.rho_t * 100 * (1 - keep_t ** ticks) / (1 - keep_t), 0.0)
+        self.contention_pheromone[core_ids] += np.where(busy, self.rho_c * (1 - keep_c ** ticks) / (1 - keep_c), 0.0)
+        busy_ids = core_ids[busy]
+        if len(busy_ids):
+            self.attractive_pheromone[busy_ids] += self.rho_c * decayed_burst_rewards(
+                self._remaining[busy_ids], ticks[busy], keep_c)
+            self._remaining[busy_ids] -= ticks[busy]
+        self._synced[core_ids] = time
+
+    def _sync_domains(self, domains, time):
+        """Brings the threat and load pheromones of `domains` up to tick `time` at their cores' synced state."""
+        ticks = time - self._domain_synced[domains]
+        keep_t, keep_c = 1 - self.rho_t, 1 - self.rho_c
+        sizes = self.domain_sizes[domains]
+        self.domain_threat[domains] = (keep_t ** ticks * self.domain_threat[domains] + self.rho_t * 100 *
+                                       self._domain_threats[domains] / sizes * (1 - keep_t ** ticks) / (1 - keep_t))
+        self.domain_load[domains] = (keep_c ** ticks * self.domain_load[domains] + self.rho_c *
+                                     self._domain_busy[domains] / sizes * (1 - keep_c ** ticks) / (1 - keep_c))
+        self._domain_synced[domains] = time
+
+    def _sync_domain_env(self, time, temperature):
+        keep = (1 - self.rho_e) ** (time - self._domain_env_synced)
+        # In place: pheromones() and state samples hand out this array.
+        self.domain_env *= keep
+        self.domain_env += (1 - keep) * self.domain_mean(temperature)
+        self._domain_env_synced = time
+
+    def core_weights(self, temperature, index=Ellipsis):
+        local = super().core_weights(temperature, index)
+        if index is not Ellipsis:
+            return local
+        # Array interface (ensemble engine): one draw over all cores with each core's
+        # chance split as P(domain) * P(core | domain), taking every core as idle.
+        domain_share = self.domain_weights() / np.add.reduceat(local, self.domain_starts, axis=-1)
+        return local * domain_share[..., self.domain_of]
+
+    def deposit(self, temperature, busy, remaining, detected, active=None):
+        super().deposit(temperature, busy, remaining, detected, active)
+        sel = Ellipsis if active is None else active
+        busy = busy[sel]
+        # One reduction for all three domain aggregates.
+        threat, env, load = self.domain_mean(np.stack((busy & detected[sel], temperature[sel], busy)))
+        self.domain_threat[sel] = self.domain_threat[sel] * (1 - self.rho_t) + self.rho_t * 100 * threat
+        self.domain_env[sel] = self.domain_env[sel] * (1 - self.rho_e) + self.rho_e * env
+        self.domain_load[sel] = self.domain_load[sel] * (1 - self.rho_c) + self.rho_c * load
\ No newline at end of file
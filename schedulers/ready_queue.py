@@ -0,0 +1,126 @@
+# schedulers/ready_queue.py
+import heapq
+import itertools
+from collections import deque
+
+import numpy as np
+
+from simulation.task import TaskTable
+
+class FIFOReadyQueue:
+    """Ready queue served in arrival order.
+
+    Holds the tasks' slots in `table` (the environment's TaskTable); a pushed
+    task from another table is moved into it. push/pop/peek/remove take and
+    return Task views, slots() gives the queue as a slot array for vectorized
+    scans. Tasks are removed from the head in O(1), elsewhere in O(n).
+    """
+
+    def __init__(self, table=None):
+        self.table = TaskTable() if table is None else table
+        self._slots = deque()
+
+    def push(self, task):
+        self._slots.append(self.table.adopt(task))
+
+    def peek(self):
+        return self.table.task(self._slots[0])
+
+    def pop(self):
+        return self.table.task(self._slots.popleft())
+
+    def remove(self, task):
+        if self._slots[0] == task.slot:
+            self._slots.popleft()
+        else:
+            self._slots.remove(task.slot)
+
+    def remove_slots(self, slots):
+        """Removes the queued tasks in `slots` at once, in one pass over the queue up to the last of them."""
+        window = len(slots)
+        while True:
+            head = self.slots(window)
+            removed = np.isin(head, slots)
+            if np.count_nonzero(removed) == len(slots) or len(head) < window:
+                break
+            window *= 2
+        end = np.flatnonzero(removed)[-1] + 1
+        for _ in itertools.repeat(None, end):
+            self._slots.popleft()
+        self._slots.extendleft(reversed(head[:end][~removed[:end]].tolist()))
+
+    def slots(self, count=None):
+        """Slots of the first `count` (all by default) queued tasks, in queue order."""
+        count = len(self._slots) if count is None else min(count, len(self._slots))
+        return np.fromiter(itertools.islice(self._slots, count), dtype=np.int64, count=count)
+
+    def __iter__(self):
+        return (self.table.task(slot) for slot in self._slots)
+
+    def __len__(self):
+        return len(self._slots)
+
+class HeapReadyQueue:
+    """Binary heap of tasks ordered by the `key` column, ties broken by arrival order.
+
+    The key must not change while a task is queued. remove() is lazy: the
+    entry is only marked dead (by its push order, which stays unique when a
+    table slot is reused) and skipped once it reaches the top; the heap is
+    compacted when dead entries outnumber live ones. Otherwise as FIFOReadyQueue.
+    """
+
+    def __init__(self, key, table=None):
+        self.key = key
+        self.table = TaskTable() if table is None else table
+        self._heap = []
+        self._order = itertools.count()
+        # Slot of every queued task -> push order of its live entry; push orders of removed entries.
+        self._entry_of = {}
+        self._dead = set()
+
+    def push(self, task):
+        slot = self.table.adopt(task)
+        order = next(self._order)
+        self._entry_of[slot] = order
+        heapq.heappush(self._heap, (getattr(self.table, self.key).item(slot), order, slot))
+
+    def _prune(self):
+        while self._heap and self._heap[0][1] in self._dead:
+            self._dead.discard(heapq.heappop(self._heap)[1])
+
+    def peek(self):
+        self._prune()
+        return self.table.task(self._heap[0][2])
+
+    def pop(self):
+        self._prune()
+        _, _, slot = heapq.heappop(self._heap)
+        del self._entry_of[slot]
+        return self.table.task(slot)
+
+    def remove(self, task):
+        self.remove_slots((task.slot,))
+
+    def remove_slots(self, slots):
+        """Removes the queued tasks in `slots` at once."""
+        for slot in slots:
+            self._dead.add(self._entry_of.pop(int(slot)))
+        self._prune()
+        if len(self._dead) > len(self._entry_of):
+            self._heap = [entry for entry in self._heap if entry[1] not in self._dead]
+            heapq.heapify(self._heap)
+            self._dead.clear()
+
+    def _live(self):
+        return (entry for entry in self._heap if entry[1] not in self._dead) if self._dead else iter(self._heap)
+
+    def slots(self, count=None):
+        """Slots of `count` (all by default) queued tasks, in heap (not priority) order."""
+        return np.array([slot for _, _, slot in itertools.islice(self._live(), count)], dtype=np.int64)
+
+    def __iter__(self):
+        """Live tasks in heap (not priority) order."""
+        return (self.table.task(slot) for _, _, slot in self._live())
+
+    def __len__(self):
+        return len(self._entry_of)
\ No newline at end of file
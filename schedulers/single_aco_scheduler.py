@@ -1,41 +1,51 @@
 # schedulers/single_aco_scheduler.py
 import numpy as np
-from .base_scheduler import BaseScheduler
+from .base_scheduler import BaseScheduler, decayed_burst_rewards, sample_core_order
 from config import RHO_SINGLE_ACO, ALPHA_SINGLE_ACO, BETA_SINGLE_ACO
 
 class SingleACOScheduler(BaseScheduler):
-    def __init__(self, num_cores):
-        super().__init__(num_cores)
-        self.performance_pheromone = np.ones(num_cores)
+    config_parameters = {'rho': 'RHO_SINGLE_ACO', 'alpha': 'ALPHA_SINGLE_ACO', 'beta': 'BETA_SINGLE_ACO'}
+    # One pheromone weighed per core.
+    decision_cost_us = (2.0, 0.05, 0.0)
+
+    def __init__(self, num_cores, replicas=None, rho=RHO_SINGLE_ACO, alpha=ALPHA_SINGLE_ACO, beta=BETA_SINGLE_ACO):
+        super().__init__(num_cores, replicas)
+        self.rho = rho
+        self.alpha = alpha
+        self.beta = beta
+        self.performance_pheromone = np.ones(self.shape)
 
     def schedule(self, tasks, cores, current_time):
-        idle_cores = [core for core in cores if core.is_idle()]
-        if not tasks or not idle_cores:
+        idle = ~cores.busy
+        count = min(len(tasks), int(np.count_nonzero(idle)))
+        if count == 0:
             return
 
-        for task in tasks[:]:
-            if not idle_cores:
-                break
-
-            idle_core_ids = [c.id for c in idle_cores]
-            pheromones = self.performance_pheromone[idle_core_ids]
-            heuristics = np.array([1.0 / (c.temperature + 1e-5) for c in idle_cores])
-            
-            probabilities = (pheromones ** ALPHA_SINGLE_ACO) * (heuristics ** BETA_SINGLE_ACO)
-            if np.sum(probabilities) == 0:
-                probabilities = np.ones_like(probabilities)
-            
-            probabilities /= np.sum(probabilities)
-
-            chosen_core_idx = np.random.choice(len(idle_cores), p=probabilities)
-            chosen_core = idle_cores.pop(chosen_core_idx)
-            
-            chosen_core.current_task = task
-            tasks.remove(task)
-            
+        # Per-core scores do not change within a tick, so every dispatch is drawn at once.
+        core_order = sample_core_order(self.core_weights(cores.temperature), idle)
+        for core_id in core_order[:count]:
+            cores.assign(core_id, tasks.pop())
+
+    def pheromones(self):
+        return {'performance': self.performance_pheromone}
+
     def update(self, cores, current_time):
-        self.performance_pheromone *= (1 - RHO_SINGLE_ACO)
-        for core in cores:
-            if not core.is_idle():
-                reward = 1.0 / (core.current_task.remaining_burst + 1)
-                self.performance_pheromone[core.id] += reward
\ No newline at end of file
+        self.deposit(cores.temperature, cores.busy, cores.task_attribute('remaining_burst'),
+                     cores.task_attribute('detected_malicious', dtype=bool))
+
+    def core_weights(self, temperature):
+        return (self.performance_pheromone ** self.alpha) * ((1.0 / (temperature + 1e-5)) ** self.beta)
+
+    def deposit(self, temperature, busy, remaining, detected, active=None):
+        sel = Ellipsis if active is None else active
+        pheromone = self.performance_pheromone[sel] * (1 - self.rho)
+        pheromone += np.where(busy[sel], 1.0 / (remaining[sel] + 1), 0.0)
+        self.performance_pheromone[sel] = pheromone
+
+    def advance(self, cores, current_time, ticks, thermal_model):
+        keep = 1 - self.rho
+        self.performance_pheromone *= keep ** ticks
+        busy_ids = cores.busy_ids()
+        if len(busy_ids):
+            remaining = cores.table.remaining_burst[cores.task_slot[busy_ids]]
+            self.performance_pheromone[busy_ids] += decayed_burst_rewards(remaining, ticks, keep)
\ No newline at end of file
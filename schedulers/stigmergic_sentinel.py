@@ -1,63 +1,110 @@
 # schedulers/stigmergic_sentinel.py
 import numpy as np
-from .base_scheduler import BaseScheduler
+from .base_scheduler import BaseScheduler, decayed_burst_rewards, sample_core_order
 from config import (RHO_T, RHO_E, RHO_C, ALPHA, BETA, GAMMA, DELTA, EPSILON)
 
 class StigmergicSentinelsScheduler(BaseScheduler):
-    def __init__(self, num_cores):
-        super().__init__(num_cores)
-        self.attractive_pheromone = np.ones(num_cores)
-        self.threat_pheromone = np.zeros(num_cores)
-        self.env_pheromone = np.ones(num_cores)
-        self.contention_pheromone = np.ones(num_cores)
+    config_parameters = {'rho_t': 'RHO_T', 'rho_e': 'RHO_E', 'rho_c': 'RHO_C', 'alpha': 'ALPHA', 'beta': 'BETA',
+                         'gamma': 'GAMMA', 'delta': 'DELTA', 'epsilon': 'EPSILON'}
+    # Four pheromones weighed per core.
+    decision_cost_us = (4.0, 0.2, 0.0)
 
-    def schedule(self, tasks, cores, current_time):
-        idle_cores = [core for core in cores if core.is_idle()]
-        schedulable_tasks = [t for t in tasks if not t.detected_malicious]
+    def __init__(self, num_cores, replicas=None, rho_t=RHO_T, rho_e=RHO_E, rho_c=RHO_C,
+                 alpha=ALPHA, beta=BETA, gamma=GAMMA, delta=DELTA, epsilon=EPSILON):
+        super().__init__(num_cores, replicas)
+        self.rho_t, self.rho_e, self.rho_c = rho_t, rho_e, rho_c
+        # beta weights the task heuristic, which cancels out of the core choice (see core_weights).
+        self.alpha, self.beta, self.gamma, self.delta, self.epsilon = alpha, beta, gamma, delta, epsilon
+        self.attractive_pheromone = np.ones(self.shape)
+        self.threat_pheromone = np.zeros(self.shape)
+        self.env_pheromone = np.ones(self.shape)
+        self.contention_pheromone = np.ones(self.shape)
+
+    @staticmethod
+    def schedulable_slots(tasks, limit):
+        """Slots of up to `limit` queued tasks not yet flagged as malicious, in queue order."""
+        if not limit:
+            return np.empty(0, dtype=np.int64)
+        # Scan a window of the queue head, widened only while flagged tasks leave it short.
+        window = limit
+        while True:
+            slots = tasks.slots(window)
+            schedulable = slots[~tasks.table.detected_malicious[slots]]
+            if len(schedulable) >= limit or len(slots) < window:
+                return schedulable[:limit]
+            window *= 2
 
-        if not schedulable_tasks or not idle_cores:
+    @classmethod
+    def schedulable_tasks(cls, tasks, limit):
+        """Views of the tasks schedulable_slots() picks."""
+        return [tasks.table.task(slot) for slot in cls.schedulable_slots(tasks, limit)]
+
+    def schedule(self, tasks, cores, current_time):
+        idle = ~cores.busy
+        schedulable_tasks = self.schedulable_tasks(tasks, int(np.count_nonzero(idle)))
+        if not schedulable_tasks:
             return
 
-        for task in schedulable_tasks[:]:
-            if not idle_cores:
-                break
-            
-            idle_core_ids = [c.id for c in idle_cores]
-            attr_ph = self.attractive_pheromone[idle_core_ids]
-            heuristic = 1.0 / (task.remaining_burst + 1e-5)
-            threat_ph = self.threat_pheromone[idle_core_ids]
-            env_ph = self.env_pheromone[idle_core_ids]
-            cont_ph = self.contention_pheromone[idle_core_ids]
-            
-            numerator = (attr_ph ** ALPHA) * (heuristic ** BETA)
-            denominator = ((threat_ph + 1e-5) ** GAMMA) * \
-                          ((env_ph + 1e-5) ** DELTA) * \
-                          ((cont_ph + 1e-5) ** EPSILON)
-            
-            probabilities = numerator / denominator
-            
-            if np.sum(probabilities) <= 0:
-                probabilities = np.ones_like(probabilities)
-            
-            probabilities /= np.sum(probabilities)
-
-            chosen_core_idx = np.random.choice(len(idle_cores), p=probabilities)
-            chosen_core = idle_cores.pop(chosen_core_idx)
-            
-            chosen_core.current_task = task
+        # Per-core scores do not change within a tick, so every dispatch is drawn at once.
+        core_order = sample_core_order(self.core_weights(cores.temperature), idle)
+        for task, core_id in zip(schedulable_tasks, core_order):
             tasks.remove(task)
+            cores.assign(core_id, task)
 
     def update(self, cores, current_time):
-        self.attractive_pheromone *= (1 - RHO_C)
-        self.threat_pheromone *= (1 - RHO_T)
-        self.env_pheromone *= (1 - RHO_E)
-        self.contention_pheromone *= (1 - RHO_C)
-
-        for core in cores:
-            self.env_pheromone[core.id] += RHO_E * core.temperature
-            if not core.is_idle():
-                task = core.current_task
-                if task.detected_malicious:
-                    self.threat_pheromone[core.id] += RHO_T * 100
-                self.contention_pheromone[core.id] += RHO_C
-                self.attractive_pheromone[core.id] += RHO_C / (task.remaining_burst + 1)
\ No newline at end of file
+        self.deposit(cores.temperature, cores.busy, cores.task_attribute('remaining_burst'),
+                     cores.task_attribute('detected_malicious', dtype=bool))
+
+    def core_weights(self, temperature, index=Ellipsis):
+        """Dispatch weights of the cores selected by `index` (all by default)."""
+        # The task heuristic (1 / remaining burst) is the same factor for every
+        # core, so it cancels once the weights are normalised into probabilities.
+        return (self.attractive_pheromone[index] ** self.alpha) / (
+            ((self.threat_pheromone[index] + 1e-5) ** self.gamma) *
+            ((self.env_pheromone[index] + 1e-5) ** self.delta) *
+            ((self.contention_pheromone[index] + 1e-5) ** self.epsilon))
+
+    def deposit(self, temperature, busy, remaining, detected, active=None):
+        sel = Ellipsis if active is None else active
+        busy = busy[sel]
+        attractive = self.attractive_pheromone[sel] * (1 - self.rho_c)
+        threat = self.threat_pheromone[sel] * (1 - self.rho_t)
+        env = self.env_pheromone[sel] * (1 - self.rho_e)
+        contention = self.contention_pheromone[sel] * (1 - self.rho_c)
+
+        env += self.rho_e * temperature[sel]
+        threat += np.where(busy & detected[sel], self.rho_t * 100, 0.0)
+        contention += np.where(busy, self.rho_c, 0.0)
+        attractive += np.where(busy, self.rho_c / (remaining[sel] + 1), 0.0)
+
+        self.attractive_pheromone[sel] = attractive
+        self.threat_pheromone[sel] = threat
+        self.env_pheromone[sel] = env
+        self.contention_pheromone[sel] = contention
+
+    def pheromones(self):
+        return {'attractive': self.attractive_pheromone, 'threat': self.threat_pheromone,
+                'env': self.env_pheromone, 'contention': self.contention_pheromone}
+
+    def advance(self, cores, current_time, ticks, thermal_model):
+        _, filtered_temps = thermal_model.propagate(cores.temperature, cores.busy, ticks, decay=1 - self.rho_e)
+        self._advance_pheromones(cores, ticks, filtered_temps)
+
+    def _advance_pheromones(self, cores, ticks, filtered_temps):
+        """advance() given sum_j (1 - rho_e)**(ticks-j) * T_j over the skipped ticks."""
+        keep_t, keep_e, keep_c = 1 - self.rho_t, 1 - self.rho_e, 1 - self.rho_c
+        self.attractive_pheromone *= keep_c ** ticks
+        self.threat_pheromone *= keep_t ** ticks
+        self.env_pheromone *= keep_e ** ticks
+        self.contention_pheromone *= keep_c ** ticks
+
+        self.env_pheromone += self.rho_e * filtered_temps
+        busy_ids = cores.busy_ids()
+        if not len(busy_ids):
+            return
+        slots = cores.task_slot[busy_ids]
+        detected = cores.table.detected_malicious[slots]
+        remaining = cores.table.remaining_burst[slots]
+        self.threat_pheromone[busy_ids[detected]] += self.rho_t * 100 * (1 - keep_t ** ticks) / (1 - keep_t)
+        self.contention_pheromone[busy_ids] += self.rho_c * (1 - keep_c ** ticks) / (1 - keep_c)
+        self.attractive_pheromone[busy_ids] += self.rho_c * decayed_burst_rewards(remaining, ticks, keep_c)
\ No newline at end of file
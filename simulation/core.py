@@ -1,16 +1,112 @@
 # simulation/core.py
+import numpy as np
 from config import THERMAL_AMBIENT
+from .task import TaskTable
+
+class CoreArray:
+    """State of all cores as parallel NumPy arrays indexed by core id.
+
+    `task_index` holds the id of the running task (-1 when idle) and
+    `task_slot` its row in `table`, the TaskTable the ready queue shares; use
+    assign()/release() to keep both in step with the `busy` flags. `tasks[i]`
+    is a view of core i's task (None when idle).
+
+    With `replicas` set, the arrays gain a leading replica axis for the ensemble
+    engine, which tracks running tasks in its own arrays instead of a table.
+    """
+
+    def __init__(self, num_cores, replicas=None, table=None):
+        self.num_cores = num_cores
+        self.replicas = replicas
+        shape = (num_cores,) if replicas is None else (replicas, num_cores)
+        self.temperature = np.full(shape, THERMAL_AMBIENT, dtype=float)
+        self.busy = np.zeros(shape, dtype=bool)
+        self.busy_time = np.zeros(shape, dtype=np.int64)
+        self.task_index = np.full(shape, -1, dtype=np.int64)
+        self.task_slot = np.full(shape, -1, dtype=np.int64)
+        self.table = (TaskTable() if table is None else table) if replicas is None else None
+
+    @property
+    def tasks(self):
+        return _RunningTasks(self)
+
+    def idle_ids(self):
+        return np.flatnonzero(~self.busy)
+
+    def busy_ids(self):
+        return np.flatnonzero(self.busy)
+
+    def task_attribute(self, name, dtype=np.int64):
+        """Per-core array of a TaskTable column for the running tasks (zero when idle)."""
+        values = np.zeros(self.num_cores, dtype=dtype)
+        values[self.busy] = getattr(self.table, name)[self.task_slot[self.busy]]
+        return values
+
+    def assign(self, core_id, task):
+        slot = self.table.adopt(task)
+        self.task_slot[core_id] = slot
+        self.task_index[core_id] = self.table.id[slot]
+        self.busy[core_id] = True
+
+    def assign_slots(self, core_ids, slots):
+        """Array form of assign() for tasks already in `table`: core_ids[i] runs the task in slots[i]."""
+        self.task_slot[core_ids] = slots
+        self.task_index[core_ids] = self.table.id[slots]
+        self.busy[core_ids] = True
+
+    def release(self, core_id):
+        """Marks the core (or array of cores) idle; freeing the task's slot is left to the caller."""
+        self.task_slot[core_id] = -1
+        self.task_index[core_id] = -1
+        self.busy[core_id] = False
+
+    def __len__(self):
+        return self.num_cores
+
+    def __getitem__(self, core_id):
+        return Core(self, core_id)
+
+    def __iter__(self):
+        return (Core(self, i) for i in range(self.num_cores))
+
+class _RunningTasks:
+    """cores.tasks: core id -> view of its running task, or None when idle."""
+
+    def __init__(self, cores):
+        self.cores = cores
+
+    def __getitem__(self, core_id):
+        slot = self.cores.task_slot[core_id]
+        return None if slot < 0 else self.cores.table.task(slot)
+
+    def __len__(self):
+        return self.cores.num_cores
+
+    def __iter__(self):
+        return (self[core_id] for core_id in range(self.cores.num_cores))
 
 class Core:
-    def __init__(self, id):
+    """Per-core view onto a CoreArray, kept for code that works one core at a time."""
+
+    def __init__(self, array, id):
+        self.array = array
         self.id = id
-        self.current_task = None
-        self.temperature = THERMAL_AMBIENT
-        self.busy_time = 0
+
+    @property
+    def current_task(self):
+        return self.array.tasks[self.id]
+
+    @property
+    def temperature(self):
+        return self.array.temperature[self.id]
+
+    @property
+    def busy_time(self):
+        return self.array.busy_time[self.id]
 
     def is_idle(self):
-        return self.current_task is None
+        return not self.array.busy[self.id]
 
     def __repr__(self):
         task_id = self.current_task.id if self.current_task else "None"
-        return f"Core(id={self.id}, task={task_id}, temp={self.temperature:.2f})"
\ No newline at end of file
+        return f"Core(id={self.id}, task={task_id}, temp={self.temperature:.2f})"
@@ -0,0 +1,251 @@
+# simulation/ensemble.py
+import numpy as np
+from tqdm import tqdm
+
+from .core import CoreArray
+from .security_monitor import NEVER
+from .thermal_model import ThermalModel
+from .workload import Workload
+from schedulers.base_scheduler import sample_core_order
+from utils.metrics import Metrics, RunningStats
+from config import (METRICS_LOG_INTERVAL, THERMAL_HOTSPOT_THRESHOLD,
+                    THREAT_DETECTION_PROBABILITY, FALSE_POSITIVE_PROBABILITY)
+
+_QUEUE_COLUMNS = {
+    'cpu_burst': np.int64,
+    'priority': np.int64,
+    'vruntime': np.int64,
+    'is_malicious': bool,
+}
+
+class EnsembleEnvironment:
+    """Advances `scheduler.replicas` independent replicas of Environment in lock-step.
+
+    Core state, running tasks, ready queues, thermal state and pheromones all
+    carry a leading replica axis, so one vectorized tick serves every replica.
+    The scheduler must have been built with `replicas` set and is driven through
+    its array interface (queue_key, core_weights, deposit) rather than
+    schedule()/update(). run() returns one Metrics object per replica.
+
+    `workloads` gives each replica its task stream; when omitted, one is
+    generated per replica from the global NumPy random state.
+
+    Replicas are statistically equivalent to Environment runs. The one ordering
+    difference: the extra scheduler update the tick engine makes on each
+    detection is applied after all cores have executed their tick instead of in
+    the middle of the per-core loop.
+    """
+
+    def __init__(self, scheduler, config, workloads=None):
+        self.scheduler = scheduler
+        self.config = config
+        self.num_cores = self.config['NUM_CORES']
+        self.replicas = scheduler.replicas
+        shape = (self.replicas, self.num_cores)
+
+        if workloads is None:
+            workloads = [Workload.for_config(self.config, np.random.randint(2**32)) for _ in range(self.replicas)]
+        self._merge_workloads(workloads)
+
+        self.cores = CoreArray(self.num_cores, replicas=self.replicas)
+        self.thermal_model = ThermalModel.from_config(self.num_cores, self.config)
+        self.cores.temperature[:] = self.thermal_model.ambient
+        self.current_time = 0
+
+        # Task running on each core.
+        self.remaining_burst = np.zeros(shape, dtype=np.int64)
+        self.is_malicious = np.zeros(shape, dtype=bool)
+        self.detected_malicious = np.zeros(shape, dtype=bool)
+        self.detection_time = np.full(shape, -1, dtype=np.int64)
+        # With a precomputed monitor, the tick each running task will be flagged.
+        self.precomputed_detection = self.config.get('SECURITY_MONITOR', 'bernoulli') == 'precomputed'
+        self.detection_due = np.full(shape, -1, dtype=np.int64)
+        self.detection_probability = self.config.get('THREAT_DETECTION_PROBABILITY', THREAT_DETECTION_PROBABILITY)
+        self.false_positive_probability = self.config.get('FALSE_POSITIVE_PROBABILITY', FALSE_POSITIVE_PROBABILITY)
+
+        # Ready queues in arrival order, padded to a shared capacity.
+        self.queue = {name: np.zeros((self.replicas, 64), dtype=dtype) for name, dtype in _QUEUE_COLUMNS.items()}
+        self.queue_length = np.zeros(self.replicas, dtype=np.int64)
+
+        self.total_busy_time = np.zeros(self.replicas, dtype=np.int64)
+        self.thermal_hotspot_counts = np.zeros(self.replicas, dtype=np.int64)
+        self.isolation_times = [RunningStats() for _ in range(self.replicas)]
+        num_logs = -(-self.config['SIMULATION_DURATION'] // METRICS_LOG_INTERVAL)
+        self.time_steps = np.zeros(num_logs, dtype=np.int64)
+        self.avg_temp_history = np.zeros((num_logs, self.replicas))
+        self.cpu_util_history = np.zeros((num_logs, self.replicas))
+        self.active_threats_history = np.zeros((num_logs, self.replicas), dtype=np.int64)
+        self.num_logged = 0
+
+    def run(self):
+        pbar_desc = f"Ensemble x{self.replicas}: {str(self.scheduler):<16}"
+        with tqdm(total=self.config['SIMULATION_DURATION'], desc=pbar_desc, leave=False, ncols=100,
+                  disable=not self.config.get('PROGRESS_BAR', True)) as pbar:
+            for t in range(self.config['SIMULATION_DURATION']):
+                self.step(t)
+                pbar.update(1)
+
+        return self.split_metrics()
+
+    def step(self, t):
+        self.current_time = t
+        self._arrivals()
+        self._dispatch()
+        self._execute()
+
+        self.cores.temperature[:] = self.thermal_model.next_temperatures(self.cores.temperature, self.cores.busy)
+        self._scheduler_update()
+
+        if t % METRICS_LOG_INTERVAL == 0:
+            self._log_metrics()
+
+    # --- Ready queues ---
+
+    def _reserve_queue(self, needed):
+        capacity = self.queue['cpu_burst'].shape[1]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, 2 * capacity)
+        for name, column in self.queue.items():
+            grown = np.zeros((self.replicas, new_capacity), dtype=column.dtype)
+            grown[:, :capacity] = column
+            self.queue[name] = grown
+
+    def _merge_workloads(self, workloads):
+        """Interleaves the replicas' task streams into one stream sorted by arrival."""
+        # Streamed sources are read up front: the merge needs every replica's arrivals.
+        workloads = [w if isinstance(w, Workload) else w.read(self.config['SIMULATION_DURATION']) for w in workloads]
+        arrival_time = np.concatenate([w.arrival_time for w in workloads])
+        order = np.argsort(arrival_time, kind='stable')
+        self.arrival_time = arrival_time[order]
+        self.arrival_replica = np.repeat(np.arange(self.replicas), [len(w) for w in workloads])[order]
+        self.arrivals = {name: np.concatenate([getattr(w, name) for w in workloads])[order]
+                         for name in ('cpu_burst', 'priority', 'is_malicious')}
+        self.arrival_position = 0
+
+    def _arrivals(self):
+        start = self.arrival_position
+        end = np.searchsorted(self.arrival_time, self.current_time, side='right')
+        if end == start:
+            return
+        self.arrival_position = end
+
+        # Order by replica so tasks arriving together in one replica queue up in turn.
+        batch = start + np.argsort(self.arrival_replica[start:end], kind='stable')
+        replicas = self.arrival_replica[batch]
+        rank = np.arange(len(batch)) - np.searchsorted(replicas, replicas, side='left')
+        slots = self.queue_length[replicas] + rank
+        self._reserve_queue(slots.max() + 1)
+
+        for name, values in self.arrivals.items():
+            self.queue[name][replicas, slots] = values[batch]
+        self.queue['vruntime'][replicas, slots] = 0
+        np.add.at(self.queue_length, replicas, 1)
+
+    def _queue_order(self):
+        capacity = self.queue['cpu_burst'].shape[1]
+        if self.scheduler.queue_key is None:
+            return np.broadcast_to(np.arange(capacity), (self.replicas, capacity))
+        queued = np.arange(capacity) < self.queue_length[:, None]
+        keys = np.where(queued, self.queue[self.scheduler.queue_key], np.iinfo(np.int64).max)
+        return np.argsort(keys, axis=1, kind='stable')
+
+    # --- Tick phases ---
+
+    def _dispatch(self):
+        idle = ~self.cores.busy
+        counts = np.minimum(self.queue_length, idle.sum(axis=1))
+        width = counts.max()
+        if width == 0:
+            return
+
+        weights = self.scheduler.core_weights(self.cores.temperature)
+        if weights is None:
+            core_order = np.argsort(~idle, axis=1, kind='stable')
+        else:
+            core_order = sample_core_order(weights, idle)
+        task_order = self._queue_order()
+
+        rows, ranks = np.nonzero(np.arange(width) < counts[:, None])
+        core_ids = core_order[rows, ranks]
+        slots = task_order[rows, ranks]
+
+        self.cores.busy[rows, core_ids] = True
+        self.remaining_burst[rows, core_ids] = self.queue['cpu_burst'][rows, slots]
+        self.is_malicious[rows, core_ids] = self.queue['is_malicious'][rows, slots]
+        self.detected_malicious[rows, core_ids] = False
+        self.detection_time[rows, core_ids] = -1
+        if self.precomputed_detection:
+            p_detect = np.where(self.is_malicious[rows, core_ids], self.detection_probability,
+                                self.false_positive_probability)
+            # A zero rate never flags, as in GeometricDetector.
+            due = np.full(len(rows), NEVER, dtype=np.int64)
+            positive = p_detect > 0
+            due[positive] = self.current_time + np.random.geometric(p_detect[positive]) - 1
+            self.detection_due[rows, core_ids] = due
+
+        dispatched = np.zeros(self.queue['cpu_burst'].shape, dtype=bool)
+        dispatched[rows, slots] = True
+        keep_order = np.argsort(dispatched, axis=1, kind='stable')
+        for name, column in self.queue.items():
+            self.queue[name] = np.take_along_axis(column, keep_order, axis=1)
+        self.queue_length -= counts
+
+    def _execute(self):
+        busy = self.cores.busy
+        self.remaining_burst -= busy
+        self.cores.busy_time += busy
+
+        if self.precomputed_detection:
+            flagged = self.detection_due == self.current_time
+        else:
+            p_detect = np.where(self.is_malicious, self.detection_probability, self.false_positive_probability)
+            flagged = np.random.rand(*busy.shape) < p_detect
+        newly_detected = busy & ~self.detected_malicious & flagged
+        self.detected_malicious |= newly_detected
+        self.detection_time[newly_detected] = self.current_time
+
+        detections = newly_detected.sum(axis=1)
+        for extra in range(detections.max()):
+            self._scheduler_update(active=detections > extra)
+
+        completed = busy & (self.remaining_burst <= 0)
+        isolated = completed & self.detected_malicious & (self.detection_time > 0)
+        for replica, core_id in zip(*np.nonzero(isolated)):
+            self.isolation_times[replica].add(self.current_time - self.detection_time[replica, core_id])
+        busy[completed] = False
+
+    def _scheduler_update(self, active=None):
+        self.scheduler.deposit(self.cores.temperature, self.cores.busy, self.remaining_burst,
+                               self.detected_malicious, active=active)
+
+    def _log_metrics(self):
+        busy = self.cores.busy
+        busy_cores = busy.sum(axis=1)
+        self.total_busy_time += busy_cores
+        self.thermal_hotspot_counts += (busy & (self.cores.temperature > THERMAL_HOTSPOT_THRESHOLD)).sum(axis=1)
+
+        i = self.num_logged
+        self.time_steps[i] = self.current_time
+        self.avg_temp_history[i] = self.cores.temperature.mean(axis=1)
+        self.cpu_util_history[i] = busy_cores / (self.num_cores * METRICS_LOG_INTERVAL) * 100
+        queued = np.arange(self.queue['is_malicious'].shape[1]) < self.queue_length[:, None]
+        self.active_threats_history[i] = ((busy & self.is_malicious).sum(axis=1) +
+                                          (queued & self.queue['is_malicious']).sum(axis=1))
+        self.num_logged += 1
+
+    def split_metrics(self):
+        """One Metrics object per replica, as Environment.run would have returned."""
+        all_metrics = []
+        for r in range(self.replicas):
+            metrics = Metrics(self.num_cores, self.config['SIMULATION_DURATION'])
+            metrics.total_busy_time = int(self.total_busy_time[r])
+            metrics.thermal_hotspot_counts = int(self.thermal_hotspot_counts[r])
+            metrics.isolation_times = self.isolation_times[r]
+            metrics.num_logged = self.num_logged
+            metrics.time_steps[:] = self.time_steps
+            metrics.avg_temp_history[:] = self.avg_temp_history[:, r]
+            metrics.cpu_util_history[:] = self.cpu_util_history[:, r]
+            metrics.active_threats_history[:] = self.active_threats_history[:, r]
+            all_metrics.append(metrics)
+        return all_metrics
@@ -3,65 +3,238 @@ import numpy as np
 from tqdm import tqdm
 
 from .task import Task
-from .core import Core
+from .core import CoreArray
 from .thermal_model import ThermalModel
+from .workload import WorkloadFeed
 from .security_monitor import SecurityMonitor
+from .profiler import DecisionLatency, PhaseProfiler
+from .snapshot import Snapshot
+from .stream import StateSample
 from utils.metrics import Metrics
-from config import METRICS_LOG_INTERVAL
+from config import METRICS_LOG_INTERVAL, CHARGE_DECISION_COST, DECISION_COST_US
 
 class Environment:
-    def __init__(self, scheduler, config):
+    def __init__(self, scheduler, config, workload=None, security_monitor=None):
         self.scheduler = scheduler
         self.config = config
+        # Any WorkloadSource: an in-memory Workload or a streamed trace, read lazily.
+        self.workload = workload
+        self.feed = WorkloadFeed(workload) if workload is not None else None
         self.num_cores = self.config['NUM_CORES']
-        
-        self.cores = [Core(i) for i in range(self.num_cores)]
-        self.task_queue = []
-        self.thermal_model = ThermalModel(self.num_cores)
-        self.security_monitor = SecurityMonitor()
+
+        self.task_queue = scheduler.ready_queue
+        # Every task of the run lives in one table, which the ready queue and the cores share.
+        self.tasks = self.task_queue.table
+        self.cores = CoreArray(self.num_cores, table=self.tasks)
+        self.thermal_model = ThermalModel.from_config(self.num_cores, self.config)
+        self.cores.temperature[:] = self.thermal_model.ambient
+        if security_monitor is None:
+            security_monitor = SecurityMonitor.from_config(self.num_cores, self.config)
+        self.security_monitor = security_monitor
+        self.started_task_index = np.full(self.num_cores, -1, dtype=np.int64)
         self.metrics = Metrics(self.num_cores, self.config['SIMULATION_DURATION'])
         self.current_time = 0
+        # First tick not yet simulated, where run() resumes, and the tick the current run() stops at.
+        self.next_time = 0
+        self.horizon = self.config['SIMULATION_DURATION']
+
+        # Microseconds of decision cost each core has been charged short of a whole tick.
+        self.decision_cost_us = None
+        if self.config.get('CHARGE_DECISION_COST', CHARGE_DECISION_COST):
+            self.decision_cost_us = np.zeros(self.num_cores)
+            self.metrics.scheduling_overhead = 0.0
+
+        self.profiler = None
+        self.decision_latency = None
+        self.attach_instrumentation()
+
+    def attach_instrumentation(self):
+        # Instrumentation is wired in here, or not at all, so unprofiled runs pay nothing for it.
+        if self.config.get('PROFILE') and self.profiler is None:
+            self.profiler = PhaseProfiler(trace=self.config.get('PROFILE_TRACE', False))
+            self.profiler.attach(self)
+        if self.config.get('DECISION_LATENCY') and self.decision_latency is None:
+            self.decision_latency = DecisionLatency()
+            self.decision_latency.attach(self)
 
-    def run(self):
+    def _progress_bar(self):
         pbar_desc = f"Scheduler: {str(self.scheduler):<27}"
-        with tqdm(total=self.config['SIMULATION_DURATION'], desc=pbar_desc, leave=False, ncols=100) as pbar:
-            for t in range(self.config['SIMULATION_DURATION']):
-                self.current_time = t
-                
-                if np.random.poisson(self.config['TASK_ARRIVAL_RATE'] / 1000.0):
-                    new_task = Task(self.current_time, self.config['THREAT_PROBABILITY'])
-                    self.task_queue.append(new_task)
-
-                self.scheduler.schedule(self.task_queue, self.cores, self.current_time)
-
-                for core in self.cores:
-                    if not core.is_idle():
-                        task = core.current_task
-                        
-                        if hasattr(task, 'vruntime'): task.vruntime += 1
-                        task.remaining_burst -= 1
-                        core.busy_time += 1
-                        
-                        if not task.detected_malicious:
-                            detected, _ = self.security_monitor.check_task(task)
-                            if detected:
-                                task.detected_malicious = True
-                                task.detection_time = self.current_time
-                                if hasattr(self.scheduler, 'update'):
-                                    self.scheduler.update(self.cores, self.current_time)
-                        
-                        if task.remaining_burst <= 0:
-                            task.completion_time = self.current_time
-                            if task.detected_malicious:
-                                self.metrics.record_isolation(task, self.current_time)
-                            core.current_task = None
-
-                self.thermal_model.update(self.cores)
-                if hasattr(self.scheduler, 'update'):
-                    self.scheduler.update(self.cores, self.current_time)
-                
-                if t % METRICS_LOG_INTERVAL == 0:
-                    self.metrics.update(self.cores, self.task_queue, self.current_time)
-                pbar.update(1)
-            
-        return self.metrics
\ No newline at end of file
+        return tqdm(total=self.config['SIMULATION_DURATION'], desc=pbar_desc, leave=False, ncols=100,
+                    disable=not self.config.get('PROGRESS_BAR', True))
+
+    def headless(self):
+        """True when no progress bar is shown, so run() can skip its per-tick update."""
+        return not self.config.get('PROGRESS_BAR', True) and self.profiler is None
+
+    def run(self, until=None):
+        """Simulates from next_time up to tick `until` (SIMULATION_DURATION by default).
+
+        With CHECKPOINT_INTERVAL and CHECKPOINT_PATH in the config, a snapshot
+        is saved every CHECKPOINT_INTERVAL ticks; load_snapshot(path).run()
+        then resumes where it left off.
+        """
+        until = self.config['SIMULATION_DURATION'] if until is None else until
+        if self.headless():
+            self._run_checkpointed(until, None)
+            return self.metrics
+
+        with self._progress_bar() as pbar:
+            if self.next_time:
+                pbar.update(self.next_time)
+            self._run_checkpointed(until, pbar)
+
+        return self.metrics
+
+    def run_iter(self, interval=METRICS_LOG_INTERVAL, until=None):
+        """Simulates like run(), yielding a StateSample every `interval` ticks.
+
+        The simulation only advances while the consumer asks for the next
+        sample, so stopping the iteration stops the run (metrics then cover the
+        ticks simulated so far). Checkpoints are not written.
+        """
+        until = self.config['SIMULATION_DURATION'] if until is None else until
+        previous_busy_time = int(self.cores.busy_time.sum())
+        previous_time = self.next_time
+        for _ in self._segments(until, interval, None):
+            busy_time = int(self.cores.busy_time.sum())
+            yield StateSample.capture(self, (busy_time - previous_busy_time) /
+                                      (self.num_cores * (self.next_time - previous_time)))
+            previous_busy_time, previous_time = busy_time, self.next_time
+
+    def _run_checkpointed(self, until, pbar):
+        interval = self.config.get('CHECKPOINT_INTERVAL')
+        for _ in self._segments(until, interval, pbar):
+            if interval:
+                self.snapshot().save(self.config['CHECKPOINT_PATH'])
+
+    def _segments(self, until, interval, pbar):
+        """Simulates up to tick `until` in segments ending at multiples of `interval`, yielding after each."""
+        self.horizon = until
+        while self.next_time < until:
+            stop = min(until, (self.next_time // interval + 1) * interval) if interval else until
+            self._simulate(stop, pbar)
+            yield
+
+    def _simulate(self, stop, pbar):
+        """Simulates from next_time until at least tick `stop`."""
+        if pbar is None:
+            for t in range(self.next_time, stop):
+                self.step(t)
+            return
+
+        for t in range(self.next_time, stop):
+            self.step(t)
+            pbar.update(1)
+
+    def snapshot(self):
+        """The complete current state as a Snapshot, to checkpoint, resume or fork."""
+        return Snapshot.capture(self)
+
+    def step(self, t):
+        """Advances the simulation through tick `t`."""
+        self.current_time = t
+        self.next_time = t + 1
+
+        self._arrivals()
+
+        self._dispatch()
+        self._execute()
+
+        self.thermal_model.update(self.cores)
+        if hasattr(self.scheduler, 'update'):
+            self.scheduler.update(self.cores, self.current_time)
+
+        if t % METRICS_LOG_INTERVAL == 0:
+            self.metrics.update(self.cores, self.task_queue, self.current_time)
+
+    def _arrivals(self):
+        if self.workload is None:
+            if self._task_arrives():
+                new_task = Task(self.current_time, self.config['THREAT_PROBABILITY'], table=self.tasks)
+                self.scheduler.enqueue(new_task)
+            return
+
+        for task in self.feed.due(self.current_time, self.tasks):
+            self.scheduler.enqueue(task)
+
+    def _task_arrives(self):
+        return np.random.poisson(self.config['TASK_ARRIVAL_RATE'] / 1000.0)
+
+    def _dispatch(self):
+        if self.decision_cost_us is not None:
+            self._charged_schedule()
+        else:
+            self.scheduler.schedule(self.task_queue, self.cores, self.current_time)
+        if self.security_monitor.precomputed:
+            started = np.flatnonzero(self.cores.task_index != self.started_task_index)
+            for core_id in started:
+                if self.cores.busy[core_id]:
+                    self.security_monitor.task_started(core_id, self.tasks.task(self.cores.task_slot[core_id]),
+                                                       self.current_time)
+            self.started_task_index[started] = self.cores.task_index[started]
+
+    def _charged_schedule(self):
+        """schedule() whose dispatch decisions cost their core simulated time.
+
+        Each decision's cost accrues on the core it dispatches to; every whole
+        tick of it is added to the dispatched task's remaining burst, so the
+        core is busy for it and the overhead shows in CPU utilization.
+        """
+        queue_length = len(self.task_queue)
+        before = self.cores.task_index.copy()
+        self.scheduler.schedule(self.task_queue, self.cores, self.current_time)
+        cost_us = self.config.get('DECISION_COST_US', DECISION_COST_US).get(type(self.scheduler).__name__)
+        for decision, core_id in enumerate(np.flatnonzero(self.cores.task_index != before)):
+            cost = self.scheduler.decision_cost(queue_length - decision, cost_us)
+            self.metrics.scheduling_overhead += cost / 1000.0
+            self.decision_cost_us[core_id] += cost
+            ticks = int(self.decision_cost_us[core_id] // 1000)
+            if ticks:
+                self.tasks.remaining_burst[self.cores.task_slot[core_id]] += ticks
+                self.decision_cost_us[core_id] -= ticks * 1000
+
+    def _detections(self, core_ids, slots):
+        """Which of the running, not yet flagged tasks in `slots` (on `core_ids`) are flagged this tick."""
+        return self.security_monitor.detections(core_ids, self.tasks.is_malicious[slots], self.current_time)
+
+    def _execute(self):
+        cores, tasks = self.cores, self.tasks
+        cores.busy_time[cores.busy] += 1
+        core_ids = cores.busy_ids()
+        if not len(core_ids):
+            return
+        slots = cores.task_slot[core_ids]
+        unflagged = np.flatnonzero(~tasks.detected_malicious[slots])
+        detected = unflagged[self._detections(core_ids[unflagged], slots[unflagged])]
+
+        # A detection updates the scheduler at once, before the cores after it have
+        # run their tick, so the busy cores advance in runs that end at each detection.
+        start = 0
+        for end in detected:
+            self._advance_tasks(slots[start:end + 1])
+            tasks.detected_malicious[slots[end]] = True
+            tasks.detection_time[slots[end]] = self.current_time
+            self._complete_tasks(core_ids[start:end], slots[start:end])
+            if hasattr(self.scheduler, 'update'):
+                self.scheduler.update(cores, self.current_time)
+            self._complete_tasks(core_ids[end:end + 1], slots[end:end + 1])
+            start = end + 1
+        self._advance_tasks(slots[start:])
+        self._complete_tasks(core_ids[start:], slots[start:])
+
+    def _advance_tasks(self, slots, ticks=1):
+        self.tasks.vruntime[slots] += ticks
+        self.tasks.remaining_burst[slots] -= ticks
+
+    def _complete_tasks(self, core_ids, slots):
+        """Releases the cores whose task has no burst left."""
+        tasks = self.tasks
+        done = tasks.remaining_burst[slots] <= 0
+        if not done.any():
+            return
+        core_ids, slots = core_ids[done], slots[done]
+        tasks.completion_time[slots] = self.current_time
+        for slot in slots[tasks.detected_malicious[slots]]:
+            self.metrics.record_isolation(tasks.task(slot), self.current_time)
+        self.cores.release(core_ids)
+        tasks.free(slots)
\ No newline at end of file
@@ -0,0 +1,89 @@
+# simulation/event_environment.py
+import numpy as np
+
+from .environment import Environment
+from .security_monitor import PrecomputedSecurityMonitor
+from config import METRICS_LOG_INTERVAL
+
+class EventEnvironment(Environment):
+    """Next-event variant of Environment.
+
+    Only ticks on which something discrete happens are simulated tick by tick:
+    task arrivals, dispatch opportunities, completions, detections and metric-log
+    boundaries. The quiet ticks in between are skipped: task and core counters
+    move linearly, the scheduler pheromones are advanced by their
+    geometric-decay solutions and the thermal model by ThermalModel.propagate
+    (closed form on small packages, stepping only the changing cores on large ones).
+
+    Arrival and detection times are drawn from the same distributions the tick
+    engine samples one tick at a time, so the metrics are statistically
+    equivalent rather than bit-identical.
+    """
+
+    def __init__(self, scheduler, config, workload=None, security_monitor=None):
+        # Detections must be known in advance to be scheduled as events.
+        if security_monitor is None:
+            security_monitor = PrecomputedSecurityMonitor.from_config(
+                config['NUM_CORES'], {**config, 'SECURITY_MONITOR': 'precomputed'})
+        if not security_monitor.precomputed:
+            raise ValueError("EventEnvironment needs a precomputed security monitor")
+        super().__init__(scheduler, config, workload, security_monitor)
+        if self.workload is None:
+            self.arrival_probability = 1.0 - np.exp(-self.config['TASK_ARRIVAL_RATE'] / 1000.0)
+            self.next_arrival = np.random.geometric(self.arrival_probability) - 1
+
+    def _simulate(self, stop, pbar):
+        # A segment (checkpoint or streamed sample) ends at the first event from `stop`
+        # on rather than stepping tick `stop` itself, so segmenting leaves the results unchanged.
+        t = self.next_time
+        while t < stop:
+            next_t = self._advance(t)
+            if pbar is not None:
+                pbar.update(next_t - t)
+            t = next_t
+
+    def _advance(self, t):
+        """Simulates tick `t` and the quiet ticks after it; returns the next event tick."""
+        self.step(t)
+        next_t = self._next_event_time(t)
+        if next_t - t > 1:
+            self._skip(next_t - t - 1)
+        return next_t
+
+    def _task_arrives(self):
+        if self.current_time != self.next_arrival:
+            return False
+        self.next_arrival += np.random.geometric(self.arrival_probability)
+        return True
+
+    def _next_arrival_time(self):
+        if self.workload is None:
+            return self.next_arrival
+        next_arrival = self.feed.next_arrival()
+        return self.horizon if next_arrival is None else next_arrival
+
+    def _next_event_time(self, t):
+        candidates = [
+            self.horizon,
+            self._next_arrival_time(),
+            (t // METRICS_LOG_INTERVAL + 1) * METRICS_LOG_INTERVAL,
+        ]
+        core_ids = self.cores.busy_ids()
+        if len(core_ids):
+            slots = self.cores.task_slot[core_ids]
+            candidates.append(t + self.tasks.remaining_burst[slots].min())
+            unflagged = ~self.tasks.detected_malicious[slots]
+            if unflagged.any():
+                candidates.append(self.security_monitor.detection_due[core_ids[unflagged]].min())
+        if self.task_queue and not self.cores.busy.all():
+            candidates.append(t + 1)
+        return max(t + 1, int(min(candidates)))
+
+    def _skip(self, ticks):
+        """Advances through `ticks` quiet ticks after the current one."""
+        self.scheduler.advance(self.cores, self.current_time, ticks, self.thermal_model)
+        self.thermal_model.advance(self.cores, ticks)
+        self.cores.busy_time[self.cores.busy] += ticks
+        self._advance_tasks(self.cores.task_slot[self.cores.busy], ticks)
+        self.current_time += ticks
+        self.next_time = self.current_time + 1
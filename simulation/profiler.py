@@ -0,0 +1,243 @@
+# simulation/profiler.py
+import json
+import math
+import time
+from collections import defaultdict
+
+class PhaseProfiler:
+    """Opt-in phase timers and counters for an Environment.
+
+    attach() replaces the environment's phase methods (and those of its
+    scheduler, thermal model and metrics) with timed wrappers on the instances
+    themselves, so an environment without a profiler runs the plain methods
+    and pays nothing. Phases nest: a scheduler update made on a detection
+    inside the execution loop is recorded as `execute/scheduler.update`.
+
+    With `trace` set, every phase call is also kept as a Chrome trace event
+    (chrome://tracing, Perfetto) for write_chrome_trace().
+    """
+
+    def __init__(self, trace=False):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.maxima = defaultdict(int)
+        self.events = [] if trace else None
+        self._stack = []
+        self._origin = time.perf_counter()
+
+    def timed(self, name, fn):
+        def wrapper(*args, **kwargs):
+            path = '/'.join(self._stack + [name])
+            self._stack.append(name)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._stack.pop()
+                self.seconds[path] += elapsed
+                self.calls[path] += 1
+                if self.events is not None:
+                    self.events.append({'name': name, 'cat': path, 'ph': 'X', 'pid': 0, 'tid': 0,
+                                        'ts': (start - self._origin) * 1e6, 'dur': elapsed * 1e6})
+        return wrapper
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    def sample(self, name, value):
+        """Counts a per-call quantity: its total and its maximum."""
+        self.counters[name] += value
+        self.maxima[name] = max(self.maxima[name], value)
+
+    def attach(self, env):
+        for phase in ('_arrivals', '_dispatch', '_execute', '_skip'):
+            if hasattr(env, phase):
+                setattr(env, phase, self.timed(phase.lstrip('_'), getattr(env, phase)))
+        env.thermal_model.update = self.timed('thermal_model.update', env.thermal_model.update)
+        env.metrics.update = self.timed('metrics.update', env.metrics.update)
+        if hasattr(env.scheduler, 'update'):
+            env.scheduler.update = self._counted_update(env.scheduler.update)
+        env.scheduler.schedule = self._counted_schedule(env.scheduler.schedule)
+
+        progress_bar = env._progress_bar
+        timed_update = self.timed('progress_bar', lambda pbar, n: pbar.update(n))
+        env._progress_bar = lambda: _TimedProgressBar(progress_bar(), timed_update)
+
+    def _counted_schedule(self, schedule):
+        timed = self.timed('scheduler.schedule', schedule)
+        def wrapper(tasks, cores, current_time):
+            self.count('schedule_calls')
+            self.sample('queue_length', len(tasks))
+            busy_before = int(cores.busy.sum())
+            timed(tasks, cores, current_time)
+            self.count('tasks_dispatched', int(cores.busy.sum()) - busy_before)
+        return wrapper
+
+    def _counted_update(self, update):
+        timed = self.timed('scheduler.update', update)
+        def wrapper(cores, current_time):
+            if self._stack and self._stack[-1] == 'execute':
+                self.count('detections')
+            timed(cores, current_time)
+        return wrapper
+
+    def to_dict(self):
+        return {
+            'phases': {path: {'calls': self.calls[path], 'seconds': self.seconds[path]} for path in self.seconds},
+            'counters': dict(self.counters),
+            'maxima': dict(self.maxima),
+        }
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events or [], 'displayTimeUnit': 'ms'}, f)
+
+class _TimedProgressBar:
+    def __init__(self, pbar, timed_update):
+        self.pbar = pbar
+        self.timed_update = timed_update
+
+    def __enter__(self):
+        self.pbar.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.pbar.__exit__(*exc_info)
+
+    def update(self, n=1):
+        self.timed_update(self.pbar, n)
+
+def size_bucket(n):
+    """Power-of-two bucket of a count, by its lower bound: 0, 1, 2 (2-3), 4 (4-7), ..."""
+    return 0 if n <= 0 else 1 << (int(n).bit_length() - 1)
+
+def bucket_label(bucket):
+    return str(bucket) if bucket <= 1 else f"{bucket}-{2 * bucket - 1}"
+
+class DecisionLatency:
+    """Wall-clock latency of every scheduler schedule() and update() call.
+
+    Latencies go into log-spaced histograms (BINS_PER_OCTAVE bins per doubling,
+    so quantiles are within about 5%) keyed by (call, queue-length bucket,
+    idle-core bucket), which keeps memory bounded however long the run and
+    lets the histograms of many runs be merged. Like PhaseProfiler, attach()
+    wraps the scheduler instance's methods, so unmeasured runs pay nothing.
+    """
+
+    BINS_PER_OCTAVE = 8
+
+    def __init__(self):
+        self.histograms = defaultdict(lambda: defaultdict(int))
+        self.maxima = defaultdict(int)
+
+    def attach(self, env):
+        scheduler = env.scheduler
+        scheduler.schedule = self._timed('schedule', scheduler.schedule, env)
+        if hasattr(scheduler, 'update'):
+            scheduler.update = self._timed('update', scheduler.update, env)
+
+    def _timed(self, call, fn, env):
+        def wrapper(*args):
+            queue_length, idle_cores = len(env.task_queue), env.num_cores - int(env.cores.busy.sum())
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args)
+            finally:
+                self.record(call, queue_length, idle_cores, time.perf_counter_ns() - start)
+        return wrapper
+
+    def record(self, call, queue_length, idle_cores, nanoseconds):
+        key = (call, size_bucket(queue_length), size_bucket(idle_cores))
+        self.histograms[key][int(math.log2(max(nanoseconds, 1)) * self.BINS_PER_OCTAVE)] += 1
+        self.maxima[key] = max(self.maxima[key], nanoseconds)
+
+    def to_dict(self):
+        return {key: {'bins': dict(bins), 'max_ns': self.maxima[key]} for key, bins in self.histograms.items()}
+
+def merge_latencies(latencies):
+    """Adds up several DecisionLatency.to_dict() histograms."""
+    merged = {}
+    for latency in latencies:
+        for key, histogram in latency.items():
+            total = merged.setdefault(key, {'bins': defaultdict(int), 'max_ns': 0})
+            for b, count in histogram['bins'].items():
+                total['bins'][b] += count
+            total['max_ns'] = max(total['max_ns'], histogram['max_ns'])
+    return {key: {'bins': dict(h['bins']), 'max_ns': h['max_ns']} for key, h in merged.items()}
+
+def latency_quantile(histogram, q):
+    """`q` quantile in microseconds of a to_dict() histogram: the geometric middle
+    of its bin, but never above the largest latency recorded."""
+    bins = histogram['bins']
+    target = q * sum(bins.values())
+    seen = 0
+    for b in sorted(bins):
+        seen += bins[b]
+        if seen >= target:
+            return min(2 ** ((b + 0.5) / DecisionLatency.BINS_PER_OCTAVE), histogram['max_ns']) / 1000
+    return math.nan
+
+def latency_rows(latency):
+    """One record per (call, queue length, idle cores) bucket of a to_dict() latency, with p50/p99/max."""
+    rows = []
+    for (call, queue_bucket, idle_bucket), histogram in sorted(latency.items()):
+        rows.append({'call': call, 'queue length': bucket_label(queue_bucket),
+                     'idle cores': bucket_label(idle_bucket), 'calls': sum(histogram['bins'].values()),
+                     'p50 us': latency_quantile(histogram, 0.5), 'p99 us': latency_quantile(histogram, 0.99),
+                     'max us': histogram['max_ns'] / 1000})
+    return rows
+
+def format_latencies(latencies):
+    """Text report of per-scheduler to_dict() latencies, over all queue and idle-core buckets."""
+    lines = [f"{'scheduler':<32} {'call':<9} {'calls':>10} {'p50 us':>9} {'p99 us':>9} {'max us':>10}"]
+    for name, latency in latencies.items():
+        for call in sorted({key[0] for key in latency}):
+            merged = merge_latencies([{call: histogram} for key, histogram in latency.items() if key[0] == call])[call]
+            lines.append(f"{name:<32} {call:<9} {sum(merged['bins'].values()):>10} "
+                         f"{latency_quantile(merged, 0.5):>9.1f} {latency_quantile(merged, 0.99):>9.1f} "
+                         f"{merged['max_ns'] / 1000:>10.1f}")
+    return '\n'.join(lines)
+
+def merge_profiles(profiles):
+    """Sums the timers and counters of several to_dict() profiles."""
+    merged = {'phases': {}, 'counters': defaultdict(int), 'maxima': defaultdict(int)}
+    for profile in profiles:
+        for path, stats in profile['phases'].items():
+            total = merged['phases'].setdefault(path, {'calls': 0, 'seconds': 0.0})
+            total['calls'] += stats['calls']
+            total['seconds'] += stats['seconds']
+        for name, value in profile['counters'].items():
+            merged['counters'][name] += value
+        for name, value in profile['maxima'].items():
+            merged['maxima'][name] = max(merged['maxima'][name], value)
+    merged['counters'] = dict(merged['counters'])
+    merged['maxima'] = dict(merged['maxima'])
+    return merged
+
+def flatten_profile(profile):
+    """One flat record of a to_dict() profile, e.g. for a CSV row per run."""
+    row = {}
+    for path, stats in sorted(profile['phases'].items()):
+        row[f"{path} calls"] = stats['calls']
+        row[f"{path} s"] = stats['seconds']
+    row.update(sorted(profile['counters'].items()))
+    row.update((f"{name} max", value) for name, value in sorted(profile['maxima'].items()))
+    return row
+
+def format_profile(profile):
+    """Text report of a to_dict() profile: phases by total time, then counters."""
+    top_level = sum(stats['seconds'] for path, stats in profile['phases'].items() if '/' not in path)
+    lines = [f"{'phase':<36} {'calls':>10} {'total s':>10} {'us/call':>10} {'share':>7}"]
+    for path, stats in sorted(profile['phases'].items(), key=lambda item: -item[1]['seconds']):
+        per_call = stats['seconds'] / stats['calls'] * 1e6 if stats['calls'] else 0.0
+        share = stats['seconds'] / top_level if top_level else 0.0
+        lines.append(f"{path:<36} {stats['calls']:>10} {stats['seconds']:>10.3f} {per_call:>10.1f} {share:>7.1%}")
+    calls = profile['counters'].get('schedule_calls', 0)
+    for name, value in sorted(profile['counters'].items()):
+        line = f"{name:<36} {value:>10}"
+        if name == 'queue_length' and calls:
+            line += f"   mean {value / calls:.1f}, max {profile['maxima'].get(name, 0)}"
+        lines.append(line)
+    return '\n'.join(lines)
\ No newline at end of file
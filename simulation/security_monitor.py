@@ -2,7 +2,78 @@
 import numpy as np
 from config import THREAT_DETECTION_PROBABILITY, FALSE_POSITIVE_PROBABILITY
 
+# Detection tick of a task that is never flagged.
+NEVER = np.iinfo(np.int64).max
+
+class GeometricDetector:
+    """Per-tick Bernoulli checks, collapsed into one geometric draw per task.
+
+    A check succeeds with the same probability every tick the task runs, so the
+    number of ticks until the first success is geometric; the resulting
+    detection timing is identical in distribution to calling check_task() on
+    every tick.
+    """
+
+    def __init__(self, detection_probability=THREAT_DETECTION_PROBABILITY,
+                 false_positive_probability=FALSE_POSITIVE_PROBABILITY):
+        self.detection_probability = detection_probability
+        self.false_positive_probability = false_positive_probability
+
+    def probability(self, task, core_id):
+        return self.detection_probability if task.is_malicious else self.false_positive_probability
+
+    def sample_delay(self, task, core_id):
+        p = self.probability(task, core_id)
+        return np.random.geometric(p) - 1 if p > 0 else NEVER
+
+class PerCoreDetector(GeometricDetector):
+    """Geometric detection with a separate monitor, and so separate rates, per core."""
+
+    def __init__(self, detection_probabilities, false_positive_probabilities):
+        self.detection_probability = np.asarray(detection_probabilities, dtype=float)
+        self.false_positive_probability = np.asarray(false_positive_probabilities, dtype=float)
+
+    def probability(self, task, core_id):
+        rates = self.detection_probability if task.is_malicious else self.false_positive_probability
+        return rates[core_id] if rates.ndim else float(rates)
+
+class DelayDistributionDetector:
+    """Malicious tasks are flagged after a delay drawn from any distribution.
+
+    `malicious_delay` is a callable returning a delay in ticks, e.g.
+    ``lambda: np.random.lognormal(3.0, 0.5)``. Benign tasks keep geometric
+    false positives.
+    """
+
+    def __init__(self, malicious_delay, false_positive_probability=FALSE_POSITIVE_PROBABILITY):
+        self.malicious_delay = malicious_delay
+        self.false_positives = GeometricDetector(0.0, false_positive_probability)
+
+    def sample_delay(self, task, core_id):
+        if not task.is_malicious:
+            return self.false_positives.sample_delay(task, core_id)
+        return max(0, int(np.ceil(self.malicious_delay())))
+
 class SecurityMonitor:
+    """Checks every running task on every tick with a fresh Bernoulli draw."""
+
+    precomputed = False
+    # Constructor keyword of each parameter -> its config.py name.
+    config_parameters = {'detection_probability': 'THREAT_DETECTION_PROBABILITY',
+                         'false_positive_probability': 'FALSE_POSITIVE_PROBABILITY'}
+
+    def __init__(self, detection_probability=THREAT_DETECTION_PROBABILITY,
+                 false_positive_probability=FALSE_POSITIVE_PROBABILITY):
+        self.detection_probability = detection_probability
+        self.false_positive_probability = false_positive_probability
+
+    @classmethod
+    def from_config(cls, num_cores, config):
+        """The config's SECURITY_MONITOR, with the detection rates it overrides."""
+        monitor_class = SECURITY_MONITORS[config.get('SECURITY_MONITOR', 'bernoulli')]
+        rates = {arg: config[name] for arg, name in cls.config_parameters.items() if name in config}
+        return monitor_class(num_cores, **rates) if monitor_class.precomputed else monitor_class(**rates)
+
     def check_task(self, task):
         if task.detected_malicious:
             return True, True
@@ -10,12 +81,62 @@ class SecurityMonitor:
         detected = False
         is_correct = False
         if task.is_malicious:
-            if np.random.rand() < THREAT_DETECTION_PROBABILITY:
+            if np.random.rand() < self.detection_probability:
                 detected = True
                 is_correct = True
         else:
-            if np.random.rand() < FALSE_POSITIVE_PROBABILITY:
+            if np.random.rand() < self.false_positive_probability:
                 detected = True
                 is_correct = False
-        
-        return detected, is_correct
\ No newline at end of file
+
+        return detected, is_correct
+
+    def task_started(self, core_id, task, current_time):
+        pass
+
+    def is_detected(self, core_id, task, current_time):
+        detected, _ = self.check_task(task)
+        return detected
+
+    def detections(self, core_ids, is_malicious, current_time):
+        """is_detected() for the unflagged tasks running on `core_ids`, as one boolean array.
+
+        One draw per task in core order, the same random stream as calling
+        check_task() core by core.
+        """
+        rates = np.where(is_malicious, self.detection_probability, self.false_positive_probability)
+        return np.random.rand(len(core_ids)) < rates
+
+class PrecomputedSecurityMonitor(SecurityMonitor):
+    """Schedules each task's detection tick once, when it starts running.
+
+    With the default GeometricDetector this is statistically identical to
+    SecurityMonitor but costs one draw per task instead of one per busy core
+    per tick. Any detector exposing sample_delay(task, core_id) can be plugged in.
+    """
+
+    precomputed = True
+
+    def __init__(self, num_cores, detector=None, detection_probability=THREAT_DETECTION_PROBABILITY,
+                 false_positive_probability=FALSE_POSITIVE_PROBABILITY):
+        # The rates only define the default detector; a given detector carries its own.
+        super().__init__(detection_probability, false_positive_probability)
+        if detector is None:
+            detector = GeometricDetector(detection_probability, false_positive_probability)
+        self.detector = detector
+        self.detection_due = np.full(num_cores, NEVER, dtype=np.int64)
+
+    def task_started(self, core_id, task, current_time):
+        delay = self.detector.sample_delay(task, core_id)
+        self.detection_due[core_id] = NEVER if delay == NEVER else current_time + delay
+
+    def is_detected(self, core_id, task, current_time):
+        return self.detection_due[core_id] == current_time
+
+    def detections(self, core_ids, is_malicious, current_time):
+        return self.detection_due[core_ids] == current_time
+
+SECURITY_MONITORS = {
+    "bernoulli": SecurityMonitor,
+    "precomputed": PrecomputedSecurityMonitor,
+}
@@ -0,0 +1,101 @@
+# simulation/snapshot.py
+import itertools
+import os
+import pickle
+
+import numpy as np
+
+from .task import Task
+from utils.metrics import Metrics
+
+_FORMAT_VERSION = 2
+
+class Snapshot:
+    """Complete state of an Environment (or EventEnvironment) between two ticks.
+
+    Cores and their running tasks, the ready queue, temperatures, scheduler
+    pheromones, security monitor, workload position and metrics are captured
+    as one pickle, together with the global NumPy random state and the task id
+    counter, so a restored environment continues exactly as the original
+    would have. Capturing copies the state: later steps of the environment do
+    not change the snapshot, and every restore() is an independent copy.
+    """
+
+    def __init__(self, state, random_state, next_task_id, time):
+        self.state = state
+        self.random_state = random_state
+        self.next_task_id = next_task_id
+        # First tick the restored environment simulates.
+        self.time = time
+
+    @classmethod
+    def capture(cls, env):
+        if env.profiler is not None or env.decision_latency is not None:
+            raise ValueError("Profiled environments cannot be snapshotted; their timers wrap live methods")
+        next_task_id = next(Task.id_iter)
+        Task.id_iter = itertools.count(next_task_id)
+        return cls(pickle.dumps(env, protocol=pickle.HIGHEST_PROTOCOL), np.random.get_state(), next_task_id,
+                   env.next_time)
+
+    def restore(self):
+        """A new environment in the captured state; also resets the global random state."""
+        env = pickle.loads(self.state)
+        np.random.set_state(self.random_state)
+        Task.id_iter = itertools.count(self.next_task_id)
+        return env
+
+    def fork(self, scheduler=None, duration=None, reset_metrics=False, seed=None):
+        """restore() as the start of a branch.
+
+        `scheduler` takes over the ready queue and cores from the captured one
+        (its own state starts fresh). `duration` makes the branch run that many
+        more ticks; with `reset_metrics` only those ticks are measured, so a
+        warm-up can be simulated once and excluded from every branch. `seed`
+        reseeds the global random state; without it every branch continues the
+        captured random stream, i.e. the branches share common random numbers.
+        """
+        env = self.restore()
+        if seed is not None:
+            np.random.seed(seed)
+        if scheduler is not None:
+            # The new queue shares the environment's task table with the cores.
+            scheduler.ready_queue.table = env.tasks
+            for task in sorted(env.task_queue, key=lambda task: (task.arrival_time, task.id)):
+                scheduler.enqueue(task)
+            env.scheduler = scheduler
+            env.task_queue = scheduler.ready_queue
+        if duration is not None:
+            env.config = {**env.config, 'SIMULATION_DURATION': env.next_time + duration}
+            if reset_metrics:
+                env.metrics = Metrics(env.num_cores, duration)
+            else:
+                env.metrics.extend(env.next_time + duration)
+        elif reset_metrics:
+            env.metrics = Metrics(env.num_cores, env.config['SIMULATION_DURATION'] - env.next_time)
+        if reset_metrics and env.decision_cost_us is not None:
+            env.metrics.scheduling_overhead = 0.0
+        env.attach_instrumentation()
+        return env
+
+    def save(self, path):
+        """Writes the snapshot atomically, so an interrupted save keeps the previous one."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        partial = path + '.partial'
+        with open(partial, 'wb') as f:
+            pickle.dump({'version': _FORMAT_VERSION, 'state': self.state, 'random_state': self.random_state,
+                         'next_task_id': self.next_task_id, 'time': self.time}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != _FORMAT_VERSION:
+            raise ValueError(f"{path} is not a snapshot of format version {_FORMAT_VERSION}")
+        return cls(data['state'], data['random_state'], data['next_task_id'], data['time'])
+
+def load_snapshot(path):
+    """The environment saved at `path` (e.g. a checkpoint), ready to run() on."""
+    return Snapshot.load(path).restore()
\ No newline at end of file
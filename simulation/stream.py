@@ -0,0 +1,174 @@
+# simulation/stream.py
+"""Live streaming of a running simulation through Environment.run_iter().
+
+Consumers ("sinks") are callables taking each StateSample; a sink returning
+True stops the run. Three come with the module: JsonlSink, Dashboard and
+AbortWhen. From the shell, one simulation can be watched live:
+
+    python -m simulation.stream --scheduler StigmergicSentinelsScheduler --cores 16 \
+        --jsonl run.jsonl --abort-temp 95
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from config import (METRICS_LOG_INTERVAL, NUM_CORES, RANDOM_SEED, SIMULATION_DURATION, TASK_ARRIVAL_RATE,
+                    THERMAL_AMBIENT, THERMAL_HOTSPOT_THRESHOLD, THREAT_PROBABILITY)
+
+def _view(array):
+    # Zero-copy, but read-only so a consumer cannot change the running simulation.
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+class StateSample:
+    """State of a running simulation after `time` ticks.
+
+    `utilization` is the busy fraction of the cores since the previous sample.
+    The arrays (`busy`, `temperature` and the scheduler's `pheromones`) are
+    read-only views of the live simulation state, not copies: they are valid
+    until the consumer asks for the next sample. Keep as_dict() (or copies)
+    for anything that must outlive it.
+    """
+
+    def __init__(self, time, utilization, busy, temperature, queue_length, active_threats, pheromones):
+        self.time = time
+        self.utilization = utilization
+        self.busy = busy
+        self.temperature = temperature
+        self.queue_length = queue_length
+        # Malicious tasks running undetected.
+        self.active_threats = active_threats
+        self.pheromones = pheromones
+
+    @classmethod
+    def capture(cls, env, utilization):
+        cores = env.cores
+        slots = cores.task_slot[cores.busy]
+        active_threats = int(np.count_nonzero(env.tasks.is_malicious[slots] & ~env.tasks.detected_malicious[slots]))
+        return cls(env.next_time, utilization, _view(cores.busy), _view(cores.temperature), len(env.task_queue),
+                   active_threats, {name: _view(values) for name, values in env.scheduler.pheromones().items()})
+
+    def as_dict(self):
+        """A JSON-serializable copy."""
+        return {'time': self.time, 'utilization': self.utilization, 'busy_cores': int(self.busy.sum()),
+                'queue_length': self.queue_length, 'active_threats': self.active_threats,
+                'temperature': self.temperature.tolist(),
+                'pheromones': {name: values.tolist() for name, values in self.pheromones.items()}}
+
+def stream(env, sinks, interval=METRICS_LOG_INTERVAL, until=None):
+    """Runs `env` and hands every sample to each sink in turn; returns its metrics.
+
+    The run stops after the first sample any sink returns True for.
+    """
+    for sample in env.run_iter(interval, until):
+        if any([sink(sample) for sink in sinks]):
+            break
+    return env.metrics
+
+class JsonlSink:
+    """Writes each sample as one JSON line, flushed so the file can be followed while it grows."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+
+    def __call__(self, sample):
+        self.file.write(json.dumps(sample.as_dict()) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+_LEVELS = ' ▁▂▃▄▅▆▇█'
+
+class Dashboard:
+    """One terminal line, redrawn per sample: progress, utilization, queue,
+    threats and a per-core heat strip from `low` (blank) to `high` (full)."""
+
+    def __init__(self, duration=None, low=THERMAL_AMBIENT, high=THERMAL_HOTSPOT_THRESHOLD, file=None):
+        self.duration = duration
+        self.low, self.high = low, high
+        self.file = file or sys.stderr
+
+    def __call__(self, sample):
+        heat = np.clip((sample.temperature - self.low) / (self.high - self.low), 0.0, 1.0)
+        strip = ''.join(_LEVELS[level] for level in np.rint(heat * (len(_LEVELS) - 1)).astype(int))
+        progress = f"{sample.time}/{self.duration}" if self.duration else f"{sample.time}"
+        self.file.write(f"\rt={progress} util {sample.utilization:6.1%} queue {sample.queue_length:5d} "
+                        f"threats {sample.active_threats:3d} max {sample.temperature.max():5.1f}C |{strip}|")
+        self.file.flush()
+
+    def close(self):
+        self.file.write('\n')
+
+class AbortWhen:
+    """Stops the run at the first sample `predicate` holds for, recording its time."""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.time = None
+
+    def __call__(self, sample):
+        if self.predicate(sample):
+            self.time = sample.time
+            return True
+        return False
+
+def main(argv=None):
+    # Imported here: the runner imports the environments, which import this module.
+    from utils.runner import ENGINES, SCHEDULER_CLASSES, make_scheduler
+
+    parser = argparse.ArgumentParser(description="Run one simulation and watch it live.")
+    parser.add_argument('--scheduler', choices=list(SCHEDULER_CLASSES), default='StigmergicSentinelsScheduler')
+    parser.add_argument('--engine', choices=['tick', 'event'], default='tick')
+    parser.add_argument('--cores', type=int, default=NUM_CORES)
+    parser.add_argument('--arrival-rate', type=float, default=TASK_ARRIVAL_RATE, help="Tasks per second.")
+    parser.add_argument('--threat-probability', type=float, default=THREAT_PROBABILITY)
+    parser.add_argument('--duration', type=int, default=SIMULATION_DURATION)
+    parser.add_argument('--interval', type=int, default=METRICS_LOG_INTERVAL, help="Ticks between samples.")
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    parser.add_argument('--jsonl', metavar='PATH', help="Also write every sample to this JSON Lines file.")
+    parser.add_argument('--abort-temp', type=float, metavar='CELSIUS',
+                        help="Stop as soon as any core is hotter than this.")
+    parser.add_argument('--quiet', action='store_true', help="No live dashboard.")
+    args = parser.parse_args(argv)
+
+    config = {'NUM_CORES': args.cores, 'SIMULATION_DURATION': args.duration, 'ENGINE': args.engine,
+              'TASK_ARRIVAL_RATE': args.arrival_rate, 'THREAT_PROBABILITY': args.threat_probability,
+              'PROGRESS_BAR': False}
+    np.random.seed(args.seed)
+    env = ENGINES[args.engine](make_scheduler(args.scheduler, config), config)
+
+    sinks = []
+    dashboard = None if args.quiet else Dashboard(args.duration)
+    if dashboard:
+        sinks.append(dashboard)
+    jsonl = JsonlSink(args.jsonl) if args.jsonl else None
+    if jsonl:
+        sinks.append(jsonl)
+    abort = AbortWhen(lambda sample: sample.temperature.max() > args.abort_temp) if args.abort_temp else None
+    if abort:
+        sinks.append(abort)
+
+    try:
+        metrics = stream(env, sinks, args.interval)
+    finally:
+        if dashboard:
+            dashboard.close()
+        if jsonl:
+            jsonl.close()
+    if abort and abort.time is not None:
+        print(f"Aborted after {abort.time} ticks: a core passed {args.abort_temp}C")
+    else:
+        print(metrics.calculate_results())
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,128 @@ import itertools
 import numpy as np
 from config import TASK_CPU_BURST_RANGE, TASK_PRIORITY_RANGE
 
+# Column -> dtype and the value a new task starts with (None: given when it is added).
+TASK_COLUMNS = {
+    'id': (np.int64, None),
+    'arrival_time': (np.int64, None),
+    'cpu_burst': (np.int64, None),
+    'remaining_burst': (np.int64, None),
+    'priority': (np.int64, None),
+    'is_malicious': (bool, None),
+    'vruntime': (np.int64, 0),
+    'detected_malicious': (bool, False),
+    'detection_time': (np.int64, -1),
+    'completion_time': (np.int64, -1),
+}
+
+class TaskTable:
+    """The live tasks of one simulation as preallocated NumPy columns, one row ("slot") per task.
+
+    Queues and cores refer to tasks by slot, so a scan over them is one
+    fancy-indexed read of a column (e.g. ``table.is_malicious[slots]``). A
+    finished task's slot goes back on a free list and is reused by a later
+    arrival; the columns only grow, by doubling, when no slot is free.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = 0
+        self.live = np.zeros(0, dtype=bool)
+        for name, (dtype, _) in TASK_COLUMNS.items():
+            setattr(self, name, np.zeros(0, dtype=dtype))
+        self._free = []
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        self.live = np.concatenate((self.live, np.zeros(extra, dtype=bool)))
+        for name, (dtype, _) in TASK_COLUMNS.items():
+            setattr(self, name, np.concatenate((getattr(self, name), np.zeros(extra, dtype=dtype))))
+        # Popped from the end, so the lowest new slot is used first.
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def add(self, id, arrival_time, cpu_burst, priority, is_malicious):
+        """Stores a new task; returns its slot."""
+        if not self._free:
+            self._grow(max(1, 2 * self.capacity))
+        slot = self._free.pop()
+        self.live[slot] = True
+        self.id[slot] = id
+        self.arrival_time[slot] = arrival_time
+        self.cpu_burst[slot] = cpu_burst
+        self.remaining_burst[slot] = cpu_burst
+        self.priority[slot] = priority
+        self.is_malicious[slot] = is_malicious
+        for name, (_, initial) in TASK_COLUMNS.items():
+            if initial is not None:
+                getattr(self, name)[slot] = initial
+        return slot
+
+    def free(self, slots):
+        """Releases finished tasks' slots for reuse; their views are invalid from then on."""
+        slots = np.atleast_1d(slots)
+        self.live[slots] = False
+        self._free.extend(slots.tolist())
+
+    def adopt(self, task):
+        """The slot of `task` in this table, moving it here first if it lives in another one."""
+        if task.table is self:
+            return task.slot
+        source, source_slot = task.table, task.slot
+        slot = self.add(*(getattr(source, name)[source_slot] for name in
+                          ('id', 'arrival_time', 'cpu_burst', 'priority', 'is_malicious')))
+        for name in TASK_COLUMNS:
+            getattr(self, name)[slot] = getattr(source, name)[source_slot]
+        source.free(source_slot)
+        task.table, task.slot = self, slot
+        return slot
+
+    def task(self, slot):
+        """A view of the task in `slot`."""
+        task = Task.__new__(Task)
+        task.table, task.slot = self, int(slot)
+        return task
+
+    def __len__(self):
+        return self.capacity - len(self._free)
+
 class Task:
+    """View of one row of a TaskTable, for code that works one task at a time.
+
+    Attributes read and write the table's columns. A view stays valid while
+    its task is live, i.e. until the environment frees the task on completion.
+    """
+
+    __slots__ = ('table', 'slot')
     id_iter = itertools.count()
 
-    def __init__(self, arrival_time, threat_probability):
-        self.id = next(self.id_iter)
-        self.arrival_time = arrival_time
-        self.cpu_burst = np.random.randint(*TASK_CPU_BURST_RANGE)
-        self.remaining_burst = self.cpu_burst
-        self.priority = np.random.randint(*TASK_PRIORITY_RANGE)
-        self.is_malicious = np.random.rand() < threat_probability
-        self.vruntime = 0
-        self.detected_malicious = False
-        self.detection_time = -1
-        self.completion_time = -1
+    def __init__(self, arrival_time, threat_probability=None, cpu_burst=None, priority=None, is_malicious=None,
+                 table=None):
+        # Attributes that are not given (e.g. by a Workload) are drawn at random.
+        # Without a table the task gets one of its own; queues and cores adopt it into theirs.
+        id = next(self.id_iter)
+        cpu_burst = np.random.randint(*TASK_CPU_BURST_RANGE) if cpu_burst is None else cpu_burst
+        priority = np.random.randint(*TASK_PRIORITY_RANGE) if priority is None else priority
+        is_malicious = np.random.rand() < threat_probability if is_malicious is None else is_malicious
+        self.table = TaskTable(1) if table is None else table
+        self.slot = self.table.add(id, arrival_time, cpu_burst, priority, is_malicious)
+
+    def __eq__(self, other):
+        return isinstance(other, Task) and self.table is other.table and self.slot == other.slot
+
+    def __hash__(self):
+        return hash((id(self.table), self.slot))
 
     def __repr__(self):
-        return f"Task(id={self.id}, burst={self.remaining_burst}/{self.cpu_burst}, malicious={self.is_malicious})"
\ No newline at end of file
+        return f"Task(id={self.id}, burst={self.remaining_burst}/{self.cpu_burst}, malicious={self.is_malicious})"
+
+def _column(name):
+    def get(task):
+        return getattr(task.table, name).item(task.slot)
+
+    def set(task, value):
+        getattr(task.table, name)[task.slot] = value
+    return property(get, set)
+
+for _name in TASK_COLUMNS:
+    setattr(Task, _name, _column(_name))
\ No newline at end of file
@@ -1,29 +1,176 @@
 # simulation/thermal_model.py
 import numpy as np
+from .topology import ThermalTopology, make_topology
 from config import (THERMAL_AMBIENT, THERMAL_ACTIVE_INCREASE,
-                    THERMAL_IDLE_DECREASE, THERMAL_NEIGHBOR_INFLUENCE)
+                    THERMAL_IDLE_DECREASE, THERMAL_NEIGHBOR_INFLUENCE, THERMAL_TOPOLOGY)
+
+# Above this size the cached eigendecompositions (cores**2 floats each) take too much memory.
+_CLOSED_FORM_MAX_CORES = 128
+_SPECTRUM_CACHE_SIZE = 512
+# Stepwise propagation steps only the cores that can change once they are at most 1/this of all.
+_SUBSET_STEP_FRACTION = 8
+
+def _eigh_cost_in_steps(num_cores):
+    """About how many stepwise ticks one eigendecomposition of the thermal map costs (measured)."""
+    return 5 + 4.5e-5 * num_cores ** 3
+
+def geometric_sum(x, ticks):
+    """sum_{j=0}^{ticks-1} x**j, element-wise and stable around x == 1."""
+    x = np.asarray(x, dtype=float)
+    near_one = np.abs(1.0 - x) < 1e-12
+    safe = np.where(near_one, 0.0, x)
+    return np.where(near_one, np.asarray(ticks, dtype=float), (1.0 - safe ** ticks) / (1.0 - safe))
+
+def mixed_sum(x, r, ticks):
+    """sum_{i=0}^{ticks-1} x**i * r**(ticks-1-i), element-wise and stable around x == r."""
+    x = np.asarray(x, dtype=float)
+    near_r = np.abs(x - r) < 1e-9
+    safe = np.where(near_r, r + 1.0, x)
+    return np.where(near_r, ticks * r ** (ticks - 1), (safe ** ticks - r ** ticks) / (safe - r))
 
 class ThermalModel:
-    def __init__(self, num_cores):
+    # Constructor keyword of each parameter -> its config.py name.
+    config_parameters = {'ambient': 'THERMAL_AMBIENT', 'active_increase': 'THERMAL_ACTIVE_INCREASE',
+                         'idle_decrease': 'THERMAL_IDLE_DECREASE', 'neighbor_influence': 'THERMAL_NEIGHBOR_INFLUENCE'}
+
+    def __init__(self, num_cores, topology=None, ambient=THERMAL_AMBIENT, active_increase=THERMAL_ACTIVE_INCREASE,
+                 idle_decrease=THERMAL_IDLE_DECREASE, neighbor_influence=THERMAL_NEIGHBOR_INFLUENCE):
         self.num_cores = num_cores
+        self.topology = ThermalTopology.chain(num_cores) if topology is None else topology
+        self.ambient = ambient
+        self.active_increase = active_increase
+        self.idle_decrease = idle_decrease
+        self.neighbor_influence = neighbor_influence
+        # Dense, so only built for the closed-form propagation of small packages.
+        self._coupling_matrix = None
+        self._spectra = {}
+        # Busy set -> ticks stepped with it while it has no cached spectrum.
+        self._stepped = {}
+
+    def __getstate__(self):
+        # The caches are rebuilt on demand; leaving them out keeps snapshots small.
+        return {**self.__dict__, '_coupling_matrix': None, '_spectra': {}, '_stepped': {}}
+
+    @classmethod
+    def from_config(cls, num_cores, config):
+        """Built on the config's THERMAL_TOPOLOGY with the parameters it overrides."""
+        topology = make_topology(config.get('THERMAL_TOPOLOGY', THERMAL_TOPOLOGY), num_cores)
+        return cls(num_cores, topology, **{arg: config[name] for arg, name in cls.config_parameters.items()
+                                           if name in config})
+
+    def next_temperatures(self, temps, busy, cores=None):
+        """One thermal step over the cores (the last axis) and their topology neighbors.
+
+        With `cores` (an index array into 1-D `temps`) only those cores' new temperatures are returned.
+        """
+        neighbor_mean = self.topology.neighbor_mean(temps, cores)
+        if cores is not None:
+            temps, busy = temps[cores], busy[cores]
+        heating = np.where(busy, self.active_increase, -np.maximum(0, (temps - self.ambient) * self.idle_decrease))
+        return temps + heating + (neighbor_mean - temps) * self.neighbor_influence
 
     def update(self, cores):
-        current_temps = np.array([core.temperature for core in cores])
-        next_temps = np.copy(current_temps)
+        cores.temperature[:] = self.next_temperatures(cores.temperature, cores.busy)
+
+    # --- Closed-form propagation for the event-driven engine ---
 
-        for core in cores:
-            if not core.is_idle():
-                next_temps[core.id] += THERMAL_ACTIVE_INCREASE
+    def _affine_map(self, busy):
+        """Returns (M, c) with T_next = M @ T + c for a fixed busy set.
+
+        This is exact as long as no core is below ambient, which always holds when
+        the cores start at ambient: idle cooling never clips at zero.
+        """
+        neighbors = self._coupling()
+        idle = ~busy
+        diagonal = 1.0 - self.neighbor_influence - self.idle_decrease * idle
+        matrix = np.diag(diagonal) + self.neighbor_influence * neighbors
+        offset = self.active_increase * busy + self.idle_decrease * self.ambient * idle
+        return matrix, offset
+
+    def _coupling(self):
+        if self._coupling_matrix is None:
+            self._coupling_matrix = self.topology.coupling_matrix()
+        return self._coupling_matrix
+
+    def _spectrum(self, busy):
+        key = busy.tobytes()
+        spectrum = self._spectra.get(key)
+        if spectrum is None:
+            matrix, offset = self._affine_map(busy)
+            # Topology coupling is symmetric, so the map diagonalises orthogonally.
+            eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+            spectrum = (eigenvalues, eigenvectors, eigenvectors.T @ offset)
+            if len(self._spectra) >= _SPECTRUM_CACHE_SIZE:
+                self._spectra.clear()
+            self._spectra[key] = spectrum
+        return spectrum
+
+    def propagate(self, temps, busy, ticks, decay=None):
+        """Temperatures after `ticks` updates with an unchanged busy set.
+
+        With `decay` set, also returns sum_{j=1..ticks} decay**(ticks-j) * T_j, the
+        quantity an exponentially evaporating deposit proportional to temperature
+        accumulates over the same ticks.
+        """
+        temps = np.asarray(temps, dtype=float)
+        busy = np.asarray(busy, dtype=bool)
+        if self.num_cores > _CLOSED_FORM_MAX_CORES:
+            return self._propagate_stepwise(temps, busy, ticks, decay)
+        # A busy set is stepped until the ticks stepped with it would have paid for its spectrum.
+        key = busy.tobytes()
+        if key not in self._spectra:
+            stepped = self._stepped.get(key, 0) + ticks
+            if stepped < _eigh_cost_in_steps(self.num_cores):
+                if len(self._stepped) >= _SPECTRUM_CACHE_SIZE:
+                    self._stepped.clear()
+                self._stepped[key] = stepped
+                return self._propagate_stepwise(temps, busy, ticks, decay)
+
+        eigenvalues, eigenvectors, forcing = self._spectrum(busy)
+        start = eigenvectors.T @ temps
+        powers = geometric_sum(eigenvalues, ticks)
+        end = eigenvalues ** ticks * start + powers * forcing
+        final_temps = eigenvectors @ end
+        if decay is None:
+            return final_temps
+
+        mixed = mixed_sum(eigenvalues, decay, ticks)
+        weighted = eigenvalues * mixed * start + (powers - decay * mixed) / (1.0 - decay) * forcing
+        return final_temps, eigenvectors @ weighted
+
+    def _propagate_stepwise(self, temps, busy, ticks, decay):
+        """propagate() one step at a time, stepping only the cores that can still change.
+
+        A core's next temperature depends only on its own and its neighbors'
+        current ones, and idle cores settle at exactly ambient. Once few cores
+        change in a step, only those and their neighbors are stepped next (on
+        a large package, the cores near recent work); the temperatures stay
+        bit-identical to stepping every core.
+        """
+        temps = temps.copy()
+        weighted = np.zeros_like(temps)
+        # Cores to step, None for all.
+        cores = None
+        for _ in range(ticks):
+            if cores is None:
+                new_temps = self.next_temperatures(temps, busy)
+                changed = np.flatnonzero(new_temps != temps)
+                temps = new_temps
             else:
-                decrease = (core.temperature - THERMAL_AMBIENT) * THERMAL_IDLE_DECREASE
-                next_temps[core.id] -= max(0, decrease)
-
-            left_neighbor_temp = current_temps[core.id - 1] if core.id > 0 else current_temps[core.id]
-            right_neighbor_temp = current_temps[core.id + 1] if core.id < self.num_cores - 1 else current_temps[core.id]
-            avg_neighbor_temp = (left_neighbor_temp + right_neighbor_temp) / 2
-            
-            influence = (avg_neighbor_temp - current_temps[core.id]) * THERMAL_NEIGHBOR_INFLUENCE
-            next_temps[core.id] += influence
-
-        for i, core in enumerate(cores):
-            core.temperature = next_temps[i]
\ No newline at end of file
+                new_temps = self.next_temperatures(temps, busy, cores)
+                changed = cores[new_temps != temps[cores]]
+                temps[cores] = new_temps
+            if decay is not None:
+                weighted *= decay
+                weighted += temps
+            if len(changed) * _SUBSET_STEP_FRACTION > len(temps):
+                cores = None
+                continue
+            stepped = np.zeros(len(temps), dtype=bool)
+            stepped[changed] = True
+            stepped[self.topology.neighbors[changed]] = True
+            cores = np.flatnonzero(stepped)
+        return temps if decay is None else (temps, weighted)
+
+    def advance(self, cores, ticks):
+        cores.temperature[:] = self.propagate(cores.temperature, cores.busy, ticks)
@@ -0,0 +1,123 @@
+# simulation/topology.py
+import numpy as np
+
+class ThermalTopology:
+    """Which cores exchange heat, as a padded neighbor table.
+
+    Row i of `neighbors` lists the cores adjacent to core i, padded with i
+    itself up to the largest degree D, so a core's neighbor temperature is the
+    mean of one fixed-width gather and each link conducts 1/D of the
+    influence. Padding with the core itself contributes no heat flow, which is
+    how the original chain treats the two end cores, and keeps the coupling
+    symmetric for any undirected graph.
+    """
+
+    def __init__(self, neighbors, name='custom'):
+        self.neighbors = np.asarray(neighbors, dtype=np.int64).reshape(len(neighbors), -1)
+        self.num_cores = len(self.neighbors)
+        self.name = name
+        # Slot-major copy, so each gathered slot is one contiguous row.
+        self._slots = np.ascontiguousarray(self.neighbors.T)
+
+    @classmethod
+    def from_adjacency_lists(cls, adjacency, name='custom'):
+        num_cores = len(adjacency)
+        degree = max((len(adjacent) for adjacent in adjacency), default=0)
+        table = np.repeat(np.arange(num_cores)[:, None], degree, axis=1)
+        for core_id, adjacent in enumerate(adjacency):
+            table[core_id, :len(adjacent)] = sorted(adjacent)
+        return cls(table, name)
+
+    @classmethod
+    def from_edges(cls, num_cores, edges, name='custom'):
+        """Undirected links given as (core, core) pairs."""
+        adjacency = [set() for _ in range(num_cores)]
+        for a, b in edges:
+            if a != b:
+                adjacency[a].add(b)
+                adjacency[b].add(a)
+        return cls.from_adjacency_lists(adjacency, name)
+
+    @classmethod
+    def from_adjacency(cls, matrix, name='custom'):
+        """From a symmetric (num_cores, num_cores) adjacency matrix."""
+        matrix = np.asarray(matrix) != 0
+        if not np.array_equal(matrix, matrix.T):
+            raise ValueError("Thermal coupling must be symmetric: heat flows both ways along a link.")
+        return cls.from_edges(len(matrix), zip(*np.nonzero(np.triu(matrix, 1))), name)
+
+    @classmethod
+    def chain(cls, num_cores):
+        """The original layout: core i touches cores i-1 and i+1."""
+        idx = np.arange(num_cores)
+        return cls(np.stack([np.maximum(idx - 1, 0), np.minimum(idx + 1, num_cores - 1)], axis=1), 'chain')
+
+    @classmethod
+    def mesh(cls, rows, cols):
+        """2D grid, row-major core ids, each core touching its four neighbors."""
+        r, c = np.divmod(np.arange(rows * cols), cols)
+        table = np.stack([np.maximum(r - 1, 0) * cols + c, r * cols + np.maximum(c - 1, 0),
+                          r * cols + np.minimum(c + 1, cols - 1), np.minimum(r + 1, rows - 1) * cols + c], axis=1)
+        return cls(table, f'mesh:{rows}x{cols}')
+
+    @classmethod
+    def sockets(cls, num_sockets, socket):
+        """`num_sockets` thermally separate packages, each laid out as `socket`."""
+        offsets = np.arange(num_sockets)[:, None, None] * socket.num_cores
+        return cls((socket.neighbors[None] + offsets).reshape(-1, socket.neighbors.shape[1]),
+                   f'sockets:{num_sockets}x{socket.name}')
+
+    def neighbor_mean(self, temps, cores=None):
+        """Mean temperature over each core's padded neighbor row (along the last axis).
+
+        With `cores` (an index array into a 1-D `temps`) only those cores' means are computed.
+        """
+        if self.neighbors.shape[1] == 0:
+            return temps if cores is None else temps[cores]
+        gathered = np.take(temps, self._slots if cores is None else self._slots[:, cores], axis=-1)
+        total = gathered[..., 0, :]
+        for k in range(1, len(self._slots)):
+            total = total + gathered[..., k, :]
+        return total / len(self._slots)
+
+    def coupling_matrix(self):
+        """Dense (num_cores, num_cores) matrix of neighbor_mean as a linear map."""
+        matrix = np.zeros((self.num_cores, self.num_cores))
+        if self.neighbors.shape[1] == 0:
+            np.fill_diagonal(matrix, 1.0)
+            return matrix
+        rows = np.repeat(np.arange(self.num_cores), self.neighbors.shape[1])
+        np.add.at(matrix, (rows, self.neighbors.ravel()), 1.0 / self.neighbors.shape[1])
+        return matrix
+
+def _grid_shape(num_cores):
+    rows = int(np.sqrt(num_cores))
+    while num_cores % rows:
+        rows -= 1
+    return rows, num_cores // rows
+
+def make_topology(spec, num_cores):
+    """Builds a topology from a THERMAL_TOPOLOGY setting.
+
+    'chain', 'mesh' (the squarest grid), 'mesh:RxC', 'sockets:S' (S separate
+    squarest meshes) or a ThermalTopology instance.
+    """
+    if isinstance(spec, ThermalTopology):
+        topology = spec
+    elif spec == 'chain':
+        topology = ThermalTopology.chain(num_cores)
+    elif spec == 'mesh':
+        topology = ThermalTopology.mesh(*_grid_shape(num_cores))
+    elif spec.startswith('mesh:'):
+        rows, cols = (int(x) for x in spec[len('mesh:'):].split('x'))
+        topology = ThermalTopology.mesh(rows, cols)
+    elif spec.startswith('sockets:'):
+        num_sockets = int(spec[len('sockets:'):])
+        if num_cores % num_sockets:
+            raise ValueError(f"{num_cores} cores cannot be split evenly over {num_sockets} sockets")
+        topology = ThermalTopology.sockets(num_sockets, ThermalTopology.mesh(*_grid_shape(num_cores // num_sockets)))
+    else:
+        raise ValueError(f"Unknown thermal topology {spec!r}")
+    if topology.num_cores != num_cores:
+        raise ValueError(f"Topology {topology.name} has {topology.num_cores} cores, expected {num_cores}")
+    return topology
\ No newline at end of file
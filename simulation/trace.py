@@ -0,0 +1,168 @@
+# simulation/trace.py
+"""Replay of recorded task traces through the simulator.
+
+Traces are read as WorkloadSources, one chunk at a time, from three formats:
+
+- CSV with a header row,
+- JSON Lines, one object per task,
+- a compact binary format read through a memory map (write_trace converts
+  any source to it; `python -m simulation.trace IN OUT` from the shell).
+
+Each task needs an arrival tick, a CPU burst, a priority and a malicious
+label; `columns` maps those fields to differently named trace columns.
+Tasks must be ordered by arrival time.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+from abc import abstractmethod
+
+import numpy as np
+
+from .workload import WORKLOAD_FIELDS, Workload, WorkloadSource
+
+CHUNK_SIZE = 65536
+# 14 bytes per task.
+TRACE_DTYPE = np.dtype([('arrival_time', '<i8'), ('cpu_burst', '<u4'), ('priority', '<u1'), ('is_malicious', '?')])
+# File header: magic, then the task count as a little-endian uint64.
+_MAGIC = b'SSTRACE\x01'
+_HEADER_SIZE = len(_MAGIC) + 8
+_TRUE = {'1', 'true', 't', 'yes', 'y'}
+
+def _as_bool(value):
+    return value if isinstance(value, bool) else str(value).strip().lower() in _TRUE
+
+def _workload_from_rows(rows):
+    arrival_time, cpu_burst, priority, is_malicious = zip(*rows)
+    # Through float so '12.0' parses like '12'.
+    return Workload(np.array(arrival_time, dtype=float).astype(np.int64),
+                    np.array(cpu_burst, dtype=float).astype(np.int64),
+                    np.array(priority, dtype=float).astype(np.int64),
+                    [_as_bool(value) for value in is_malicious])
+
+class _TextTraceSource(WorkloadSource):
+    def __init__(self, path, chunk_size=CHUNK_SIZE, columns=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.columns = [(columns or {}).get(field, field) for field in WORKLOAD_FIELDS]
+
+    @abstractmethod
+    def _rows(self, f):
+        """The trace's tasks as [arrival_time, cpu_burst, priority, is_malicious] rows."""
+        pass
+
+    def chunks(self, start=0):
+        with open(self.path, newline='') as f:
+            rows = itertools.islice(self._rows(f), start, None)
+            while True:
+                batch = list(itertools.islice(rows, self.chunk_size))
+                if not batch:
+                    return
+                yield _workload_from_rows(batch)
+
+class CsvTraceSource(_TextTraceSource):
+    def _rows(self, f):
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader)]
+        missing = [name for name in self.columns if name not in header]
+        if missing:
+            raise ValueError(f"{self.path}: no column(s) {', '.join(missing)}")
+        index = [header.index(name) for name in self.columns]
+        for row in reader:
+            if row:
+                yield [row[i] for i in index]
+
+class JsonlTraceSource(_TextTraceSource):
+    def _rows(self, f):
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield [record[name] for name in self.columns]
+
+class BinaryTraceSource(WorkloadSource):
+    """A trace written by write_trace, memory-mapped and read a chunk at a time."""
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER_SIZE)
+        if header[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a binary task trace")
+        self.num_tasks = int(np.frombuffer(header, dtype='<u8', offset=len(_MAGIC))[0])
+
+    def __len__(self):
+        return self.num_tasks
+
+    def chunks(self, start=0):
+        if start >= self.num_tasks:
+            return
+        records = np.memmap(self.path, dtype=TRACE_DTYPE, mode='r', offset=_HEADER_SIZE, shape=(self.num_tasks,))
+        for first in range(start, self.num_tasks, self.chunk_size):
+            chunk = records[first:first + self.chunk_size]
+            yield Workload(*(chunk[name] for name in WORKLOAD_FIELDS))
+
+def is_binary_trace(path):
+    with open(path, 'rb') as f:
+        return f.read(len(_MAGIC)) == _MAGIC
+
+def open_trace(path, chunk_size=CHUNK_SIZE, columns=None):
+    """A WorkloadSource for a trace file: binary (recognized by its header),
+    otherwise CSV or JSON Lines by extension."""
+    if is_binary_trace(path):
+        return BinaryTraceSource(path, chunk_size)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return CsvTraceSource(path, chunk_size, columns)
+    if extension in ('.jsonl', '.ndjson'):
+        return JsonlTraceSource(path, chunk_size, columns)
+    raise ValueError(f"Cannot tell the trace format of {path}: expected .csv, .jsonl or a binary trace")
+
+def write_trace(path, source):
+    """Streams any WorkloadSource into a binary trace; returns the task count."""
+    num_tasks = 0
+    last_arrival = None
+    partial = path + '.partial'
+    try:
+        with open(partial, 'wb') as f:
+            f.write(_MAGIC + np.uint64(0).astype('<u8').tobytes())
+            for chunk in source.chunks():
+                if not len(chunk):
+                    continue
+                arrival_time = chunk.arrival_time
+                if (last_arrival is not None and arrival_time[0] < last_arrival) or \
+                        np.any(arrival_time[1:] < arrival_time[:-1]):
+                    raise ValueError("Trace tasks must be ordered by arrival time")
+                last_arrival = arrival_time[-1]
+                for name in ('cpu_burst', 'priority'):
+                    values, limit = getattr(chunk, name), np.iinfo(TRACE_DTYPE[name]).max
+                    if values.min() < 0 or values.max() > limit:
+                        raise ValueError(f"Trace {name} outside the binary format's range 0..{limit}")
+                records = np.empty(len(chunk), dtype=TRACE_DTYPE)
+                for name in WORKLOAD_FIELDS:
+                    records[name] = getattr(chunk, name)
+                records.tofile(f)
+                num_tasks += len(chunk)
+            f.seek(len(_MAGIC))
+            f.write(np.uint64(num_tasks).astype('<u8').tobytes())
+    except BaseException:
+        os.remove(partial)
+        raise
+    os.replace(partial, path)
+    return num_tasks
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a CSV or JSON Lines task trace to the binary format.")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--column', action='append', default=[], metavar='FIELD=NAME',
+                        help=f"Trace column holding a task field ({', '.join(WORKLOAD_FIELDS)}).")
+    args = parser.parse_args(argv)
+    columns = dict(mapping.split('=', 1) for mapping in args.column)
+    num_tasks = write_trace(args.output, open_trace(args.input, columns=columns))
+    print(f"Wrote {num_tasks} tasks to {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+# simulation/workload.py
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from .task import Task
+from config import TASK_CPU_BURST_RANGE, TASK_PRIORITY_RANGE
+
+WORKLOAD_FIELDS = ('arrival_time', 'cpu_burst', 'priority', 'is_malicious')
+
+class WorkloadSource(ABC):
+    """Tasks in arrival order, delivered as a stream of Workload chunks.
+
+    Environment pulls the next chunk only when simulated time reaches it (see
+    WorkloadFeed), so a source backed by a file never needs more than one
+    chunk in memory, however long the trace.
+    """
+
+    @abstractmethod
+    def chunks(self, start=0):
+        """Workload chunks from the `start`-th task on."""
+        pass
+
+    def read(self, until=None):
+        """The tasks arriving before tick `until` (all when None), as one Workload."""
+        parts = []
+        for chunk in self.chunks():
+            if until is not None and len(chunk) and chunk.arrival_time[-1] >= until:
+                parts.append(chunk.select(slice(0, np.searchsorted(chunk.arrival_time, until))))
+                break
+            parts.append(chunk)
+        return Workload.concatenate(parts)
+
+class Workload(WorkloadSource):
+    """The complete task stream of one run: arrival ticks and task attributes.
+
+    Generated in one batched draw, it can be saved, reloaded and replayed, so
+    several schedulers can be compared on the identical stream (common random
+    numbers), which removes workload noise from their differences.
+    """
+
+    def __init__(self, arrival_time, cpu_burst, priority, is_malicious):
+        self.arrival_time = np.asarray(arrival_time, dtype=np.int64)
+        self.cpu_burst = np.asarray(cpu_burst, dtype=np.int64)
+        self.priority = np.asarray(priority, dtype=np.int64)
+        self.is_malicious = np.asarray(is_malicious, dtype=bool)
+
+    @classmethod
+    def generate(cls, duration, arrival_rate, threat_probability, seed=None):
+        """Same distribution as Environment's per-tick draws: at most one task per
+        tick, arriving with probability P(Poisson(rate / 1000) > 0)."""
+        rng = np.random.default_rng(seed)
+        arrival_probability = 1.0 - np.exp(-arrival_rate / 1000.0)
+        arrival_time = np.flatnonzero(rng.random(duration) < arrival_probability)
+        num_tasks = len(arrival_time)
+        return cls(
+            arrival_time,
+            rng.integers(*TASK_CPU_BURST_RANGE, size=num_tasks),
+            rng.integers(*TASK_PRIORITY_RANGE, size=num_tasks),
+            rng.random(num_tasks) < threat_probability,
+        )
+
+    @classmethod
+    def for_config(cls, config, seed=None):
+        return cls.generate(config['SIMULATION_DURATION'], config['TASK_ARRIVAL_RATE'],
+                            config['THREAT_PROBABILITY'], seed)
+
+    @classmethod
+    def concatenate(cls, workloads):
+        workloads = list(workloads)
+        if not workloads:
+            return cls([], [], [], [])
+        return cls(*(np.concatenate([getattr(w, name) for w in workloads]) for name in WORKLOAD_FIELDS))
+
+    def __len__(self):
+        return len(self.arrival_time)
+
+    def chunks(self, start=0):
+        yield self.select(slice(start, None)) if start else self
+
+    def select(self, index):
+        return Workload(*(getattr(self, name)[index] for name in WORKLOAD_FIELDS))
+
+    def task(self, index, table=None):
+        return Task(int(self.arrival_time[index]), cpu_burst=int(self.cpu_burst[index]),
+                    priority=int(self.priority[index]), is_malicious=bool(self.is_malicious[index]), table=table)
+
+    def save(self, path):
+        np.savez_compressed(path, arrival_time=self.arrival_time, cpu_burst=self.cpu_burst,
+                            priority=self.priority, is_malicious=self.is_malicious)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['arrival_time'], data['cpu_burst'], data['priority'], data['is_malicious'])
+
+
+class WorkloadFeed:
+    """Cursor that hands a WorkloadSource's tasks to a simulation as time advances.
+
+    Holds one chunk at a time and checks that arrivals never go back in time,
+    within or across chunks. Pickling keeps only the source and how many tasks
+    were delivered; unpickling reopens the source at that task.
+    """
+
+    def __init__(self, source, start=0):
+        self.source = source
+        self._chunks = iter(source.chunks(start))
+        self.chunk = None
+        self.position = 0
+        self.delivered = start
+        self._last_arrival = None
+        self._next_chunk()
+
+    def __getstate__(self):
+        return {'source': self.source, 'delivered': self.delivered}
+
+    def __setstate__(self, state):
+        self.__init__(state['source'], state['delivered'])
+
+    def _next_chunk(self):
+        self.chunk = None
+        self.position = 0
+        for chunk in self._chunks:
+            if not len(chunk):
+                continue
+            arrival_time = chunk.arrival_time
+            previous = arrival_time[0] if self._last_arrival is None else self._last_arrival
+            if arrival_time[0] < previous or np.any(arrival_time[1:] < arrival_time[:-1]):
+                raise ValueError("Workload tasks must be ordered by arrival time")
+            self._last_arrival = arrival_time[-1]
+            self.chunk = chunk
+            return
+
+    def next_arrival(self):
+        """Arrival tick of the next undelivered task, or None when the source is exhausted."""
+        return None if self.chunk is None else int(self.chunk.arrival_time[self.position])
+
+    def due(self, t, table=None):
+        """The undelivered tasks arriving at or before tick `t`, in order, added to `table`."""
+        tasks = []
+        while self.chunk is not None and self.chunk.arrival_time[self.position] <= t:
+            end = int(np.searchsorted(self.chunk.arrival_time, t, side='right'))
+            tasks.extend(self.chunk.task(i, table) for i in range(self.position, end))
+            self.delivered += end - self.position
+            self.position = end
+            if end == len(self.chunk):
+                self._next_chunk()
+        return tasks
\ No newline at end of file
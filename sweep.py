@@ -0,0 +1,110 @@
+# sweep.py
+"""Hyperparameter sweeps of one scheduler's (or the thermal and security models')
+config.py parameters over scenarios of the experiment matrix.
+
+    python sweep.py --param RHO_T=0.05,0.1,0.2 --param GAMMA=1:3 --strategy grid --grid-points 3
+    python sweep.py --param ALPHA=0.25:4:log --param DELTA=0.5:3 --strategy halving --samples 27 \
+        --cores 8 --loads heavy --threats high --runs 9 --workers 8
+
+Writes one ranked table of parameter sets per scenario to --output.
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from main import CORE_LEVELS, LOAD_LEVELS, THREAT_LEVELS
+from utils.runner import SCHEDULER_CLASSES
+from utils.result_cache import ResultCache
+from utils.sweep import Parameter, SweepEngine, grid_candidates, random_candidates
+import config as default_config
+
+DEFAULT_OBJECTIVE = {'Thermal Hotspots': 1.0, 'Avg Isolation Time (ms)': 1.0}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Search scheduler, thermal and security parameters.")
+    parser.add_argument('--param', action='append', required=True, metavar='SPEC',
+                        help="Swept config.py parameter: NAME=v1,v2,..., NAME=low:high or NAME=low:high:log.")
+    parser.add_argument('--scheduler', choices=list(SCHEDULER_CLASSES), default='StigmergicSentinelsScheduler')
+    parser.add_argument('--strategy', choices=['grid', 'random', 'halving'], default='grid',
+                        help="'halving' runs successive halving over random samples (grid values if none are ranges).")
+    parser.add_argument('--grid-points', type=int, default=3, help="Grid values per range parameter.")
+    parser.add_argument('--samples', type=int, default=20, help="Parameter sets drawn by random and halving.")
+    parser.add_argument('--runs', type=int, default=5, help="Runs per parameter set (the most runs with halving).")
+    parser.add_argument('--min-runs', type=int, default=1, help="Runs per parameter set in halving's first round.")
+    parser.add_argument('--eta', type=int, default=3, help="Halving keeps 1/eta of the candidates per round.")
+    parser.add_argument('--objective', action='append', metavar='METRIC=WEIGHT',
+                        help="Minimised weighted sum of metric means (negative weights maximise); "
+                             "default: Thermal Hotspots + Avg Isolation Time (ms).")
+    parser.add_argument('--cores', type=int, nargs='+', default=CORE_LEVELS)
+    parser.add_argument('--loads', nargs='+', choices=list(LOAD_LEVELS), default=list(LOAD_LEVELS))
+    parser.add_argument('--threats', nargs='+', choices=list(THREAT_LEVELS), default=list(THREAT_LEVELS))
+    parser.add_argument('--engine', choices=['tick', 'event'], default='tick')
+    parser.add_argument('--duration', type=int, default=default_config.SIMULATION_DURATION)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=default_config.RANDOM_SEED, help="Seed of the random samples.")
+    parser.add_argument('--cache-dir', default='.cache/results')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--output', default='sweep_results.csv')
+    parser.add_argument('--top', type=int, default=5, help="Parameter sets printed per scenario.")
+    args = parser.parse_args(argv)
+    try:
+        args.param = [Parameter.parse(spec) for spec in args.param]
+    except ValueError as error:
+        parser.error(f"--param: {error}")
+    return args
+
+def make_scenarios(args):
+    scenarios = {}
+    for cores in args.cores:
+        for load_name in args.loads:
+            for threat_name in args.threats:
+                name = f"cores_{cores}_load_{load_name}_threat_{threat_name}"
+                scenarios[name] = {
+                    'name': name,
+                    'NUM_CORES': cores,
+                    'TASK_ARRIVAL_RATE': LOAD_LEVELS[load_name],
+                    'THREAT_PROBABILITY': THREAT_LEVELS[threat_name],
+                    'SIMULATION_DURATION': args.duration,
+                    'ENGINE': args.engine,
+                    'PROGRESS_BAR': False,
+                }
+    return scenarios
+
+def main(argv=None):
+    args = parse_args(argv)
+    parameters = args.param
+    weights = DEFAULT_OBJECTIVE
+    if args.objective:
+        weights = {metric: float(weight) for metric, _, weight in (o.rpartition('=') for o in args.objective)}
+
+    has_range = any(p.values is None for p in parameters)
+    if args.strategy == 'grid' or (args.strategy == 'halving' and not has_range):
+        candidates = grid_candidates(parameters, args.grid_points)
+    else:
+        candidates = random_candidates(parameters, args.samples, args.seed)
+
+    scenarios = make_scenarios(args)
+    print(f"--- {len(candidates)} parameter sets x {len(scenarios)} scenario(s), {args.strategy} search ---")
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    engine = SweepEngine(scenarios, args.scheduler, weights, args.workers, cache)
+    if args.strategy == 'halving':
+        rankings = engine.successive_halving(candidates, args.runs, args.min_runs, args.eta)
+    else:
+        rankings = engine.evaluate_all(candidates, args.runs)
+
+    rows = [candidate.row(rank + 1) for ranking in rankings.values() for rank, candidate in enumerate(ranking)]
+    table = pd.DataFrame(rows)
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    table.to_csv(args.output, index=False)
+
+    columns = ['rank'] + [p.name for p in parameters] + ['runs', 'score']
+    for name in scenarios:
+        print(f"\n--- {name} ---")
+        print(table[table['scenario'] == name][columns].head(args.top).to_string(index=False))
+    print(f"\n--- Ranked parameter sets saved to {args.output} ---")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
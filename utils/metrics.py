@@ -2,55 +2,205 @@
 import numpy as np
 from config import METRICS_LOG_INTERVAL, THERMAL_HOTSPOT_THRESHOLD
 
+SERIES_NAMES = ('avg_temp', 'cpu_util', 'active_threats')
+
+class RunningStats:
+    """Streaming count, mean, variance, min and max (Welford) of values of `shape`."""
+
+    def __init__(self, shape=()):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def add(self, value):
+        value = np.asarray(value, dtype=float)
+        self.count += 1
+        delta = value - self.mean
+        self.mean = self.mean + delta / self.count
+        self._m2 = self._m2 + delta * (value - self.mean)
+        self.min = np.minimum(self.min, value)
+        self.max = np.maximum(self.max, value)
+
+    @property
+    def variance(self):
+        """Sample variance (NaN below two observations)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else np.full_like(self._m2, np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+class P2Quantile:
+    """P-square estimate (Jain & Chlamtac) of the `p` quantile of each element of
+    a stream of equally shaped arrays, in five markers per element."""
+
+    def __init__(self, p, size):
+        self.p = p
+        self.count = 0
+        self._first = np.zeros((5, size))
+        self._increment = np.array([0.0, p / 2, p, (1 + p) / 2, 1.0])
+
+    def add(self, x):
+        x = np.asarray(x, dtype=float)
+        if self.count < 5:
+            self._first[self.count] = x
+            self.count += 1
+            if self.count == 5:
+                self.q = np.sort(self._first, axis=0).T.copy()
+                self.n = np.tile(np.arange(1.0, 6.0), (x.size, 1))
+                self.desired = np.tile(1 + 4 * self._increment, (x.size, 1))
+            return
+
+        self.count += 1
+        q, n = self.q, self.n
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+        cell = (x >= q[:, 1]).astype(int) + (x >= q[:, 2]) + (x >= q[:, 3])
+        n += np.arange(5) > cell[:, None]
+        self.desired += self._increment
+
+        for i in (1, 2, 3):
+            d = self.desired[:, i] - n[:, i]
+            move = ((d >= 1) & (n[:, i + 1] - n[:, i] > 1)) | ((d <= -1) & (n[:, i - 1] - n[:, i] < -1))
+            if not move.any():
+                continue
+            s = np.sign(d)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                parabolic = q[:, i] + s / (n[:, i + 1] - n[:, i - 1]) * (
+                    (n[:, i] - n[:, i - 1] + s) * (q[:, i + 1] - q[:, i]) / (n[:, i + 1] - n[:, i]) +
+                    (n[:, i + 1] - n[:, i] - s) * (q[:, i] - q[:, i - 1]) / (n[:, i] - n[:, i - 1]))
+                j = i + s.astype(int)
+                rows = np.arange(len(x))
+                linear = q[:, i] + s * (q[rows, j] - q[:, i]) / (n[rows, j] - n[:, i])
+            ok = (q[:, i - 1] < parabolic) & (parabolic < q[:, i + 1])
+            q[:, i] = np.where(move, np.where(ok, parabolic, linear), q[:, i])
+            n[:, i] += np.where(move, s, 0)
+
+    def value(self):
+        if self.count == 0:
+            return np.full(self._first.shape[1], np.nan)
+        if self.count < 5:
+            return np.quantile(self._first[:self.count], self.p, axis=0)
+        return self.q[:, 2].copy()
+
+class SeriesAggregator:
+    """Cross-run statistics of one scheduler's logged series, per time bin.
+
+    Runs are folded in one at a time with add(series), so memory stays at
+    O(bins) however many runs are aggregated.
+    """
+
+    def __init__(self, quantiles=(0.05, 0.5, 0.95)):
+        self.quantiles = quantiles
+        self.time_steps = None
+        self.runs = 0
+
+    def add(self, series):
+        if self.time_steps is None:
+            self.time_steps = np.asarray(series['time_steps']).copy()
+            size = len(self.time_steps)
+            self.stats = {name: RunningStats(size) for name in SERIES_NAMES}
+            self.sketches = {name: [P2Quantile(p, size) for p in self.quantiles] for name in SERIES_NAMES}
+        elif not np.array_equal(series['time_steps'], self.time_steps):
+            raise ValueError("All runs must be logged on the same time steps.")
+
+        self.runs += 1
+        for name in SERIES_NAMES:
+            self.stats[name].add(series[name])
+            for sketch in self.sketches[name]:
+                sketch.add(series[name])
+
+    def mean_series(self):
+        means = {name: self.stats[name].mean for name in SERIES_NAMES}
+        means['time_steps'] = self.time_steps
+        return means
+
+    def rows(self):
+        """Long-format records: one per (series, time step)."""
+        for name in SERIES_NAMES:
+            stats = self.stats[name]
+            quantiles = [sketch.value() for sketch in self.sketches[name]]
+            std = stats.std
+            for b, t in enumerate(self.time_steps):
+                row = {'series': name, 'time': int(t), 'runs': self.runs,
+                       'mean': stats.mean[b], 'std': std[b], 'min': stats.min[b], 'max': stats.max[b]}
+                for p, values in zip(self.quantiles, quantiles):
+                    row[f'q{round(p * 100):02d}'] = values[b]
+                yield row
+
 class Metrics:
     def __init__(self, num_cores, simulation_duration):
         self.num_cores = num_cores
         self.simulation_duration = simulation_duration
         self.total_busy_time = 0
         self.thermal_hotspot_counts = 0
-        self.threat_isolation_times = []
-        
-        self.time_steps = []
-        self.avg_temp_history = []
-        self.cpu_util_history = []
-        self.active_threats_history = []
+        self.isolation_times = RunningStats()
+        # Core-milliseconds of charged scheduling decisions; None when decisions are free.
+        self.scheduling_overhead = None
+
+        # One slot per logged tick (0, INTERVAL, 2*INTERVAL, ...).
+        num_logs = -(-simulation_duration // METRICS_LOG_INTERVAL)
+        self.time_steps = np.zeros(num_logs, dtype=np.int64)
+        self.avg_temp_history = np.zeros(num_logs)
+        self.cpu_util_history = np.zeros(num_logs)
+        self.active_threats_history = np.zeros(num_logs, dtype=np.int64)
+        self.num_logged = 0
         self.last_log_time = -1
         self.interval_busy_time = 0
 
+    def extend(self, simulation_duration):
+        """Grows the log buffers for a run continued up to `simulation_duration` ticks."""
+        num_logs = -(-simulation_duration // METRICS_LOG_INTERVAL)
+        extra = num_logs - len(self.time_steps)
+        if extra > 0:
+            self.time_steps = np.concatenate((self.time_steps, np.zeros(extra, dtype=np.int64)))
+            self.avg_temp_history = np.concatenate((self.avg_temp_history, np.zeros(extra)))
+            self.cpu_util_history = np.concatenate((self.cpu_util_history, np.zeros(extra)))
+            self.active_threats_history = np.concatenate((self.active_threats_history,
+                                                          np.zeros(extra, dtype=np.int64)))
+        self.simulation_duration = simulation_duration
+
     def update(self, cores, task_queue, current_time):
-        busy_cores_in_step = 0
-        for core in cores:
-            if not core.is_idle():
-                busy_cores_in_step += 1
-                if core.temperature > THERMAL_HOTSPOT_THRESHOLD:
-                    self.thermal_hotspot_counts += 1
+        busy = cores.busy
+        busy_cores_in_step = int(np.count_nonzero(busy))
+        self.thermal_hotspot_counts += int(np.count_nonzero(busy & (cores.temperature > THERMAL_HOTSPOT_THRESHOLD)))
 
         self.total_busy_time += busy_cores_in_step
         self.interval_busy_time += busy_cores_in_step
-        
-        self.time_steps.append(current_time)
-        avg_temp = np.mean([core.temperature for core in cores])
-        self.avg_temp_history.append(avg_temp)
-        
-        current_util = (self.interval_busy_time / (self.num_cores * METRICS_LOG_INTERVAL)) * 100
-        self.cpu_util_history.append(current_util)
+
+        i = self.num_logged
+        self.time_steps[i] = current_time
+        self.avg_temp_history[i] = cores.temperature.mean()
+        self.cpu_util_history[i] = (self.interval_busy_time / (self.num_cores * METRICS_LOG_INTERVAL)) * 100
         self.interval_busy_time = 0
-        
-        active_threats = sum(1 for core in cores if not core.is_idle() and core.current_task.is_malicious) + \
-                         sum(1 for task in task_queue if task.is_malicious)
-        self.active_threats_history.append(active_threats)
-    
+        self.active_threats_history[i] = int(np.count_nonzero(cores.task_attribute('is_malicious', bool))) + \
+                                         int(np.count_nonzero(task_queue.table.is_malicious[task_queue.slots()]))
+        self.num_logged += 1
+
     def record_isolation(self, task, current_time):
         if task.detection_time > 0:
-            isolation_time = current_time - task.detection_time
-            self.threat_isolation_times.append(isolation_time)
+            self.isolation_times.add(current_time - task.detection_time)
+
+    def series(self):
+        logged = self.num_logged
+        return {
+            'time_steps': self.time_steps[:logged],
+            'avg_temp': self.avg_temp_history[:logged],
+            'cpu_util': self.cpu_util_history[:logged],
+            'active_threats': self.active_threats_history[:logged],
+        }
 
     def calculate_results(self):
         cpu_utilization = (self.total_busy_time / (self.num_cores * self.simulation_duration)) * 100
-        avg_isolation_time = np.mean(self.threat_isolation_times) if self.threat_isolation_times else float('inf')
-        
-        return {
+        avg_isolation_time = float(self.isolation_times.mean) if self.isolation_times.count else float('inf')
+
+        results = {
             "CPU Utilization (%)": cpu_utilization,
             "Thermal Hotspots": self.thermal_hotspot_counts,
             "Avg Isolation Time (ms)": avg_isolation_time,
-        }
\ No newline at end of file
+        }
+        if self.scheduling_overhead is not None:
+            results["Scheduling Overhead (%)"] = self.scheduling_overhead / (self.num_cores * self.simulation_duration) * 100
+        return results
\ No newline at end of file
@@ -1,88 +1,150 @@
 # utils/plotter.py
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import numpy as np
+import argparse
+import glob
 import os
+import sys
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+_figures = {}
+_MARGINS = ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+
+def _figure(figsize):
+    """One reusable figure per size, cleared for every plot."""
+    fig = _figures.get(figsize)
+    if fig is None:
+        fig = _figures[figsize] = plt.figure(figsize=figsize)
+    fig.clf()
+    # tight_layout() moves the subplot margins; start every plot from the defaults.
+    fig.subplots_adjust(**{side: matplotlib.rcParams[f'figure.subplot.{side}'] for side in _MARGINS})
+    return fig
 
 def plot_summary_boxplots(all_runs_summary, output_dir):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-        
+
     scheduler_names = list(all_runs_summary.keys())
     metric_keys = all_runs_summary[scheduler_names[0]][0].keys()
-    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
 
     for metric in metric_keys:
         data_to_plot = [[run[metric] for run in all_runs_summary[name]] for name in scheduler_names]
-        
-        fig, ax = plt.subplots(figsize=(10, 7))
+
+        fig = _figure((10, 7))
+        ax = fig.add_subplot()
         bp = ax.boxplot(data_to_plot, patch_artist=True, labels=scheduler_names)
-        
+
         for patch, color in zip(bp['boxes'], colors):
             patch.set_facecolor(color)
-            
+
         ax.set_ylabel(metric)
         ax.set_title(f"Performance Distribution: {metric} (over {len(data_to_plot[0])} runs)")
         ax.tick_params(axis='x', rotation=15)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.tight_layout()
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+        fig.tight_layout()
         filename = os.path.join(output_dir, f"boxplot_{metric.replace(' ', '_').replace('%', 'perc').replace('/', 'per')}.png")
-        plt.savefig(filename)
-    plt.close('all')
-
-def get_averaged_series(metrics_list, series_name):
-    all_series = []
-    for metrics in metrics_list:
-        df = pd.DataFrame({
-            'time': metrics.time_steps,
-            series_name: getattr(metrics, f"{series_name}_history")
-        }).set_index('time')
-        all_series.append(df)
-    
-    combined_df = pd.concat(all_series, axis=1).interpolate(method='linear', limit_direction='both')
-    mean_series = combined_df.mean(axis=1)
-    return mean_series
-
-def plot_time_series_results(all_runs_metrics, window_size, output_dir):
+        fig.savefig(filename)
+
+def _plot_series(mean_series, series_name, window_size, title, ylabel, path):
+    fig = _figure((12, 7))
+    ax = fig.add_subplot()
+    for name, series in mean_series.items():
+        values = series[series_name]
+        if window_size:
+            values = pd.Series(values).rolling(window=window_size, min_periods=1).mean().to_numpy()
+        ax.plot(series['time_steps'], values, label=name)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel("Simulation Time (ms)")
+    ax.legend()
+    ax.grid(True, linestyle='--', alpha=0.6)
+    fig.savefig(path)
+
+def plot_time_series_results(mean_series, window_size, output_dir):
+    """`mean_series` maps each scheduler to its cross-run mean series, e.g.
+    from SeriesAggregator.mean_series()."""
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-        
-    scheduler_names = list(all_runs_metrics.keys())
-    
-    plt.figure(figsize=(12, 7))
-    for name in scheduler_names:
-        mean_s = get_averaged_series(all_runs_metrics[name], 'avg_temp')
-        mean_s_smooth = mean_s.rolling(window=window_size, min_periods=1).mean()
-        plt.plot(mean_s_smooth.index, mean_s_smooth, label=name)
-    plt.title("Average Temperature Dynamics Over Time")
-    plt.ylabel("Average Core Temperature (°C)")
-    plt.xlabel("Simulation Time (ms)")
-    plt.legend()
-    plt.grid(True, linestyle='--', alpha=0.6)
-    plt.savefig(os.path.join(output_dir, "avg_timeseries_temperature.png"))
-    plt.close()
-
-    plt.figure(figsize=(12, 7))
-    for name in scheduler_names:
-        mean_s = get_averaged_series(all_runs_metrics[name], 'cpu_util')
-        mean_s_smooth = mean_s.rolling(window=window_size, min_periods=1).mean()
-        plt.plot(mean_s_smooth.index, mean_s_smooth, label=name)
-    plt.title("Average CPU Utilization Dynamics Over Time")
-    plt.ylabel("Average Interval CPU Utilization (%)")
-    plt.xlabel("Simulation Time (ms)")
-    plt.legend()
-    plt.grid(True, linestyle='--', alpha=0.6)
-    plt.savefig(os.path.join(output_dir, "avg_timeseries_cpu_utilization.png"))
-    plt.close()
-    
-    plt.figure(figsize=(12, 7))
-    for name in scheduler_names:
-        mean_s = get_averaged_series(all_runs_metrics[name], 'active_threats')
-        plt.plot(mean_s.index, mean_s, label=name)
-    plt.title("Average Active Threats Over Time")
-    plt.ylabel("Average Number of Active Malicious Tasks")
-    plt.xlabel("Simulation Time (ms)")
-    plt.legend()
-    plt.grid(True, linestyle='--', alpha=0.6)
-    plt.savefig(os.path.join(output_dir, "avg_timeseries_active_threats.png"))
-    plt.close()
\ No newline at end of file
+
+    _plot_series(mean_series, 'avg_temp', window_size, "Average Temperature Dynamics Over Time",
+                 "Average Core Temperature (°C)", os.path.join(output_dir, "avg_timeseries_temperature.png"))
+    _plot_series(mean_series, 'cpu_util', window_size, "Average CPU Utilization Dynamics Over Time",
+                 "Average Interval CPU Utilization (%)", os.path.join(output_dir, "avg_timeseries_cpu_utilization.png"))
+    _plot_series(mean_series, 'active_threats', None, "Average Active Threats Over Time",
+                 "Average Number of Active Malicious Tasks", os.path.join(output_dir, "avg_timeseries_active_threats.png"))
+
+def render_experiment_plots(all_runs_summary, mean_series, window_size, output_dir):
+    plot_summary_boxplots(all_runs_summary, output_dir)
+    plot_time_series_results(mean_series, window_size, output_dir)
+    return output_dir
+
+class PlotPool:
+    """Renders experiments' plots on `workers` background processes, so plotting
+    overlaps the simulations instead of stalling them; 0 renders in-process."""
+
+    def __init__(self, workers=1):
+        self.executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        self.futures = []
+
+    def submit(self, all_runs_summary, mean_series, window_size, output_dir):
+        if self.executor is None:
+            render_experiment_plots(all_runs_summary, mean_series, window_size, output_dir)
+        else:
+            self.futures.append(self.executor.submit(render_experiment_plots, all_runs_summary,
+                                                     mean_series, window_size, output_dir))
+
+    def close(self):
+        if self.executor is not None:
+            for future in self.futures:
+                future.result()
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def load_experiment_results(experiment_dir):
+    """(all_runs_summary, mean_series) of an experiment from the CSVs main.py saved in `experiment_dir`."""
+    summary = pd.read_csv(os.path.join(experiment_dir, 'summary_results.csv'))
+    # The metrics sit between the scheduler/run columns and the precision columns.
+    end = list(summary.columns).index('runs') if 'runs' in summary.columns else len(summary.columns)
+    metrics = list(summary.columns[2:end])
+    all_runs_summary = {name: rows[metrics].to_dict('records')
+                        for name, rows in summary.sort_values('run', kind='stable').groupby('scheduler', sort=False)}
+
+    series = pd.read_csv(os.path.join(experiment_dir, 'timeseries_summary.csv'))
+    mean_series = {}
+    for name, rows in series.groupby('scheduler', sort=False):
+        means = rows.pivot(index='time', columns='series', values='mean')
+        mean_series[name] = {column: means[column].to_numpy() for column in means.columns}
+        mean_series[name]['time_steps'] = means.index.to_numpy()
+    return all_runs_summary, mean_series
+
+def main(argv=None):
+    from config import MOVING_AVERAGE_WINDOW
+
+    parser = argparse.ArgumentParser(description="Render the plots of saved experiment results.")
+    parser.add_argument('results_dir', nargs='?', default='plots',
+                        help="An experiment directory, or a directory of them (as main.py's --output-dir).")
+    parser.add_argument('--window', type=int, default=MOVING_AVERAGE_WINDOW, help="Moving-average window.")
+    parser.add_argument('--workers', type=int, default=1, help="Plotting processes (0 renders in-process).")
+    args = parser.parse_args(argv)
+
+    summaries = sorted(glob.glob(os.path.join(args.results_dir, '**', 'summary_results.csv'), recursive=True))
+    if not summaries:
+        print(f"No summary_results.csv under {args.results_dir}.")
+        return 1
+    with PlotPool(args.workers) as plots:
+        for path in summaries:
+            experiment_dir = os.path.dirname(path)
+            plots.submit(*load_experiment_results(experiment_dir), args.window, experiment_dir)
+            print(f"--- Plots for '{experiment_dir}' queued ---")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
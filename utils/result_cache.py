@@ -0,0 +1,87 @@
+# utils/result_cache.py
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import config as default_config
+
+# Inputs that cannot change a run's result.
+_IGNORED_KEYS = {'NUM_RUNS', 'PROGRESS_BAR', 'MOVING_AVERAGE_WINDOW', 'ADAPTIVE_MIN_RUNS', 'ADAPTIVE_BATCH_RUNS',
+                 'ADAPTIVE_PRECISION', 'CONFIDENCE_LEVEL', 'CHECKPOINT_INTERVAL', 'CHECKPOINT_DIR', 'WARMUP_DIR'}
+_SOURCE_PATTERNS = ('simulation/*.py', 'schedulers/*.py', 'utils/runner.py', 'utils/metrics.py')
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def code_version():
+    """Hash of the source files a run's result depends on."""
+    digest = hashlib.sha256()
+    for pattern in _SOURCE_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(_ROOT, pattern))):
+            digest.update(os.path.relpath(path, _ROOT).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def _defaults():
+    return {name: getattr(default_config, name) for name in dir(default_config)
+            if name.isupper() and name not in _IGNORED_KEYS}
+
+class ResultCache:
+    """Content-addressed store of per-run results, one .npz file per run.
+
+    The key covers the unit's effective configuration (experiment parameters
+    over the config.py defaults), scheduler, seeds and the simulator's source,
+    so any change to one of them misses the cache and reruns only the units it
+    affects. Files are written atomically, so an interrupted sweep leaves every
+    finished run reusable.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.version = code_version()
+        self.defaults = _defaults()
+
+    def unit_key(self, unit):
+        unit_config = dict(self.defaults)
+        unit_config.update((k, v) for k, v in unit['config'].items() if k not in _IGNORED_KEYS)
+        fields = {k: v for k, v in unit.items() if k not in ('config', 'experiment')}
+        trace = unit_config.get('WORKLOAD_TRACE')
+        if trace:
+            # A replayed trace is identified by its size and modification time, not re-hashed per unit.
+            stat = os.stat(trace)
+            fields['trace_file'] = [os.path.abspath(trace), stat.st_size, stat.st_mtime_ns]
+        payload = json.dumps({'config': unit_config, 'unit': fields, 'code': self.version},
+                             sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key, run):
+        return os.path.join(self.directory, key[:2], f"{key}_{run}.npz")
+
+    def load(self, unit):
+        """The unit's per-run results, or None unless every run is cached."""
+        key = self.unit_key(unit)
+        results = []
+        for run in unit['runs'] if 'runs' in unit else [unit['run']]:
+            path = self._path(key, run)
+            if not os.path.exists(path):
+                return None
+            with np.load(path) as data:
+                results.append({
+                    'experiment': unit['experiment'],
+                    'run': run,
+                    'scheduler': unit['scheduler'],
+                    'summary': json.loads(str(data['summary'])),
+                    'series': {name: data[name] for name in data.files if name != 'summary'},
+                })
+        return results
+
+    def store(self, unit, results):
+        key = self.unit_key(unit)
+        for result in results:
+            path = self._path(key, result['run'])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = path[:-len('.npz')] + '.partial.npz'
+            np.savez_compressed(partial, summary=np.array(json.dumps(result['summary'])), **result['series'])
+            os.replace(partial, path)
\ No newline at end of file
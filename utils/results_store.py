@@ -0,0 +1,233 @@
+# utils/results_store.py
+import csv
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Typed parameter columns every scenario carries; missing ones read as '' or NaN.
+PARAMETER_TYPES = {
+    'cores': int,
+    'load': str,
+    'threat': str,
+    'arrival_rate': float,
+    'threat_probability': float,
+    'duration': int,
+    'engine': str,
+    'trace': str,
+}
+_INDEX = '_index.json'
+_CACHE = '_cache'
+
+def scenario_parameters(config, load='', threat=''):
+    """The typed parameters of a run configuration, e.g. main.py's experiment config."""
+    trace = config.get('WORKLOAD_TRACE')
+    return {
+        'cores': config['NUM_CORES'],
+        'load': load,
+        'threat': threat,
+        'arrival_rate': float('nan') if trace else config.get('TASK_ARRIVAL_RATE', float('nan')),
+        'threat_probability': float('nan') if trace else config.get('THREAT_PROBABILITY', float('nan')),
+        'duration': config.get('SIMULATION_DURATION', 0),
+        'engine': config.get('ENGINE', 'tick'),
+        'trace': os.path.splitext(os.path.basename(trace))[0] if trace else '',
+    }
+
+def _missing(kind):
+    return '' if kind is str else (np.nan if kind is float else 0)
+
+def _matches(params, where):
+    for name, wanted in (where or {}).items():
+        values = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+        if params.get(name) not in values:
+            return False
+    return True
+
+class ResultsStore:
+    """All experiments' per-run summaries as one columnar dataset, partitioned by scenario.
+
+    Each scenario is a directory of immutable .npz parts, one array per
+    column (scheduler, run, one per metric). Its typed parameters live once
+    in the index rather than in every row. Queries select partitions from
+    the index and load only the columns they need. Aggregates are cached in
+    memory and on disk, keyed by the parts they read, so they stay valid
+    until one of those partitions is rewritten.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._memo = {}
+
+    def _index(self):
+        path = os.path.join(self.directory, _INDEX)
+        if not os.path.exists(path):
+            return {'next_part': 0, 'scenarios': {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_index(self, index):
+        path = os.path.join(self.directory, _INDEX)
+        with open(path + '.partial', 'w') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(path + '.partial', path)
+
+    def scenarios(self, where=None):
+        """Scenario name -> parameters of the partitions matching `where`
+        ({parameter: value or list of values})."""
+        return {name: entry['params'] for name, entry in self._index()['scenarios'].items()
+                if _matches(entry['params'], where)}
+
+    def columns(self, where=None):
+        """The stored (non-parameter) columns of the matching partitions, in first-seen order."""
+        names = []
+        for entry in self._index()['scenarios'].values():
+            if _matches(entry['params'], where):
+                names.extend(entry['columns'])
+        return list(dict.fromkeys(names))
+
+    def write(self, scenario, params, rows, replace=True):
+        """Adds the dict `rows` (scheduler, run and metric values) to the scenario's partition.
+
+        With `replace` (an experiment rerun) the partition's earlier parts are dropped.
+        """
+        index = self._index()
+        part = f"part-{index['next_part']:06d}.npz"
+        directory = os.path.join(self.directory, scenario)
+        os.makedirs(directory, exist_ok=True)
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        arrays = {}
+        for column in columns:
+            values = [row.get(column) for row in rows]
+            if all(isinstance(value, str) for value in values):
+                arrays[column] = np.array(values, dtype=str)
+            else:
+                arrays[column] = np.array([np.nan if value is None else value for value in values], dtype=float)
+                if column == 'run':
+                    arrays[column] = arrays[column].astype(np.int64)
+        partial = os.path.join(directory, part[:-len('.npz')] + '.partial.npz')
+        np.savez(partial, **arrays)
+        os.replace(partial, os.path.join(directory, part))
+
+        entry = index['scenarios'].get(scenario, {'parts': [], 'columns': []})
+        obsolete = entry['parts'] if replace else []
+        kept = [] if replace else entry['parts']
+        known = [] if replace else entry['columns']
+        index['scenarios'][scenario] = {
+            'params': {name: kind(params[name]) if name in params else _missing(kind)
+                       for name, kind in PARAMETER_TYPES.items()},
+            'parts': kept + [part],
+            'columns': list(dict.fromkeys(known + columns)),
+        }
+        index['next_part'] += 1
+        self._save_index(index)
+        # Readers only follow the index, so old parts are removed once it no longer lists them.
+        for old in obsolete:
+            os.remove(os.path.join(directory, old))
+        # Cached aggregates are keyed by their parts; drop those this write made stale.
+        shutil.rmtree(os.path.join(self.directory, _CACHE), ignore_errors=True)
+
+    def read(self, columns, where=None):
+        """Column name -> array over the matching partitions' rows.
+
+        Parameter columns are broadcast from the index; a metric column a
+        partition lacks reads as NaN.
+        """
+        chunks = {column: [] for column in columns}
+        for scenario, entry in sorted(self._index()['scenarios'].items()):
+            if not _matches(entry['params'], where):
+                continue
+            for part in entry['parts']:
+                with np.load(os.path.join(self.directory, scenario, part)) as data:
+                    size = len(data[data.files[0]])
+                    for column in columns:
+                        if column == 'scenario':
+                            chunks[column].append(np.full(size, scenario))
+                        elif column in PARAMETER_TYPES:
+                            kind = PARAMETER_TYPES[column]
+                            chunks[column].append(np.full(size, entry['params'][column],
+                                                          dtype=None if kind is str else kind))
+                        elif column in data.files:
+                            chunks[column].append(data[column])
+                        else:
+                            chunks[column].append(np.full(size, np.nan))
+        return {column: np.concatenate(parts) if parts else np.array([]) for column, parts in chunks.items()}
+
+    def aggregate(self, metric, by=('scenario', 'scheduler'), where=None):
+        """Mean, sample std and count of `metric` per group of the `by` columns,
+        as a column name -> array dict; e.g. a scalability curve is
+        aggregate(metric, ('scheduler', 'cores'), {'load': 'heavy', 'threat': 'high'})."""
+        by = tuple(by)
+        index = self._index()
+        parts = sorted(f"{scenario}/{part}" for scenario, entry in index['scenarios'].items()
+                       if _matches(entry['params'], where) for part in entry['parts'])
+        key = hashlib.sha256(json.dumps([metric, by, where, parts], sort_keys=True, default=repr)
+                             .encode('utf-8')).hexdigest()[:32]
+        if key in self._memo:
+            return self._memo[key]
+        cache_path = os.path.join(self.directory, _CACHE, f"{key}.npz")
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as data:
+                result = {name: data[name] for name in data.files}
+        else:
+            result = self._aggregate(self.read(list(by) + [metric], where), metric, by)
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            partial = cache_path[:-len('.npz')] + '.partial.npz'
+            np.savez(partial, **result)
+            os.replace(partial, cache_path)
+        self._memo[key] = result
+        return result
+
+    @staticmethod
+    def _aggregate(columns, metric, by):
+        """Groups with NaN values skipped, as pandas does; inf values make the mean inf."""
+        values = columns[metric].astype(float)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return {**{name: np.array([]) for name in by}, 'mean': np.array([]), 'std': np.array([]),
+                    'count': np.array([], dtype=np.int64)}
+        keys = np.rec.fromarrays([columns[name][valid] for name in by], names=list(by))
+        values = values[valid]
+        groups, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.ravel()
+        count = np.bincount(inverse, minlength=len(groups))
+        mean = np.bincount(inverse, weights=values, minlength=len(groups)) / count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            squares = np.bincount(inverse, weights=(values - mean[inverse]) ** 2, minlength=len(groups))
+            std = np.sqrt(squares / (count - 1))
+        result = {name: groups[name] for name in by}
+        result.update({'mean': mean, 'std': std, 'count': count})
+        return result
+
+def import_summary_csvs(store, base_dir, load_levels=None, threat_levels=None):
+    """Adds every experiment directory's summary_results.csv under `base_dir` to
+    `store`, for results saved before the store existed. Parameters come from
+    the directory names (cores_8_load_heavy_threat_high, cores_8_trace_NAME);
+    `load_levels`/`threat_levels` map their level names to rates."""
+    imported = 0
+    for path in sorted(glob.glob(os.path.join(base_dir, '**', 'summary_results.csv'), recursive=True)):
+        scenario = os.path.basename(os.path.dirname(path))
+        parts = scenario.split('_')
+        fields = dict(zip(parts[0::2], parts[1::2]))
+        if 'cores' not in fields:
+            continue
+        params = {'cores': int(fields['cores']), 'load': fields.get('load', ''), 'threat': fields.get('threat', ''),
+                  'trace': scenario.partition('_trace_')[2]}
+        if params['load'] in (load_levels or {}):
+            params['arrival_rate'] = load_levels[params['load']]
+        if params['threat'] in (threat_levels or {}):
+            params['threat_probability'] = threat_levels[params['threat']]
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            # The metrics sit between the scheduler/run columns and the precision columns.
+            header = reader.fieldnames
+            metrics = header[2:header.index('runs')] if 'runs' in header else header[2:]
+            rows = [{'scheduler': row['scheduler'], 'run': int(row['run']),
+                     **{metric: float(row[metric]) if row[metric] else None for metric in metrics}}
+                    for row in reader]
+        if rows:
+            store.write(scenario, params, rows)
+            imported += 1
+    return imported
\ No newline at end of file
@@ -0,0 +1,230 @@
+# utils/runner.py
+import hashlib
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from simulation.environment import Environment
+from simulation.event_environment import EventEnvironment
+from simulation.ensemble import EnsembleEnvironment
+from simulation.workload import Workload
+from simulation.trace import open_trace
+from simulation.snapshot import Snapshot, load_snapshot
+from utils.result_cache import code_version
+from schedulers.priority_scheduler import PriorityScheduler
+from schedulers.cfs_scheduler import CFSScheduler
+from schedulers.single_aco_scheduler import SingleACOScheduler
+from schedulers.stigmergic_sentinel import StigmergicSentinelsScheduler
+from schedulers.hierarchical_sentinel import HierarchicalSentinelsScheduler
+import config as default_config
+
+SCHEDULER_CLASSES = {
+    "CFSScheduler": CFSScheduler,
+    "PriorityScheduler": PriorityScheduler,
+    "SingleACOScheduler": SingleACOScheduler,
+    "StigmergicSentinelsScheduler": StigmergicSentinelsScheduler,
+    "HierarchicalSentinelsScheduler": HierarchicalSentinelsScheduler,
+}
+
+# Where warm-up snapshots are shared between the schedulers of a run.
+DEFAULT_WARMUP_DIR = os.path.join('.cache', 'warmup')
+
+# The schedulers compared by a default sweep.
+DEFAULT_SCHEDULERS = ["CFSScheduler", "PriorityScheduler", "SingleACOScheduler", "StigmergicSentinelsScheduler"]
+
+ENGINES = {
+    "tick": Environment,
+    "event": EventEnvironment,
+    "ensemble": EnsembleEnvironment,
+}
+
+def make_scheduler(name, unit_config, replicas=None):
+    """Scheduler `name` with the parameters `unit_config` overrides (e.g. RHO_T)."""
+    return SCHEDULER_CLASSES[name].from_config(unit_config['NUM_CORES'], unit_config, replicas)
+
+def _stable_key(name):
+    return zlib.crc32(name.encode('utf-8'))
+
+def unit_seed(exp_name, run, scheduler_name, base_seed=default_config.RANDOM_SEED):
+    """Deterministic seed for one (experiment, run, scheduler) unit.
+
+    Derived from names rather than positions, so a unit keeps its seed no matter
+    how the matrix is ordered or how many workers share it.
+    """
+    spawn_key = (_stable_key(exp_name), run, _stable_key(scheduler_name))
+    return int(np.random.SeedSequence(base_seed, spawn_key=spawn_key).generate_state(1)[0])
+
+def workload_seed(exp_name, run, base_seed=default_config.RANDOM_SEED):
+    """Seed of a run's task stream, shared by every scheduler in that run."""
+    return unit_seed(exp_name, run, 'workload', base_seed)
+
+def unit_workload(unit_config, seed):
+    """The run's task stream: the replayed WORKLOAD_TRACE if set, otherwise generated from `seed`."""
+    trace = unit_config.get('WORKLOAD_TRACE')
+    if trace:
+        return open_trace(trace)
+    return Workload.for_config(unit_config, seed)
+
+def make_units(experiment_config, scheduler_names, num_runs, first_run=0):
+    """Units for runs first_run..num_runs-1 of an experiment; a run's units are
+    the same however the runs are split into calls."""
+    if experiment_config.get('ENGINE') == 'ensemble':
+        # One unit per scheduler simulates all runs of the experiment at once.
+        return [{
+            'experiment': experiment_config['name'],
+            'config': experiment_config,
+            'runs': list(range(first_run, num_runs)),
+            'scheduler': name,
+            'seed': unit_seed(experiment_config['name'], first_run, name),
+            'workload_seeds': [workload_seed(experiment_config['name'], run) for run in range(first_run, num_runs)],
+        } for name in scheduler_names]
+
+    units = []
+    for run in range(first_run, num_runs):
+        for name in scheduler_names:
+            units.append({
+                'experiment': experiment_config['name'],
+                'config': experiment_config,
+                'run': run,
+                'scheduler': name,
+                'seed': unit_seed(experiment_config['name'], run, name),
+                'workload_seed': workload_seed(experiment_config['name'], run),
+            })
+    return units
+
+def unit_runs(unit):
+    return unit['runs'] if 'runs' in unit else [unit['run']]
+
+def _unit_result(unit, run, metrics_obj, env=None):
+    result = {
+        'experiment': unit['experiment'],
+        'run': run,
+        'scheduler': unit['scheduler'],
+        'summary': metrics_obj.calculate_results(),
+        'series': metrics_obj.series(),
+    }
+    profiler = getattr(env, 'profiler', None)
+    if profiler is not None:
+        result['profile'] = profiler.to_dict()
+        trace_dir = unit['config'].get('PROFILE_TRACE_DIR')
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+            profiler.write_chrome_trace(os.path.join(trace_dir, f"trace_{unit['scheduler']}_run{run + 1}.json"))
+    decision_latency = getattr(env, 'decision_latency', None)
+    if decision_latency is not None:
+        result['decision_latency'] = decision_latency.to_dict()
+    return result
+
+def _digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=repr).encode('utf-8')).hexdigest()[:24]
+
+def warm_snapshot(unit):
+    """State after the run's WARMUP_TICKS, simulated once per (experiment, run).
+
+    The warm-up uses WARMUP_SCHEDULER (CFS by default) on the run's workload
+    and its own seed, so every scheduler of the run forks from the same state.
+    The snapshot is kept in WARMUP_DIR for the other schedulers' units.
+    """
+    unit_config = unit['config']
+    fields = {k: v for k, v in unit.items() if k not in ('config', 'scheduler', 'seed')}
+    config_fields = {k: v for k, v in unit_config.items()
+                     if k not in ('PROGRESS_BAR', 'PROFILE', 'PROFILE_TRACE', 'DECISION_LATENCY',
+                                  'CHECKPOINT_INTERVAL', 'CHECKPOINT_DIR')}
+    path = os.path.join(unit_config.get('WARMUP_DIR', DEFAULT_WARMUP_DIR),
+                        f"{_digest({'config': config_fields, 'unit': fields, 'code': code_version()})}.snapshot")
+    if os.path.exists(path):
+        return Snapshot.load(path)
+
+    warmup = unit_config['WARMUP_TICKS']
+    # The workload covers the warm-up and the measured ticks after it.
+    # Not checkpointed: the finished warm-up is saved instead.
+    warm_config = {**unit_config, 'SIMULATION_DURATION': warmup + unit_config['SIMULATION_DURATION'],
+                   'PROFILE': False, 'DECISION_LATENCY': False, 'CHECKPOINT_INTERVAL': None}
+    np.random.seed(unit_seed(unit['experiment'], unit['run'], 'warmup'))
+    scheduler = make_scheduler(unit_config.get('WARMUP_SCHEDULER', 'CFSScheduler'), unit_config)
+    env = ENGINES[unit_config.get('ENGINE', 'tick')](scheduler, warm_config,
+                                                     unit_workload(warm_config, unit['workload_seed']))
+    env.run(until=warmup)
+    snapshot = env.snapshot()
+    snapshot.save(path)
+    return snapshot
+
+def _single_run_environment(unit):
+    unit_config = unit['config']
+    # Instrumented runs are not checkpointed: their timers wrap live methods.
+    instrumented = unit_config.get('PROFILE') or unit_config.get('DECISION_LATENCY')
+    checkpoint = None
+    if unit_config.get('CHECKPOINT_INTERVAL') and not instrumented:
+        # Keyed by the simulator source too: a snapshot only restores into the code that saved it.
+        checkpoint = os.path.join(unit_config['CHECKPOINT_DIR'],
+                                  f"{_digest({**unit, 'code': code_version()})}.snapshot")
+        if os.path.exists(checkpoint):
+            return load_snapshot(checkpoint)
+
+    scheduler = make_scheduler(unit['scheduler'], unit_config)
+    if unit_config.get('WARMUP_TICKS'):
+        env = warm_snapshot(unit).fork(scheduler, duration=unit_config['SIMULATION_DURATION'],
+                                       reset_metrics=True, seed=unit['seed'])
+    else:
+        np.random.seed(unit['seed'])
+        workload = unit_workload(unit_config, unit['workload_seed'])
+        env = ENGINES[unit_config.get('ENGINE', 'tick')](scheduler, unit_config, workload)
+    if checkpoint is not None:
+        env.config = {**env.config, 'CHECKPOINT_INTERVAL': unit_config['CHECKPOINT_INTERVAL'],
+                      'CHECKPOINT_PATH': checkpoint}
+    return env
+
+def run_unit(unit):
+    """Runs one unit and returns only the summaries and logged series of its runs."""
+    engine = unit['config'].get('ENGINE', 'tick')
+    if 'runs' in unit:
+        if unit['config'].get('WARMUP_TICKS'):
+            raise ValueError("The ensemble engine does not support warm-up snapshots")
+        np.random.seed(unit['seed'])
+        workloads = [unit_workload(unit['config'], seed) for seed in unit['workload_seeds']]
+        scheduler = make_scheduler(unit['scheduler'], unit['config'], replicas=len(unit['runs']))
+        all_metrics = ENGINES[engine](scheduler, unit['config'], workloads).run()
+        return [_unit_result(unit, run, m) for run, m in zip(unit['runs'], all_metrics)]
+
+    env = _single_run_environment(unit)
+    metrics_obj = env.run()
+    checkpoint = env.config.get('CHECKPOINT_PATH')
+    if checkpoint and os.path.exists(checkpoint):
+        # The finished run's result is kept by the caller (and the result cache).
+        os.remove(checkpoint)
+    return [_unit_result(unit, unit['run'], metrics_obj, env)]
+
+def run_units(units, workers=1, cache=None):
+    """Yields per-run results as units complete, in-process or on a process pool.
+
+    With a ResultCache, cached units are yielded first without running and
+    every newly finished unit is stored as soon as it completes.
+    """
+    if cache is not None:
+        missing = []
+        for unit in units:
+            cached = cache.load(unit)
+            if cached is None:
+                missing.append(unit)
+            else:
+                yield from cached
+        units = missing
+
+    if workers <= 1:
+        for unit in units:
+            results = run_unit(unit)
+            if cache is not None:
+                cache.store(unit, results)
+            yield from results
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_unit, unit): unit for unit in units}
+        for future in as_completed(futures):
+            results = future.result()
+            if cache is not None:
+                cache.store(futures[future], results)
+            yield from results
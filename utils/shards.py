@@ -0,0 +1,85 @@
+# utils/shards.py
+import glob
+import hashlib
+import json
+import os
+import pickle
+import zlib
+
+_FORMAT_VERSION = 1
+# Host-local settings that do not change a unit's results.
+_LOCAL_KEYS = {'PROGRESS_BAR', 'CHECKPOINT_INTERVAL', 'CHECKPOINT_DIR', 'WARMUP_DIR', 'PROFILE_TRACE_DIR'}
+
+def parse_shard(text):
+    """'i/N' -> (i, N), for argparse: shard i (1-based) of N."""
+    index, _, count = text.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"{text!r} is not of the form i/N")
+    if not 1 <= index <= count:
+        raise ValueError(f"shard {index} is not one of 1..{count}")
+    return index, count
+
+def unit_identity(unit):
+    """(experiment, first run, scheduler): the same for a unit however the matrix is built or split."""
+    run = unit['runs'][0] if 'runs' in unit else unit['run']
+    return unit['experiment'], run, unit['scheduler']
+
+def unit_shard(unit, count):
+    """The shard (1-based, of `count`) that owns `unit`, from a hash of its identity alone."""
+    return zlib.crc32('/'.join(map(str, unit_identity(unit))).encode('utf-8')) % count + 1
+
+def matrix_digest(experiments, scheduler_names, num_runs, code):
+    """Identifies a sweep: shards merge only with shards of the same matrix and simulator source."""
+    payload = {'experiments': [{k: v for k, v in config.items() if k not in _LOCAL_KEYS} for config in experiments],
+               'schedulers': list(scheduler_names), 'runs': num_runs, 'code': code}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=repr).encode('utf-8')).hexdigest()[:24]
+
+def shard_path(directory, index, count):
+    return os.path.join(directory, f"shard-{index:04d}-of-{count:04d}.pkl")
+
+def write_shard(path, meta, results):
+    """Writes one shard's results with the `meta` describing its sweep, atomically."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    partial = path + '.partial'
+    with open(partial, 'wb') as f:
+        pickle.dump({'version': _FORMAT_VERSION, 'meta': meta, 'results': results}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(partial, path)
+
+def read_shards(directory):
+    """(meta, results) of the complete set of shards in `directory`.
+
+    Raises ValueError unless the files are shards 1..N of one sweep, each
+    present once, and together hold every unit of it exactly once.
+    """
+    shards = []
+    for path in sorted(glob.glob(os.path.join(directory, 'shard-*-of-*.pkl'))):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != _FORMAT_VERSION:
+            raise ValueError(f"{path} is not a shard of format version {_FORMAT_VERSION}")
+        shards.append((path, data))
+    if not shards:
+        raise ValueError(f"No shards found in {directory}")
+
+    meta = shards[0][1]['meta']
+    found = {}
+    for path, data in shards:
+        other = data['meta']
+        if other['matrix'] != meta['matrix'] or other['shards'] != meta['shards']:
+            raise ValueError(f"{path} belongs to another sweep (different matrix, source or shard count)")
+        if other['shard'] in found:
+            raise ValueError(f"Shard {other['shard']} is in both {found[other['shard']]} and {path}")
+        found[other['shard']] = path
+    missing = sorted(set(range(1, meta['shards'] + 1)) - set(found))
+    if missing:
+        raise ValueError(f"Missing shard(s) {', '.join(map(str, missing))} of {meta['shards']} in {directory}")
+
+    units = [tuple(unit) for _, data in shards for unit in data['meta']['units']]
+    if len(units) != len(set(units)) or len(units) != meta['num_units']:
+        raise ValueError("The shards do not partition the sweep's units")
+    return meta, [result for _, data in shards for result in data['results']]
\ No newline at end of file
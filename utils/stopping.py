@@ -0,0 +1,105 @@
+# utils/stopping.py
+import math
+from itertools import combinations
+from statistics import NormalDist
+
+import numpy as np
+
+def t_quantile(p, df):
+    """`p` quantile of Student's t with `df` degrees of freedom.
+
+    Exact for df 1 and 2; above that the Cornish-Fisher expansion around the
+    normal quantile (Abramowitz & Stegun 26.7.5): from df 3 on, within 0.2%
+    for 95% intervals and 1% for 99%.
+    """
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+
+def confidence_interval(values, confidence):
+    """(mean, half-width) of the t confidence interval for the mean of `values`.
+
+    The half-width is NaN below two values or when any value is not finite
+    (an Avg Isolation Time of inf in a run without isolations).
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2 or not np.isfinite(values).all():
+        return float(values.mean()) if len(values) else math.nan, math.nan
+    sem = values.std(ddof=1) / math.sqrt(len(values))
+    return float(values.mean()), t_quantile((1 + confidence) / 2, len(values) - 1) * sem
+
+class StoppingRule:
+    """When an experiment has enough runs, from the per-run summaries so far.
+
+    A metric is settled once every scheduler's confidence interval is within
+    `precision` of its mean (relative half-width), or once every pair of
+    schedulers either differs significantly or is shown equivalent to within
+    `precision`. Runs share their workload across
+    schedulers, so pairs are compared on per-run differences, which cancels
+    the workload noise and separates schedulers in few runs. An experiment
+    stops when all metrics are settled, but never before `min_runs` nor after
+    `max_runs`; decisions are only taken every `batch` runs past `min_runs`,
+    so they do not depend on the order in which runs finish.
+    """
+
+    def __init__(self, min_runs, max_runs, batch=1, precision=0.05, confidence=0.95):
+        self.min_runs = max(min_runs, 2)
+        self.max_runs = max(max_runs, self.min_runs)
+        self.batch = max(batch, 1)
+        self.precision = precision
+        self.confidence = confidence
+
+    def interval(self, values):
+        """(mean, half-width, relative half-width) of `values`."""
+        mean, half_width = confidence_interval(values, self.confidence)
+        relative = half_width / abs(mean) if mean else (0.0 if half_width == 0 else math.inf)
+        return mean, half_width, relative
+
+    def _precise(self, columns):
+        return all(self.interval(values)[2] <= self.precision for values in columns.values())
+
+    def _separated(self, columns):
+        """Every pair of schedulers either differs significantly or is equivalent:
+        its difference's interval lies within `precision` of the pair's mean."""
+        if len(columns) < 2:
+            return False
+        for a, b in combinations(columns.values(), 2):
+            mean, half_width = confidence_interval(np.subtract(a, b), self.confidence)
+            scale = self.precision * abs(np.mean(np.add(a, b)) / 2)
+            if not (abs(mean) > half_width or abs(mean) + half_width <= scale):
+                return False
+        return True
+
+    def decide(self, summaries):
+        """'precision', 'significant' or 'max_runs' to stop, None to continue.
+
+        `summaries` maps each scheduler to {run: summary}, every scheduler
+        holding the same runs.
+        """
+        runs = sorted(next(iter(summaries.values())))
+        if len(runs) >= self.max_runs:
+            return 'max_runs'
+        if len(runs) < self.min_runs:
+            return None
+        metrics = next(iter(summaries.values()))[runs[0]].keys()
+        reasons = set()
+        for metric in metrics:
+            columns = {name: [per_run[run][metric] for run in runs] for name, per_run in summaries.items()}
+            if self._precise(columns):
+                reasons.add('precision')
+            elif self._separated(columns):
+                reasons.add('significant')
+            else:
+                return None
+        return 'significant' if 'significant' in reasons else 'precision'
+
+    def next_runs(self, runs):
+        """Run count to extend an undecided experiment of `runs` runs to."""
+        return min(runs + self.batch, self.max_runs)
\ No newline at end of file
@@ -0,0 +1,163 @@
+# utils/sweep.py
+import itertools
+import math
+
+import numpy as np
+
+from .runner import SCHEDULER_CLASSES, make_units, run_units
+from simulation.security_monitor import SecurityMonitor
+from simulation.thermal_model import ThermalModel
+import config as default_config
+
+# Scenario settings a run reads from its config; candidates override the scenario's value.
+SCENARIO_PARAMETERS = ('TASK_ARRIVAL_RATE', 'THREAT_PROBABILITY')
+
+def sweepable_parameters():
+    """config.py names a run actually takes from its config: the components'
+    config_parameters and the scenario rates. Other config.py settings are
+    module constants that a sweep cannot vary."""
+    components = [*SCHEDULER_CLASSES.values(), ThermalModel, SecurityMonitor]
+    names = {name for component in components for name in component.config_parameters.values()}
+    return sorted(names.union(SCENARIO_PARAMETERS))
+
+class Parameter:
+    """One swept config.py parameter: explicit `values`, or a range [low, high]
+    sampled uniformly (log-uniformly with `log`) or gridded in `points` steps."""
+
+    def __init__(self, name, values=None, low=None, high=None, log=False):
+        if name not in sweepable_parameters():
+            raise ValueError(f"{name!r} cannot be swept; choose from {', '.join(sweepable_parameters())}")
+        self.name = name
+        self.values = values
+        self.low, self.high, self.log = low, high, log
+
+    @classmethod
+    def parse(cls, spec):
+        """'NAME=v1,v2,...', 'NAME=low:high' or 'NAME=low:high:log'."""
+        name, _, body = spec.partition('=')
+        if ':' in body:
+            low, high, *scale = body.split(':')
+            return cls(name.strip(), low=float(low), high=float(high), log=scale == ['log'])
+        return cls(name.strip(), values=[_number(value) for value in body.split(',')])
+
+    def grid(self, points):
+        if self.values is not None:
+            return list(self.values)
+        if self.log:
+            return list(np.geomspace(self.low, self.high, points))
+        return list(np.linspace(self.low, self.high, points))
+
+    def sample(self, rng):
+        if self.values is not None:
+            return self.values[rng.integers(len(self.values))]
+        if self.log:
+            return float(np.exp(rng.uniform(np.log(self.low), np.log(self.high))))
+        return float(rng.uniform(self.low, self.high))
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text else value
+
+def grid_candidates(parameters, points=3):
+    """Every combination of the parameters' grid values."""
+    names = [p.name for p in parameters]
+    return [dict(zip(names, values)) for values in itertools.product(*(p.grid(points) for p in parameters))]
+
+def random_candidates(parameters, samples, seed=default_config.RANDOM_SEED):
+    rng = np.random.default_rng(seed)
+    return [{p.name: p.sample(rng) for p in parameters} for _ in range(samples)]
+
+class CandidateScore:
+    """Per-run summaries of one parameter set in one scenario, and its score:
+    the weighted sum of the metric means, lower is better."""
+
+    def __init__(self, scenario, index, params, weights):
+        self.scenario = scenario
+        self.index = index
+        self.params = params
+        self.weights = weights
+        self.summaries = {}
+        self.eliminated_after = None
+
+    def add(self, run, summary):
+        self.summaries[run] = summary
+
+    def mean(self, metric):
+        return float(np.mean([summary[metric] for summary in self.summaries.values()]))
+
+    @property
+    def score(self):
+        if not self.summaries:
+            return math.inf
+        score = sum(weight * self.mean(metric) for metric, weight in self.weights.items())
+        return score if np.isfinite(score) else math.inf
+
+    def row(self, rank):
+        metrics = next(iter(self.summaries.values())).keys() if self.summaries else ()
+        return {'scenario': self.scenario, 'rank': rank, 'candidate': self.index, **self.params,
+                'runs': len(self.summaries), 'score': self.score,
+                **{f"{metric} mean": self.mean(metric) for metric in metrics}}
+
+class SweepEngine:
+    """Evaluates parameter sets for one scheduler over a set of scenarios.
+
+    Every candidate of a scenario replays the same seeded runs (workload and
+    scheduler seeds depend only on the scenario and run number), so candidates
+    are compared on identical task streams and their differences are free of
+    workload noise. All units of a round go to one process pool and through
+    the result cache, so repeated or extended sweeps reuse finished runs.
+    """
+
+    def __init__(self, scenarios, scheduler_name, weights, workers=1, cache=None):
+        self.scenarios = scenarios
+        self.scheduler_name = scheduler_name
+        self.weights = weights
+        self.workers = workers
+        self.cache = cache
+
+    def _evaluate(self, candidates, first_run, num_runs):
+        """Adds runs first_run..num_runs-1 to every CandidateScore in `candidates`."""
+        units = []
+        for candidate in candidates:
+            scenario_config = {**self.scenarios[candidate.scenario], **candidate.params}
+            for unit in make_units(scenario_config, [self.scheduler_name], num_runs, first_run):
+                # Seeds come from the scenario name; the label tells the candidates apart.
+                unit['experiment'] = (candidate.scenario, candidate.index)
+                units.append(unit)
+        by_label = {(c.scenario, c.index): c for c in candidates}
+        for result in run_units(units, self.workers, self.cache):
+            by_label[result['experiment']].add(result['run'], result['summary'])
+
+    def _scores(self, candidate_params):
+        return {name: [CandidateScore(name, i, params, self.weights) for i, params in enumerate(candidate_params)]
+                for name in self.scenarios}
+
+    def evaluate_all(self, candidate_params, runs):
+        """Grid or random search: every candidate on `runs` runs."""
+        scores = self._scores(candidate_params)
+        self._evaluate([c for per_scenario in scores.values() for c in per_scenario], 0, runs)
+        return {name: ranked(per_scenario) for name, per_scenario in scores.items()}
+
+    def successive_halving(self, candidate_params, max_runs, min_runs=1, eta=3):
+        """Evaluates all candidates on `min_runs` runs, keeps the best 1/eta of
+        each scenario, multiplies the runs by eta and repeats until one
+        candidate is left or `max_runs` is reached."""
+        scores = self._scores(candidate_params)
+        survivors = {name: list(per_scenario) for name, per_scenario in scores.items()}
+        done, runs = 0, min(min_runs, max_runs)
+        while True:
+            self._evaluate([c for alive in survivors.values() for c in alive], done, runs)
+            done = runs
+            if runs >= max_runs or all(len(alive) <= 1 for alive in survivors.values()):
+                break
+            for name, alive in survivors.items():
+                alive = ranked(alive)
+                for candidate in alive[max(1, len(alive) // eta):]:
+                    candidate.eliminated_after = runs
+                survivors[name] = alive[:max(1, len(alive) // eta)]
+            runs = min(runs * eta, max_runs)
+        return {name: ranked(per_scenario) for name, per_scenario in scores.items()}
+
+def ranked(candidates):
+    """Best first: candidates that survived longer (successive halving), then by score."""
+    return sorted(candidates, key=lambda c: (-(c.eliminated_after or math.inf), c.score, c.index))
\ No newline at end of file